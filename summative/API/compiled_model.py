@@ -0,0 +1,616 @@
+"""
+Flat array-based inference engine for trained models.
+
+Single-row predict() on a scikit-learn RandomForestRegressor is dominated by
+Python and joblib dispatch overhead (one call per tree) rather than the
+comparisons themselves. This module compiles a RandomForestRegressor or
+DecisionTreeRegressor into contiguous NumPy arrays of feature index,
+threshold, child pointers and leaf values, and evaluates all trees for a
+batch with a vectorized level-by-level traversal.
+
+Predictions match scikit-learn bit for bit: inputs are rounded to float32
+before comparison exactly as sklearn's tree code does, and tree outputs are
+summed in estimator order before dividing by the number of trees (sklearn
+with n_jobs=1; with several jobs sklearn's own summation order varies).
+
+Compiled artifacts are plain dicts of arrays saved uncompressed with joblib,
+so loading them needs neither scikit-learn nor the original pickle, and with
+mmap_mode="r" the node arrays are memory-mapped: every process serving the
+same artifact shares one page-cached copy instead of holding a private one.
+
+The StandardScaler can also be folded into a compiled model so serving runs
+on raw features in a single pass: into the coefficients and intercept of a
+linear model, or into the split thresholds of a tree model. For trees each
+folded threshold is the largest raw value that the two-stage pipeline sends
+left, so fused predictions stay identical to scaler.transform + predict.
+
+Usage:
+    python compiled_model.py models/best_model.pkl models/best_model_compiled.pkl
+    python compiled_model.py models/best_model.pkl models/best_model_fused.pkl \
+        --fold-scaler models/scaler.pkl
+"""
+
+import time
+from typing import Dict, Optional
+
+import joblib
+import numpy as np
+
+ARTIFACT_FORMAT = "medmind-compiled-model"
+ARTIFACT_VERSION = 1
+
+# Rows evaluated per traversal pass, bounding the (n_trees, rows) index matrix
+_ROW_CHUNK = 4096
+
+# Largest finite float64, bracketing every folded threshold search
+_FLOAT64_MAX = np.finfo(np.float64).max
+
+# Flips the magnitude bits of negative floats so int64 order matches float order
+_MAGNITUDE_MASK = np.int64(0x7FFFFFFFFFFFFFFF)
+
+
+class CompiledForest:
+    """
+    Tree ensemble stored as flat node arrays, evaluated level by level.
+
+    All trees share one set of node arrays; roots holds the index of each
+    tree's root node. Leaves point to themselves so every row can take the
+    same number of steps (max_depth) regardless of where it terminates.
+
+    Args:
+        feature: Split feature per node (0 for leaves)
+        threshold: Split threshold per node; rows go left when x <= threshold
+        left: Left child per node (self for leaves)
+        right: Right child per node (self for leaves)
+        value: Leaf value per node
+        roots: Root node index of each tree
+        max_depth: Depth of the deepest tree
+        n_features: Number of input features
+        average: Whether to average tree outputs (forest) or return the single tree output
+        float32_inputs: Round inputs to float32 before comparing, as sklearn does
+        scaler_folded: Whether thresholds apply to raw (unscaled) features
+    """
+
+    kind = "forest"
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        n_features: int,
+        average: bool = True,
+        float32_inputs: bool = True,
+        scaler_folded: bool = False
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+        self.average = bool(average)
+        self.float32_inputs = bool(float32_inputs)
+        self.scaler_folded = bool(scaler_folded)
+
+    @property
+    def n_trees(self) -> int:
+        """Number of trees in the ensemble."""
+        return len(self.roots)
+
+    @property
+    def node_count(self) -> int:
+        """Total number of nodes across all trees."""
+        return len(self.feature)
+
+    @classmethod
+    def from_estimator(cls, estimator) -> "CompiledForest":
+        """
+        Flatten a fitted RandomForestRegressor or DecisionTreeRegressor.
+
+        Args:
+            estimator: Fitted single-output tree regressor or forest of them
+
+        Returns:
+            CompiledForest: Equivalent flat-array model
+
+        Raises:
+            TypeError: If the estimator is not a fitted tree model
+        """
+        if hasattr(estimator, "estimators_"):
+            trees = [tree.tree_ for tree in estimator.estimators_]
+            average = True
+        elif hasattr(estimator, "tree_"):
+            trees = [estimator.tree_]
+            average = False
+        else:
+            raise TypeError(
+                f"Cannot compile {type(estimator).__name__}: expected a fitted "
+                "RandomForestRegressor or DecisionTreeRegressor"
+            )
+        if trees[0].n_outputs != 1:
+            raise TypeError("Only single-output regressors can be compiled")
+
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        features, thresholds, lefts, rights, values = [], [], [], [], []
+
+        for offset, tree in zip(offsets, trees):
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            lefts.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+            values.append(tree.value[:, 0, 0])
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            left=np.ascontiguousarray(np.concatenate(lefts), dtype=np.intp),
+            right=np.ascontiguousarray(np.concatenate(rights), dtype=np.intp),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.ascontiguousarray(offsets[:-1], dtype=np.intp),
+            max_depth=max(tree.max_depth for tree in trees),
+            n_features=estimator.n_features_in_,
+            average=average
+        )
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict targets for a feature matrix.
+
+        Args:
+            X: (n, n_features) feature matrix
+
+        Returns:
+            np.ndarray: n float64 predictions
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(
+                f"Expected a 2-D array with {self.n_features} features, got shape {X.shape}"
+            )
+
+        out = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], _ROW_CHUNK):
+            stop = start + _ROW_CHUNK
+            out[start:stop] = self._predict_chunk(X[start:stop])
+        return out
+
+    def _predict_chunk(self, X: np.ndarray) -> np.ndarray:
+        """Evaluate every tree for a chunk of rows."""
+        # sklearn trees compare float32 inputs against float64 thresholds
+        if self.float32_inputs:
+            X = X.astype(np.float32).astype(np.float64)
+        rows = np.arange(X.shape[0])
+
+        # One node index per (tree, row); all trees advance one level per step
+        nodes = np.repeat(self.roots[:, np.newaxis], X.shape[0], axis=1)
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        leaf_values = self.value[nodes]
+
+        # Sum sequentially in tree order to reproduce sklearn's accumulation
+        total = np.zeros(X.shape[0], dtype=np.float64)
+        for tree_values in leaf_values:
+            total += tree_values
+        if self.average:
+            total /= self.n_trees
+        return total
+
+    def to_arrays(self) -> Dict:
+        """Serialize to a dict of arrays and metadata."""
+        return {
+            "format": ARTIFACT_FORMAT,
+            "version": ARTIFACT_VERSION,
+            "kind": self.kind,
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "left": self.left,
+            "right": self.right,
+            "value": self.value,
+            "roots": self.roots,
+            "max_depth": self.max_depth,
+            "n_features": self.n_features,
+            "average": self.average,
+            "float32_inputs": self.float32_inputs,
+            "scaler_folded": self.scaler_folded
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict) -> "CompiledForest":
+        """Rebuild from the dict produced by to_arrays()."""
+        return cls(
+            feature=arrays["feature"],
+            threshold=arrays["threshold"],
+            left=arrays["left"],
+            right=arrays["right"],
+            value=arrays["value"],
+            roots=arrays["roots"],
+            max_depth=arrays["max_depth"],
+            n_features=arrays["n_features"],
+            average=arrays["average"],
+            float32_inputs=arrays.get("float32_inputs", True),
+            scaler_folded=arrays.get("scaler_folded", False)
+        )
+
+    def fold_scaler(self, mean: np.ndarray, scale: np.ndarray) -> "CompiledForest":
+        """
+        Return an equivalent forest whose thresholds apply to raw features.
+
+        Each internal node's threshold t on standardized feature f becomes the
+        largest float64 x such that float32((x - mean[f]) / scale[f]) <= t,
+        which is exactly the set of raw values the two-stage pipeline sends left.
+        """
+        if self.scaler_folded:
+            raise ValueError("Scaler is already folded into this model")
+
+        internal = self.left != np.arange(self.node_count)
+        features = self.feature[internal]
+        threshold = self.threshold.copy()
+        threshold[internal] = _raw_thresholds(
+            self.threshold[internal], mean[features], scale[features]
+        )
+
+        return CompiledForest(
+            feature=self.feature,
+            threshold=threshold,
+            left=self.left,
+            right=self.right,
+            value=self.value,
+            roots=self.roots,
+            max_depth=self.max_depth,
+            n_features=self.n_features,
+            average=self.average,
+            float32_inputs=False,
+            scaler_folded=True
+        )
+
+
+class CompiledLinear:
+    """
+    Linear model stored as a coefficient vector and intercept.
+
+    Args:
+        coef: Coefficient per feature
+        intercept: Intercept term
+        scaler_folded: Whether coefficients apply to raw (unscaled) features
+    """
+
+    kind = "linear"
+
+    def __init__(self, coef: np.ndarray, intercept: float, scaler_folded: bool = False):
+        self.coef = np.ascontiguousarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.n_features = len(self.coef)
+        self.scaler_folded = bool(scaler_folded)
+
+    @classmethod
+    def from_estimator(cls, estimator) -> "CompiledLinear":
+        """Extract coefficients from a fitted single-output linear regressor."""
+        coef = np.asarray(estimator.coef_, dtype=np.float64)
+        if coef.ndim != 1:
+            raise TypeError("Only single-output linear models can be compiled")
+        return cls(coef, float(np.ravel(estimator.intercept_)[0]))
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predict targets for an (n, n_features) feature matrix."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(
+                f"Expected a 2-D array with {self.n_features} features, got shape {X.shape}"
+            )
+        return X @ self.coef + self.intercept
+
+    def fold_scaler(self, mean: np.ndarray, scale: np.ndarray) -> "CompiledLinear":
+        """
+        Return an equivalent linear model on raw features.
+
+        coef . (x - mean) / scale + b == (coef / scale) . x + (b - (coef / scale) . mean)
+        """
+        if self.scaler_folded:
+            raise ValueError("Scaler is already folded into this model")
+        coef = self.coef / scale
+        return CompiledLinear(coef, self.intercept - float(coef @ mean), scaler_folded=True)
+
+    def to_arrays(self) -> Dict:
+        """Serialize to a dict of arrays and metadata."""
+        return {
+            "format": ARTIFACT_FORMAT,
+            "version": ARTIFACT_VERSION,
+            "kind": self.kind,
+            "coef": self.coef,
+            "intercept": self.intercept,
+            "scaler_folded": self.scaler_folded
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict) -> "CompiledLinear":
+        """Rebuild from the dict produced by to_arrays()."""
+        return cls(arrays["coef"], arrays["intercept"], arrays.get("scaler_folded", False))
+
+
+_COMPILED_KINDS = {
+    CompiledForest.kind: CompiledForest,
+    CompiledLinear.kind: CompiledLinear,
+}
+
+
+def _float_key(x: np.ndarray) -> np.ndarray:
+    """Map float64 values to int64 keys with the same ordering."""
+    bits = np.ascontiguousarray(x, dtype=np.float64).view(np.int64)
+    return np.where(bits < 0, bits ^ _MAGNITUDE_MASK, bits)
+
+
+def _key_float(key: np.ndarray) -> np.ndarray:
+    """Inverse of _float_key."""
+    return np.where(key < 0, key ^ _MAGNITUDE_MASK, key).view(np.float64)
+
+
+def _raw_thresholds(threshold: np.ndarray, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """
+    Find, per node, the largest raw x sent left by the scaled comparison.
+
+    The scaled comparison float32((x - mean) / scale) <= threshold is monotone
+    in x, so a bisection over float64 values (as ordered integer keys) finds
+    the exact boundary for every node at once. The float32 rounding means the
+    boundary can sit far from threshold * scale + mean (up to half the gap to
+    the next training value), so the search spans the whole float64 range;
+    that is at most 64 vectorized steps. Infinite thresholds (newer
+    scikit-learn emits +inf for splits that send every value left) are
+    already exact in raw units and are passed through.
+    """
+    finite = np.isfinite(threshold)
+    if not finite.all():
+        raw = threshold.astype(np.float64, copy=True)
+        raw[finite] = _raw_thresholds(threshold[finite], mean[finite], scale[finite])
+        return raw
+
+    def goes_left(x):
+        # Extreme probes overflow to +/-inf in float32, which still compares correctly
+        with np.errstate(over="ignore", invalid="ignore"):
+            scaled = ((x - mean) / scale).astype(np.float32).astype(np.float64)
+        return scaled <= threshold
+
+    lo = _float_key(np.full(len(threshold), -_FLOAT64_MAX))
+    hi = _float_key(np.full(len(threshold), _FLOAT64_MAX))
+    if not (goes_left(_key_float(lo)).all() and not goes_left(_key_float(hi)).any()):
+        raise ValueError("Could not bracket folded split thresholds")
+
+    # Invariant: lo goes left, hi goes right
+    while np.any(hi > lo + 1):
+        # Overflow-free floor((lo + hi) / 2)
+        mid = (lo >> 1) + (hi >> 1) + (lo & hi & 1)
+        left = goes_left(_key_float(mid))
+        lo = np.where(left, mid, lo)
+        hi = np.where(left, hi, mid)
+    return _key_float(lo)
+
+
+def compile_model(estimator):
+    """
+    Compile a fitted model into a flat-array inference engine.
+
+    Tree models (RandomForestRegressor, DecisionTreeRegressor) become a
+    CompiledForest; linear models (anything with coef_) a CompiledLinear.
+    """
+    if hasattr(estimator, "coef_"):
+        return CompiledLinear.from_estimator(estimator)
+    return CompiledForest.from_estimator(estimator)
+
+
+def fold_scaler(compiled, scaler):
+    """
+    Fold a fitted StandardScaler into a compiled model.
+
+    Returns:
+        A compiled model of the same kind that predicts from raw features
+    """
+    n_features = compiled.n_features
+    mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features)
+    scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+    return compiled.fold_scaler(
+        np.asarray(mean, dtype=np.float64),
+        np.asarray(scale, dtype=np.float64)
+    )
+
+
+def build_fused_predictor(estimator, scaler):
+    """Compile an estimator and fold its scaler into a single raw-feature predictor."""
+    return fold_scaler(compile_model(estimator), scaler)
+
+
+def is_compiled_artifact(obj) -> bool:
+    """Whether an unpickled object is a compiled model artifact."""
+    return isinstance(obj, dict) and obj.get("format") == ARTIFACT_FORMAT
+
+
+def save_compiled(compiled, path: str) -> None:
+    """Save a compiled model as an uncompressed (memory-mappable) joblib dict of arrays."""
+    joblib.dump(compiled.to_arrays(), path, compress=0)
+
+
+def _from_artifact(arrays: Dict, path: str):
+    """Rebuild a compiled model from a loaded artifact dict."""
+    if arrays["version"] > ARTIFACT_VERSION:
+        raise ValueError(
+            f"{path} uses artifact version {arrays['version']}, "
+            f"this engine supports up to {ARTIFACT_VERSION}"
+        )
+    if arrays["kind"] not in _COMPILED_KINDS:
+        raise ValueError(f"{path} contains unknown model kind {arrays['kind']!r}")
+    return _COMPILED_KINDS[arrays["kind"]].from_arrays(arrays)
+
+
+def load_compiled(path: str, mmap_mode: Optional[str] = None):
+    """
+    Load a compiled model artifact.
+
+    Args:
+        path: Artifact path
+        mmap_mode: Passed to joblib.load; "r" memory-maps the node arrays read-only
+
+    Raises:
+        ValueError: If the file is not a compiled model artifact
+    """
+    arrays = joblib.load(path, mmap_mode=mmap_mode)
+    if not is_compiled_artifact(arrays):
+        raise ValueError(f"{path} is not a compiled model artifact")
+    return _from_artifact(arrays, path)
+
+
+def load_model_artifact(path: str, mmap_mode: Optional[str] = None):
+    """
+    Load a pickled scikit-learn model, a compiled artifact or an ONNX graph.
+
+    All kinds expose predict(X), so callers can treat them interchangeably.
+    mmap_mode="r" keeps a compiled artifact's arrays memory-mapped; sklearn
+    trees copy their node arrays into private buffers when unpickled, so for
+    pickles it only avoids the intermediate read. ".onnx" files are run with
+    onnxruntime (see onnx_model.py) and include the scaler.
+    """
+    if str(path).endswith(".onnx"):
+        from onnx_model import load_onnx
+        return load_onnx(path)
+    obj = joblib.load(path, mmap_mode=mmap_mode)
+    if is_compiled_artifact(obj):
+        return _from_artifact(obj, str(path))
+    return obj
+
+
+def _reference_predict(estimator, X: np.ndarray) -> np.ndarray:
+    """Predict with sklearn, sequentially so tree summation order is deterministic."""
+    n_jobs = getattr(estimator, "n_jobs", None)
+    if n_jobs not in (None, 1):
+        estimator.n_jobs = 1
+    try:
+        return estimator.predict(X)
+    finally:
+        if n_jobs not in (None, 1):
+            estimator.n_jobs = n_jobs
+
+
+def _parity_report(expected: np.ndarray, actual: np.ndarray) -> Dict:
+    """Summarize how two prediction vectors differ."""
+    mismatched = int(np.count_nonzero(expected != actual))
+    return {
+        "rows": len(expected),
+        "mismatched_rows": mismatched,
+        "max_abs_diff": float(np.max(np.abs(expected - actual))) if len(expected) else 0.0,
+        "identical": mismatched == 0
+    }
+
+
+def verify_compiled(estimator, compiled, X: np.ndarray) -> Dict:
+    """
+    Compare compiled predictions against the original estimator.
+
+    Returns:
+        dict: Row count, number of mismatching rows, maximum absolute difference
+              and whether the outputs are bit-for-bit identical
+    """
+    return _parity_report(_reference_predict(estimator, X), compiled.predict(X))
+
+
+def verify_fused(estimator, scaler, fused, X_raw: np.ndarray, atol: float = 1e-8) -> Dict:
+    """
+    Compare a fused predictor against the two-stage scaler.transform + predict pipeline.
+
+    Folded tree thresholds reproduce the pipeline exactly; folded linear
+    coefficients differ only by floating-point reassociation, hence atol.
+
+    Returns:
+        dict: Parity report as in verify_compiled(), plus whether the maximum
+              absolute difference is within atol
+    """
+    expected = _reference_predict(estimator, scaler.transform(X_raw))
+    report = _parity_report(expected, fused.predict(X_raw))
+    report["passed"] = report["max_abs_diff"] <= atol
+    return report
+
+
+def benchmark(estimator, compiled, X: np.ndarray, repeats: int = 200) -> Dict:
+    """
+    Time single-row and full-batch predictions for both engines.
+
+    Returns:
+        dict: Mean single-row latency (ms) and batch throughput (rows/s) per engine
+    """
+    results = {}
+    for name, engine in (("sklearn", estimator), ("compiled", compiled)):
+        row = X[:1]
+        start = time.perf_counter()
+        for _ in range(repeats):
+            engine.predict(row)
+        single_ms = (time.perf_counter() - start) / repeats * 1000
+
+        start = time.perf_counter()
+        engine.predict(X)
+        batch_seconds = time.perf_counter() - start
+
+        results[name] = {
+            "single_row_ms": single_ms,
+            "batch_rows_per_second": len(X) / batch_seconds if batch_seconds > 0 else float("inf")
+        }
+    return results
+
+
+def _sample_inputs(n_features: int, rows: int, seed: int = 42) -> np.ndarray:
+    """Random standardized inputs covering both sides of typical splits."""
+    return np.random.default_rng(seed).normal(0.0, 1.5, size=(rows, n_features))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Compile a trained model into a flat-array inference artifact"
+    )
+    parser.add_argument("model_path", help="Pickled forest, decision tree or linear regressor")
+    parser.add_argument("output_path", help="Where to write the compiled artifact")
+    parser.add_argument("--verify-rows", type=int, default=10000,
+                        help="Random rows used to verify parity with sklearn (default: 10000)")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Report single-row latency and batch throughput for both engines")
+    parser.add_argument("--fold-scaler", metavar="SCALER_PATH",
+                        help="Fold this StandardScaler into the artifact so it predicts from raw features")
+    args = parser.parse_args()
+
+    estimator = joblib.load(args.model_path)
+    compiled = compile_model(estimator)
+    if compiled.kind == "forest":
+        print(f"Compiled {compiled.n_trees} tree(s), {compiled.node_count} nodes, "
+              f"max depth {compiled.max_depth}")
+    else:
+        print(f"Compiled linear model with {compiled.n_features} coefficients")
+
+    X_check = _sample_inputs(compiled.n_features, args.verify_rows)
+    if args.fold_scaler:
+        scaler = joblib.load(args.fold_scaler)
+        compiled = fold_scaler(compiled, scaler)
+        X_check = scaler.inverse_transform(X_check)
+        report = verify_fused(estimator, scaler, compiled, X_check)
+        ok = report["passed"]
+    else:
+        report = verify_compiled(estimator, compiled, X_check)
+        ok = report["identical"]
+    print(f"Parity on {report['rows']} rows: {report['mismatched_rows']} mismatched, "
+          f"max |diff| = {report['max_abs_diff']:.3e}")
+    if not ok:
+        raise SystemExit("Compiled model does not match sklearn output; artifact not written")
+
+    save_compiled(compiled, args.output_path)
+    print(f"Saved compiled model to {args.output_path}")
+
+    if args.benchmark and not args.fold_scaler:
+        for name, timing in benchmark(estimator, compiled, X_check).items():
+            print(f"  {name:8s}: {timing['single_row_ms']:.3f} ms/row single, "
+                  f"{timing['batch_rows_per_second']:,.0f} rows/s batch")
@@ -0,0 +1,147 @@
+"""
+Fast decoding of batch requests straight into a NumPy feature matrix.
+
+The regular batch endpoint has FastAPI parse the JSON body, pydantic build a
+dict per row and then validate eight constrained fields per row, before the
+handler copies every attribute into a matrix. FastDecoder skips the per-row
+objects: the body is parsed with orjson (when installed), each column is
+converted to a float64 array in one call, and the range and integer checks
+from PredictionInput's Field constraints run as vectorized comparisons.
+
+Only the unusual cases fall back to pydantic: rows flagged by the vectorized
+checks are re-validated by PredictionInput to produce its exact error
+objects, and bodies that cannot be converted cleanly (strings, nulls,
+missing fields, ragged rows) are decoded the slow way. Error responses are
+therefore identical to the pydantic path.
+"""
+
+import json
+from typing import Any, List, Optional, Sequence, Type
+
+import annotated_types
+import numpy as np
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# dtype kinds accepted as numbers: bool, signed and unsigned int, float
+_NUMERIC_KINDS = "biuf"
+
+# pydantic rejects whole floats outside int64 for int fields (int_parsing_size);
+# both bounds are exclusive, as for the float values it is given
+_INT64_LIMIT = 2.0 ** 63
+
+
+def loads(body: bytes) -> Any:
+    """
+    Parse a JSON body with orjson if installed, else the standard library.
+
+    Raises:
+        ValueError: If the body is not valid JSON
+    """
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def dumps(value: Any) -> bytes:
+    """Serialize a value to compact JSON bytes with orjson if installed."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+class FastDecoder:
+    """
+    Vectorized decoder for rows of a flat, numeric pydantic model.
+
+    Args:
+        model: Pydantic model whose fields are int or float with optional
+               ge/le constraints (e.g. PredictionInput)
+        feature_order: Field names in matrix column order
+    """
+
+    def __init__(self, model: Type[BaseModel], feature_order: Sequence[str]):
+        self.feature_order = list(feature_order)
+        self.lower = np.full(len(self.feature_order), -np.inf)
+        self.upper = np.full(len(self.feature_order), np.inf)
+        self.integer = np.zeros(len(self.feature_order), dtype=bool)
+
+        for column, name in enumerate(self.feature_order):
+            field = model.model_fields[name]
+            if field.annotation not in (int, float):
+                raise ValueError(f"Field {name} must be int or float, got {field.annotation}")
+            self.integer[column] = field.annotation is int
+            for constraint in field.metadata:
+                if isinstance(constraint, annotated_types.Ge):
+                    self.lower[column] = constraint.ge
+                elif isinstance(constraint, annotated_types.Le):
+                    self.upper[column] = constraint.le
+                else:
+                    # An unchecked constraint would let invalid rows through
+                    raise ValueError(f"Unsupported constraint on {name}: {constraint!r}")
+
+    def decode_objects(self, instances: List[Any]) -> Optional[np.ndarray]:
+        """
+        Build an (n, k) matrix from a list of row objects.
+
+        Returns:
+            np.ndarray, or None if any row is not an object, lacks a field or
+            has a non-numeric value
+        """
+        matrix = np.empty((len(instances), len(self.feature_order)), dtype=np.float64)
+        try:
+            for column, name in enumerate(self.feature_order):
+                values = np.array([row[name] for row in instances])
+                if values.dtype.kind not in _NUMERIC_KINDS or values.ndim != 1:
+                    return None
+                matrix[:, column] = values
+        except (KeyError, TypeError, ValueError, OverflowError):
+            return None
+        return matrix
+
+    def decode_rows(self, rows: List[Any]) -> Optional[np.ndarray]:
+        """
+        Build an (n, k) matrix from a list of arrays in feature order.
+
+        Returns:
+            np.ndarray, or None if the rows are ragged, the wrong length or
+            contain non-numeric values
+        """
+        try:
+            matrix = np.array(rows)
+        except (ValueError, OverflowError):
+            return None
+        if matrix.dtype.kind not in _NUMERIC_KINDS or matrix.shape != (len(rows), len(self.feature_order)):
+            return None
+        return matrix.astype(np.float64, copy=False)
+
+    def valid_rows(self, matrix: np.ndarray) -> np.ndarray:
+        """
+        Apply every field constraint to all rows at once.
+
+        Returns:
+            np.ndarray: Boolean mask of rows passing all checks
+        """
+        with np.errstate(invalid="ignore"):
+            ok = (matrix >= self.lower) & (matrix <= self.upper)
+            # Integer fields accept whole floats (45.0) like pydantic's lax mode;
+            # NaN and infinity fail here or in the range check
+            integer_columns = matrix[:, self.integer]
+            ok[:, self.integer] &= (np.isfinite(integer_columns) & (np.floor(integer_columns) == integer_columns)
+                                    & (np.abs(integer_columns) < _INT64_LIMIT))
+        return ok.all(axis=1)
+
+    def row_object(self, row: Any) -> Any:
+        """Turn an array row into a field-name object for pydantic validation."""
+        if isinstance(row, list) and len(row) == len(self.feature_order):
+            return dict(zip(self.feature_order, row))
+        return row
+
+
+def is_sized_list(value: Any, max_length: int) -> bool:
+    """Whether value is a non-empty list of at most max_length items."""
+    return isinstance(value, list) and 1 <= len(value) <= max_length
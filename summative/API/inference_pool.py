@@ -0,0 +1,185 @@
+"""
+Bounded worker pool for running blocking model inference off the event loop.
+
+scaler.transform and model.predict are synchronous; calling them directly
+from an async handler stalls the uvicorn event loop (including /health) for
+the duration of every prediction. The InferencePool dispatches scoring to a
+dedicated thread or process pool and applies backpressure: once the number
+of queued plus running calls reaches max_pending, new calls are rejected
+with PoolSaturatedError instead of letting latency grow without bound.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from metrics import STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+POOL_KINDS = ("thread", "process")
+
+# Predict function loaded once per process-pool worker by _init_worker
+_worker_predict_fn: Optional[Callable[[np.ndarray], np.ndarray]] = None
+
+
+class PoolSaturatedError(Exception):
+    """Raised when the inference pool has no room for another call."""
+
+
+def _init_worker(loader: Callable[[], Callable[[np.ndarray], np.ndarray]]) -> None:
+    """Process-pool initializer: preload the model in the worker process."""
+    global _worker_predict_fn
+    # Forked workers inherit the parent's stage timings; only their own are sent back
+    STAGE_SECONDS.drain()
+    _worker_predict_fn = loader()
+
+
+def _predict_in_worker(features: np.ndarray) -> Tuple[np.ndarray, Dict]:
+    """
+    Score a feature matrix with the model preloaded in this worker.
+
+    Returns the predictions and the stage timings recorded while scoring,
+    which the parent merges into its own histogram: nothing scrapes a worker.
+    """
+    predictions = _worker_predict_fn(features)
+    return predictions, STAGE_SECONDS.drain()
+
+
+class InferencePool:
+    """
+    Run blocking predictions on a sized executor with bounded admission.
+
+    Args:
+        predict_fn: Function scoring an (n, 8) feature matrix; used by thread workers
+        kind: "thread" to share the loaded model, or "process" to preload a
+              private copy in each worker via loader
+        workers: Number of worker threads or processes
+        max_pending: Maximum queued plus running calls before rejecting
+        loader: Picklable callable returning a predict function, required for
+                process workers
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        kind: str = "thread",
+        workers: int = 2,
+        max_pending: int = 64,
+        loader: Optional[Callable[[], Callable[[np.ndarray], np.ndarray]]] = None
+    ):
+        if kind not in POOL_KINDS:
+            raise ValueError(f"kind must be one of {POOL_KINDS}, got {kind!r}")
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        if max_pending < workers:
+            raise ValueError(
+                f"max_pending ({max_pending}) must be at least workers ({workers})"
+            )
+        if kind == "process" and loader is None:
+            raise ValueError("Process workers require a loader to preload the model")
+
+        self.predict_fn = predict_fn
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self.loader = loader
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the pool is accepting work."""
+        return self._executor is not None
+
+    @property
+    def pending(self) -> int:
+        """Number of calls currently queued or running."""
+        return self._pending
+
+    def start(self) -> None:
+        """Create the executor, preloading the model in process workers."""
+        if self._executor is not None:
+            return
+        if self.kind == "thread":
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="inference"
+            )
+        else:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.loader,)
+            )
+        logger.info(
+            f"Inference pool started ({self.kind}, workers={self.workers}, "
+            f"max_pending={self.max_pending})"
+        )
+
+    def stop(self, cancel_pending: bool = True) -> None:
+        """
+        Shut down the executor, waiting for running calls to finish.
+
+        Args:
+            cancel_pending: Cancel calls still queued behind the running ones;
+                            False drains the queue first (used when a pool is
+                            retired on reload with callers still waiting)
+        """
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=True, cancel_futures=cancel_pending)
+        self._executor = None
+        logger.info("Inference pool stopped")
+
+    async def predict(self, features: np.ndarray) -> np.ndarray:
+        """
+        Score a feature matrix on the pool without blocking the event loop.
+
+        Args:
+            features: (n, 8) feature matrix
+
+        Returns:
+            np.ndarray: n predictions
+
+        Raises:
+            PoolSaturatedError: If max_pending calls are already queued or running
+        """
+        if self._executor is None:
+            raise RuntimeError("Inference pool is not running")
+
+        # Admission happens on the event loop thread, so no lock is needed
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise PoolSaturatedError(
+                f"Inference pool saturated ({self._pending} calls pending)"
+            )
+
+        loop = asyncio.get_running_loop()
+        self._pending += 1
+        try:
+            if self.kind == "thread":
+                return await loop.run_in_executor(self._executor, self.predict_fn, features)
+            predictions, stages = await loop.run_in_executor(self._executor, _predict_in_worker, features)
+            STAGE_SECONDS.merge(stages)
+            return predictions
+        finally:
+            self._pending -= 1
+            self._completed += 1
+
+    def stats(self) -> Dict:
+        """Report pool settings, current depth and rejection counts."""
+        return {
+            "enabled": self.running,
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "completed": self._completed,
+            "rejected": self._rejected
+        }
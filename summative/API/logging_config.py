@@ -0,0 +1,137 @@
+"""
+Logging setup with a background writer, JSON output and request-log sampling.
+
+logging.basicConfig writes each record to stderr on the calling thread, so
+every per-request log line is formatted and written on the event loop. Here
+the root logger only enqueues records; a QueueListener thread formats and
+writes them. Records are enqueued unformatted, so the message string
+(including any %-style arguments such as a request payload) is only built on
+the listener thread. Per-request logs go through a child logger whose
+SamplingFilter keeps a configurable fraction of INFO records, bounding log
+volume under load while warnings and errors are always kept.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else was passed via extra=
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including extra= fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fraction of records below WARNING; always keep warnings and errors.
+
+    Args:
+        rate: Fraction of INFO/DEBUG records kept, between 0 and 1
+    """
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError(f"rate must be between 0 and 1, got {rate}")
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or self.rate >= 1.0 or random.random() < self.rate
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+
+    The stock handler formats the message before enqueueing so records can be
+    pickled to another process; our queue stays in process, so the record is
+    passed through as is.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def configure_logging(
+    level: str = "INFO",
+    json_format: bool = False,
+    async_handler: bool = True
+) -> Optional[QueueListener]:
+    """
+    Configure the root logger.
+
+    Args:
+        level: Root log level name
+        json_format: Write one JSON object per line instead of plain text
+        async_handler: Write logs on a background thread
+
+    Returns:
+        QueueListener: The running listener, or None when logging synchronously
+    """
+    if logging.getLogger().handlers:
+        # Already configured (e.g. by the embedding application); leave it alone
+        return None
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT))
+
+    if not async_handler:
+        logging.basicConfig(level=level, handlers=[handler])
+        return None
+
+    records = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(records)
+    listener = QueueListener(records, handler, respect_handler_level=True)
+    logging.basicConfig(level=level, handlers=[queue_handler])
+    listener.start()
+    # Flush queued records on interpreter exit
+    atexit.register(listener.stop)
+
+    def restart_in_child():
+        # The listener thread does not survive fork (gunicorn --preload,
+        # process-pool workers), so give the child its own queue and thread
+        fresh = queue.SimpleQueue()
+        queue_handler.queue = fresh
+        listener.queue = fresh
+        listener.start()
+
+    os.register_at_fork(after_in_child=restart_in_child)
+    return listener
+
+
+def request_logger(name: str, sample_rate: float = 1.0) -> logging.Logger:
+    """
+    Child logger for per-request records, sampled at sample_rate.
+
+    Args:
+        name: Parent logger name (usually the module's __name__)
+        sample_rate: Fraction of INFO records kept
+    """
+    log = logging.getLogger(f"{name}.requests")
+    for existing in [f for f in log.filters if isinstance(f, SamplingFilter)]:
+        log.removeFilter(existing)
+    log.addFilter(SamplingFilter(sample_rate))
+    return log
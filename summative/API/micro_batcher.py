@@ -0,0 +1,185 @@
+"""
+Asyncio micro-batching for concurrent single-row predictions.
+
+Concurrent /predict requests each score a single row, which for a forest
+means paying the full per-call dispatch overhead of every tree once per
+patient. The MicroBatcher queues incoming rows, coalesces them for up to a
+short window (or until the batch is full), scores them with one vectorized
+call and resolves each request's future individually.
+
+The window is only waited while another batch is being scored: that is when
+more rows are likely to arrive before the model is free again. A row arriving
+at an idle batcher is scored at once with whatever is already queued, so a
+lone request never pays the window.
+
+The predict function may be async (e.g. dispatching to an InferencePool), in
+which case several batches can be in flight at once.
+"""
+
+import asyncio
+import inspect
+import logging
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-row predictions into vectorized batches.
+
+    Args:
+        predict_fn: Function (sync or async) scoring an (n, 8) feature matrix,
+                    returning n predictions
+        window_ms: Maximum time to wait for more rows after the first one arrives,
+                   while another batch is in flight
+        max_batch_size: Maximum number of rows scored in a single call
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], Union[np.ndarray, Awaitable[np.ndarray]]],
+        window_ms: float = 2.0,
+        max_batch_size: int = 64
+    ):
+        if window_ms < 0:
+            raise ValueError(f"window_ms must be non-negative, got {window_ms}")
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be at least 1, got {max_batch_size}")
+
+        self.predict_fn = predict_fn
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self._batch_sizes: Counter = Counter()
+
+    @property
+    def running(self) -> bool:
+        """Whether the batching loop is accepting rows."""
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Start the background batching loop on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Micro-batcher started (window={self.window_ms}ms, "
+            f"max_batch_size={self.max_batch_size})"
+        )
+
+    async def stop(self) -> None:
+        """
+        Stop the batching loop, let in-flight batches finish and fail any rows
+        still waiting in the queue.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Micro-batcher stopped"))
+        logger.info("Micro-batcher stopped")
+
+    async def submit(self, features: np.ndarray) -> float:
+        """
+        Queue a single feature row and wait for its prediction.
+
+        Args:
+            features: 1-D array of the 8 model features
+
+        Returns:
+            float: Prediction for the row
+        """
+        if not self.running:
+            raise RuntimeError("Micro-batcher is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((features, future))
+        return await future
+
+    async def _run(self) -> None:
+        """Collect rows into batches and score them until cancelled."""
+        loop = asyncio.get_running_loop()
+        window = self.window_ms / 1000.0
+
+        while True:
+            batch = [await self._queue.get()]
+            # Nothing being scored: send what is queued now rather than wait
+            deadline = loop.time() + (window if self._in_flight else 0.0)
+
+            while len(batch) < self.max_batch_size:
+                # Take whatever is already queued without yielding first
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Score without blocking collection of the next batch
+            task = asyncio.create_task(self._flush(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _flush(self, batch: List[Tuple[np.ndarray, asyncio.Future]]) -> None:
+        """Score a batch with one call and resolve each row's future."""
+        self._batch_sizes[len(batch)] += 1
+
+        try:
+            features = np.stack([row for row, _ in batch])
+            predictions = self.predict_fn(features)
+            if inspect.isawaitable(predictions):
+                predictions = await predictions
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), prediction in zip(batch, predictions.tolist()):
+            # A request may have been cancelled (client disconnect) while queued
+            if not future.done():
+                future.set_result(prediction)
+
+    def stats(self) -> Dict:
+        """
+        Report settings and the achieved batch-size histogram.
+
+        Returns:
+            dict: Settings, number of batches and rows, and batch counts keyed by size
+        """
+        batches = sum(self._batch_sizes.values())
+        rows = sum(size * count for size, count in self._batch_sizes.items())
+        return {
+            "enabled": self.running,
+            "window_ms": self.window_ms,
+            "max_batch_size": self.max_batch_size,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches_in_flight": len(self._in_flight),
+            "batches": batches,
+            "rows": rows,
+            "mean_batch_size": round(rows / batches, 3) if batches else 0.0,
+            "batch_size_histogram": {
+                str(size): self._batch_sizes[size] for size in sorted(self._batch_sizes)
+            }
+        }
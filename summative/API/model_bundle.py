@@ -0,0 +1,185 @@
+"""
+Versioned model + scaler pairs for atomic hot reload.
+
+A ModelBundle holds a model and the scaler it was trained with as one
+immutable object. The API keeps a single reference to the current bundle;
+swapping that reference is atomic, so a request that already picked up the
+old bundle finishes on it while new requests see the new one, and the old
+model is freed once the last in-flight request releases it.
+
+When the scaler is folded into the model (fused compiled artifacts and ONNX
+graphs), the scaler pickle is never unpickled: doing so imports
+scikit-learn, which dominates cold start time. Serving such a bundle needs
+only numpy and joblib.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import joblib
+import numpy as np
+
+from compiled_model import load_model_artifact
+from metrics import STAGE_SECONDS
+
+# (mtime in nanoseconds, size in bytes) for the model and scaler files
+FileSignature = Tuple[Tuple[int, int], Tuple[int, int]]
+
+# Canned patients scored before a new bundle is accepted, in training column order
+CANARY_INPUTS = np.array([
+    [45, 3, 2.5, 120, 1, 0.2, 2, 85.5],
+    [72, 8, 4.2, 730, 5, 0.6, 5, 45.0],
+    [55, 5, 3.0, 365, 2, 0.35, 3, 70.0],
+    [30, 2, 1.8, 90, 0, 0.1, 1, 92.0],
+    [80, 10, 4.8, 1095, 8, 0.75, 7, 35.0],
+    [18, 1, 1.0, 0, 0, 0.0, 0, 100.0],
+    [120, 20, 5.0, 3650, 50, 1.0, 10, 0.0],
+], dtype=np.float64)
+
+# Raw (unclipped) canary predictions outside this band indicate a broken model
+PLAUSIBLE_RANGE = (-50.0, 150.0)
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """
+    A loaded model and scaler pair with its version and file signature.
+
+    scaler is None when the model has the scaler folded in.
+    """
+
+    model: Any
+    scaler: Any
+    version: str
+    model_path: str
+    scaler_path: str
+    signature: FileSignature
+    loaded_at: float = field(default_factory=time.time)
+
+    def predict_raw(self, features: np.ndarray) -> np.ndarray:
+        """Score raw features, skipping the scaler when it is folded into the model."""
+        if not getattr(self.model, "scaler_folded", False):
+            features = self.scaler.transform(features)
+        return self.model.predict(features)
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Score raw features, clipping predictions to [0, 100] and timing each stage."""
+        start = time.perf_counter()
+        if not getattr(self.model, "scaler_folded", False):
+            features = self.scaler.transform(features)
+            transformed = time.perf_counter()
+            STAGE_SECONDS.observe(transformed - start, "transform")
+            start = transformed
+        predictions = self.model.predict(features)
+        STAGE_SECONDS.observe(time.perf_counter() - start, "predict")
+        return np.clip(predictions, 0.0, 100.0, out=predictions)
+
+
+def file_signature(model_path: str, scaler_path: str) -> FileSignature:
+    """Cheap change detector for the model and scaler files."""
+    model_stat = os.stat(model_path)
+    scaler_stat = os.stat(scaler_path)
+    return (
+        (model_stat.st_mtime_ns, model_stat.st_size),
+        (scaler_stat.st_mtime_ns, scaler_stat.st_size),
+    )
+
+
+def snapshot_files(model_path: str, scaler_path: str) -> Tuple[str, str]:
+    """
+    Copy the model and scaler files into a new private directory.
+
+    Loading a candidate from the copies pins exactly the files that were
+    validated: process-pool workers that load the model later read the same
+    bytes even if the originals are replaced in the meantime. Modification
+    times are preserved so the copies have the originals' file signature.
+
+    Returns:
+        Paths of the copied model and scaler files
+    """
+    directory = tempfile.mkdtemp(prefix="medmind-model-")
+    model_copy = os.path.join(directory, os.path.basename(model_path))
+    scaler_copy = os.path.join(directory, "scaler-" + os.path.basename(scaler_path))
+    shutil.copy2(model_path, model_copy)
+    shutil.copy2(scaler_path, scaler_copy)
+    return model_copy, scaler_copy
+
+
+def _content_version(*paths: str) -> str:
+    """Short SHA-256 of the files' contents, identifying a model version."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def load_bundle(model_path: str, scaler_path: str, mmap: bool = True) -> ModelBundle:
+    """
+    Load a model and scaler pair from disk.
+
+    Args:
+        model_path: Pickled model or compiled artifact
+        scaler_path: Pickled StandardScaler
+        mmap: Memory-map compiled artifact arrays
+
+    Raises:
+        FileNotFoundError: If either file is missing
+    """
+    signature = file_signature(model_path, scaler_path)
+    model = load_model_artifact(model_path, mmap_mode="r" if mmap else None)
+    return ModelBundle(
+        model=model,
+        # Folded models never use it; skip unpickling (and importing scikit-learn)
+        scaler=None if getattr(model, "scaler_folded", False) else joblib.load(scaler_path),
+        version=_content_version(model_path, scaler_path),
+        model_path=str(model_path),
+        scaler_path=str(scaler_path),
+        signature=signature
+    )
+
+
+def validate_bundle(candidate: ModelBundle, current: Optional[ModelBundle] = None) -> Dict:
+    """
+    Score the canary inputs with a candidate bundle before it is swapped in.
+
+    A candidate is valid when it returns one finite, plausible prediction per
+    canary row. When a current bundle is given, the largest change in canary
+    predictions is reported so operators can see how much the new model moves.
+
+    Returns:
+        dict: valid flag, reason when invalid, canary predictions and drift
+    """
+    report: Dict[str, Any] = {"valid": False, "canary_rows": len(CANARY_INPUTS)}
+    try:
+        predictions = np.asarray(candidate.predict_raw(CANARY_INPUTS), dtype=np.float64)
+    except Exception as e:
+        report["reason"] = f"Canary prediction failed: {e}"
+        return report
+
+    if predictions.shape != (len(CANARY_INPUTS),):
+        report["reason"] = f"Expected {len(CANARY_INPUTS)} predictions, got shape {predictions.shape}"
+        return report
+    if not np.all(np.isfinite(predictions)):
+        report["reason"] = "Canary predictions contain NaN or infinity"
+        return report
+    low, high = PLAUSIBLE_RANGE
+    if predictions.min() < low or predictions.max() > high:
+        report["reason"] = (
+            f"Canary predictions outside plausible range [{low}, {high}]: "
+            f"{predictions.min():.2f} to {predictions.max():.2f}"
+        )
+        return report
+
+    report["valid"] = True
+    report["predictions"] = [round(p, 2) for p in np.clip(predictions, 0.0, 100.0).tolist()]
+    if current is not None:
+        drift = np.abs(np.clip(predictions, 0.0, 100.0) - np.clip(current.predict_raw(CANARY_INPUTS), 0.0, 100.0))
+        report["max_drift"] = round(float(drift.max()), 4)
+    return report
@@ -0,0 +1,148 @@
+"""
+Incremental reading of newline-delimited JSON request bodies.
+
+/predict/stream scores exports too large to hold as one JSON array. Instead
+of awaiting the whole body, the handler feeds the raw byte chunks from the
+ASGI receive channel through NDJSONReader, which splits them into lines and
+groups the lines into fixed-size chunks of rows. Only the current chunk and
+one partial line are ever held, so memory stays constant regardless of the
+input size; a line longer than max_line_bytes is skipped and reported
+instead of being buffered.
+"""
+
+from typing import Any, AsyncIterator, List, Tuple
+
+from starlette.responses import StreamingResponse
+
+import fast_decode
+
+MEDIA_TYPE = "application/x-ndjson"
+
+
+class NDJSONResponse(StreamingResponse):
+    """
+    Streaming NDJSON response whose body generator reads the request body.
+
+    StreamingResponse normally reads receive() concurrently to watch for a
+    client disconnect (on ASGI servers older than spec 2.4), which consumes
+    the request body messages the generator is waiting for and deadlocks
+    the request. Here the generator is the only reader: request.stream()
+    itself raises ClientDisconnect if the client goes away.
+    """
+
+    media_type = MEDIA_TYPE
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+class LineTooLong:
+    """Placeholder row for a line that exceeded the reader's length limit."""
+
+    def __init__(self, max_line_bytes: int):
+        self.max_line_bytes = max_line_bytes
+
+    def error(self) -> dict:
+        """Validation error reported for the skipped line."""
+        return {
+            "type": "line_too_long",
+            "loc": [],
+            "msg": f"Line exceeds {self.max_line_bytes} bytes"
+        }
+
+
+class InvalidJSON:
+    """Placeholder row for a line that could not be parsed."""
+
+    def __init__(self, reason: str):
+        self.reason = reason
+
+    def error(self) -> dict:
+        """Validation error reported for the unparsable line."""
+        return {
+            "type": "json_invalid",
+            "loc": [],
+            "msg": "JSON decode error",
+            "ctx": {"error": self.reason}
+        }
+
+
+class NDJSONReader:
+    """
+    Split a stream of byte chunks into parsed rows, grouped into chunks.
+
+    Blank lines are skipped and do not consume an index. Lines that are not
+    valid JSON, or are too long, are yielded as InvalidJSON / LineTooLong
+    placeholders so the caller can report them at their position.
+
+    Args:
+        chunk_rows: Rows per yielded chunk (the last chunk may be shorter)
+        max_line_bytes: Longest line buffered before it is skipped
+    """
+
+    def __init__(self, chunk_rows: int = 1000, max_line_bytes: int = 64 * 1024):
+        if chunk_rows < 1:
+            raise ValueError(f"chunk_rows must be at least 1, got {chunk_rows}")
+        if max_line_bytes < 1:
+            raise ValueError(f"max_line_bytes must be at least 1, got {max_line_bytes}")
+        self.chunk_rows = chunk_rows
+        self.max_line_bytes = max_line_bytes
+
+    async def chunks(self, stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, List[Any]]]:
+        """
+        Yield (index of the first row, rows) for each chunk of the stream.
+
+        Args:
+            stream: Raw body chunks, e.g. starlette's Request.stream()
+        """
+        start = 0
+        rows: List[Any] = []
+        async for line in self._lines(stream):
+            rows.append(line)
+            if len(rows) == self.chunk_rows:
+                yield start, rows
+                start += len(rows)
+                rows = []
+        if rows:
+            yield start, rows
+
+    async def _lines(self, stream: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+        """Yield the parsed value (or a placeholder) of each non-blank line."""
+        buffer = bytearray()
+        # Set while discarding the rest of an over-long line
+        skipping = False
+        async for data in stream:
+            lines = data.split(b"\n")
+            # The last piece has no newline yet; hold it for the next chunk
+            for i, piece in enumerate(lines):
+                last = i == len(lines) - 1
+                if skipping:
+                    if not last:
+                        skipping = False
+                    continue
+                buffer += piece
+                if len(buffer) > self.max_line_bytes:
+                    buffer.clear()
+                    skipping = last
+                    yield LineTooLong(self.max_line_bytes)
+                    continue
+                if not last:
+                    row = self._parse(buffer)
+                    buffer.clear()
+                    if row is not None:
+                        yield row
+        row = self._parse(buffer)
+        if row is not None:
+            yield row
+
+    @staticmethod
+    def _parse(line: bytes) -> Any:
+        """Parse one line, returning None for a blank line."""
+        if not line.strip():
+            return None
+        try:
+            return fast_decode.loads(bytes(line))
+        except ValueError as e:
+            return InvalidJSON(str(e))
@@ -0,0 +1,208 @@
+"""
+ONNX export of the scaler + model pipeline, served with onnxruntime.
+
+The API only needs scikit-learn at serve time to run model.predict on an
+8-feature vector. This module converts the fitted StandardScaler and the
+selected model into a single ONNX graph with skl2onnx, and OnnxPredictor
+runs that graph on CPU with onnxruntime behind the same predict(X) interface
+as the pickled and compiled models, so serving needs neither scikit-learn
+nor the pickle.
+
+The graph takes raw float64 features. Scaling happens in float64, and for
+tree models the scaled values are then cast to float32 before the splits,
+exactly as scikit-learn's tree code does, so every row takes the same path
+through every tree. onnxruntime's tree ensemble emits float32, so tree
+predictions differ from scikit-learn by float32 rounding of the output
+(about 1e-5 on the 0-100 scale). Linear models stay in float64 throughout.
+
+skl2onnx is needed to export and onnxruntime to serve; both are optional.
+
+Usage:
+    python onnx_model.py models/best_model.pkl models/scaler.pkl models/best_model.onnx --benchmark
+"""
+
+import time
+from typing import Callable, Dict
+
+import numpy as np
+
+try:
+    import onnxruntime as ort
+except ImportError:  # pragma: no cover - optional dependency
+    ort = None
+
+try:
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import DoubleTensorType
+    from skl2onnx.sklapi import CastTransformer
+except ImportError:  # pragma: no cover - optional dependency
+    convert_sklearn = None
+
+ONNX_SUFFIX = ".onnx"
+
+# Largest |difference| from the two-stage sklearn pipeline accepted at export
+PARITY_ATOL = 1e-4
+
+
+class OnnxPredictor:
+    """
+    Raw-feature predictor running an exported ONNX graph with onnxruntime.
+
+    The scaler is part of the graph, so scaler_folded is True and callers
+    skip their own scaler.transform pass, as for fused compiled artifacts.
+
+    Args:
+        model: Path to a .onnx file, or the serialized graph
+        threads: onnxruntime intra-op threads per call; the API's inference
+                 pool already runs calls concurrently, so the default is 1
+    """
+
+    kind = "onnx"
+    scaler_folded = True
+
+    def __init__(self, model, threads: int = 1):
+        if ort is None:
+            raise RuntimeError("The onnx backend requires onnxruntime (pip install onnxruntime)")
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(
+            str(model) if not isinstance(model, bytes) else model,
+            options,
+            providers=["CPUExecutionProvider"]
+        )
+        graph_input = self.session.get_inputs()[0]
+        self.input_name = graph_input.name
+        self.n_features = int(graph_input.shape[1])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict targets for an (n, n_features) raw feature matrix.
+
+        Returns:
+            np.ndarray: n float64 predictions
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(
+                f"Expected a 2-D array with {self.n_features} features, got shape {X.shape}"
+            )
+        output = self.session.run(None, {self.input_name: np.ascontiguousarray(X)})[0]
+        return output.reshape(-1).astype(np.float64)
+
+
+def to_onnx(estimator, scaler) -> bytes:
+    """
+    Convert a fitted scaler and model into one serialized ONNX graph.
+
+    Raises:
+        RuntimeError: If skl2onnx is not installed
+    """
+    if convert_sklearn is None:
+        raise RuntimeError("ONNX export requires skl2onnx (pip install skl2onnx)")
+    # Imported here so serving the graph does not need scikit-learn
+    from sklearn.pipeline import Pipeline
+
+    steps = [("scaler", scaler)]
+    if not hasattr(estimator, "coef_"):
+        # Trees compare float32 inputs; cast after scaling in float64 as sklearn does
+        steps.append(("cast", CastTransformer(dtype=np.float32)))
+    steps.append(("model", estimator))
+    graph = convert_sklearn(
+        Pipeline(steps),
+        initial_types=[("features", DoubleTensorType([None, scaler.n_features_in_]))]
+    )
+    return graph.SerializeToString()
+
+
+def export_onnx(estimator, scaler, path: str) -> OnnxPredictor:
+    """Write the scaler + model graph to path and return a predictor running it."""
+    graph = to_onnx(estimator, scaler)
+    with open(path, "wb") as f:
+        f.write(graph)
+    return OnnxPredictor(graph)
+
+
+def load_onnx(path: str) -> OnnxPredictor:
+    """Load an exported .onnx graph for serving."""
+    return OnnxPredictor(path)
+
+
+def benchmark_backends(
+    engines: Dict[str, Callable[[np.ndarray], np.ndarray]],
+    X: np.ndarray,
+    repeats: int = 200
+) -> Dict:
+    """
+    Time single-row and full-batch predictions for raw-feature scoring functions.
+
+    Args:
+        engines: Backend name to a function scoring a raw feature matrix
+        X: Raw feature rows; the first one is used for single-row timing
+
+    Returns:
+        dict: Mean single-row latency (ms) and batch throughput (rows/s) per backend
+    """
+    results = {}
+    for name, predict in engines.items():
+        row = X[:1]
+        predict(row)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            predict(row)
+        single_ms = (time.perf_counter() - start) / repeats * 1000
+
+        start = time.perf_counter()
+        predict(X)
+        batch_seconds = time.perf_counter() - start
+
+        results[name] = {
+            "single_row_ms": single_ms,
+            "batch_rows_per_second": len(X) / batch_seconds if batch_seconds > 0 else float("inf")
+        }
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import joblib
+
+    from compiled_model import build_fused_predictor, verify_fused
+
+    parser = argparse.ArgumentParser(description="Export the scaler and model as one ONNX graph")
+    parser.add_argument("model_path", help="Pickled forest, decision tree or linear regressor")
+    parser.add_argument("scaler_path", help="Pickled StandardScaler the model was trained with")
+    parser.add_argument("output_path", help="Where to write the .onnx graph")
+    parser.add_argument("--verify-rows", type=int, default=10000,
+                        help="Random rows used to verify parity with sklearn (default: 10000)")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Compare single-row latency and batch throughput with the other backends")
+    args = parser.parse_args()
+
+    estimator = joblib.load(args.model_path)
+    scaler = joblib.load(args.scaler_path)
+    predictor = OnnxPredictor(to_onnx(estimator, scaler))
+
+    X_check = scaler.inverse_transform(
+        np.random.default_rng(42).normal(0.0, 1.5, size=(args.verify_rows, scaler.n_features_in_))
+    )
+    report = verify_fused(estimator, scaler, predictor, X_check, atol=PARITY_ATOL)
+    print(f"Parity on {report['rows']} rows: {report['mismatched_rows']} not bit-identical, "
+          f"max |diff| = {report['max_abs_diff']:.3e}")
+    if not report["passed"]:
+        raise SystemExit(f"ONNX graph differs from sklearn by more than {PARITY_ATOL}; not written")
+
+    export_onnx(estimator, scaler, args.output_path)
+    print(f"Saved ONNX graph to {args.output_path}")
+
+    if args.benchmark:
+        fused = build_fused_predictor(estimator, scaler)
+        engines = {
+            "sklearn": lambda X: estimator.predict(scaler.transform(X)),
+            "fused": fused.predict,
+            "onnx": predictor.predict,
+        }
+        for name, timing in benchmark_backends(engines, X_check).items():
+            print(f"  {name:8s}: {timing['single_row_ms']:.3f} ms/row single, "
+                  f"{timing['batch_rows_per_second']:,.0f} rows/s batch")
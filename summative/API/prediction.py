@@ -5,21 +5,48 @@ This module provides a RESTful API endpoint for predicting patient medication
 adherence rates using a trained machine learning model.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-import joblib
+from fastapi.responses import PlainTextResponse, Response
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
 import numpy as np
+import asyncio
 import logging
+import os
+import shutil
+import sys
+import time
+from collections import defaultdict
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+import columnar
+import fast_decode
+import ndjson_stream
+from fast_decode import FastDecoder
+from inference_pool import InferencePool, PoolSaturatedError
+from logging_config import configure_logging, request_logger
+from metrics import (
+    CONTENT_TYPE, REGISTRY, STAGE_SECONDS, MetricsMiddleware, mark_handler_end, mark_handler_start
 )
+from micro_batcher import MicroBatcher
+from model_bundle import ModelBundle, file_signature, load_bundle, snapshot_files, validate_bundle
+from prediction_cache import PredictionCache, SQLiteStore, cache_key
+
+# Logging settings: LOG_FORMAT=json writes one JSON object per line, LOG_ASYNC
+# moves formatting and writing to a background thread, and LOG_SAMPLE_RATE is
+# the fraction of per-request INFO logs kept (warnings and errors always are)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_ASYNC = os.getenv("LOG_ASYNC", "true").lower() == "true"
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+
+# Configure logging
+configure_logging(level=LOG_LEVEL, json_format=LOG_FORMAT == "json", async_handler=LOG_ASYNC)
 logger = logging.getLogger(__name__)
+request_log = request_logger(__name__, LOG_SAMPLE_RATE)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -37,14 +64,109 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global variables for model and scaler
-model = None
-scaler = None
+# Count and time every request (outermost, so the timing includes CORS handling)
+app.add_middleware(MetricsMiddleware, endpoints=lambda: [route.path for route in app.routes])
+
+# Current model and scaler pair; replaced as a whole on hot reload
+bundle: Optional[ModelBundle] = None
+
+# Runs blocking inference off the event loop (created at startup)
+pool: Optional[InferencePool] = None
+
+# Coalesces concurrent /predict rows into vectorized calls (created at startup)
+batcher: Optional[MicroBatcher] = None
+
+# Serializes reloads triggered by the admin endpoint and the file watcher
+_reload_lock: Optional[asyncio.Lock] = None
+
+# Private copy of the model files loaded by the current process-pool workers,
+# set once a reload has replaced the pool
+_pool_snapshot: Optional[str] = None
+
+# Polls the model files for changes (created at startup when enabled)
+_watch_task: Optional[asyncio.Task] = None
+
+# Caches /predict results for repeated inputs (created at startup when enabled)
+cache: Optional[PredictionCache] = None
+
+# Model backend: "sklearn" loads the pickled estimator, "compiled" the flat-array
+# artifact produced by compiled_model.py (same predictions, much lower latency),
+# "fused" the compiled artifact with the scaler folded in (no transform pass),
+# "onnx" the scaler + model graph run with onnxruntime (requires onnxruntime)
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "sklearn").lower()
+MODEL_FILES = {
+    "sklearn": "best_model.pkl",
+    "compiled": "best_model_compiled.pkl",
+    "fused": "best_model_fused.pkl",
+    "onnx": "best_model.onnx",
+}
+if MODEL_BACKEND not in MODEL_FILES:
+    raise ValueError(f"MODEL_BACKEND must be one of {list(MODEL_FILES)}, got {MODEL_BACKEND!r}")
+
+# Memory-map model arrays so all worker processes share one page-cached copy
+MODEL_MMAP = os.getenv("MODEL_MMAP", "true").lower() == "true"
+
+# Load the model at import time, so a pre-forking server (gunicorn --preload)
+# shares it copy-on-write with every worker instead of loading it per worker
+MODEL_PRELOAD = os.getenv("MODEL_PRELOAD", "false").lower() == "true"
 
 # Model paths
-MODEL_PATH = Path(__file__).parent / "models" / "best_model.pkl"
+MODEL_PATH = Path(__file__).parent / "models" / MODEL_FILES[MODEL_BACKEND]
 SCALER_PATH = Path(__file__).parent / "models" / "scaler.pkl"
 
+# Feature order must match the training data columns in adherence_data.csv
+FEATURE_ORDER = [
+    "age",
+    "num_medications",
+    "medication_complexity",
+    "days_since_start",
+    "missed_doses_last_week",
+    "snooze_frequency",
+    "chronic_conditions",
+    "previous_adherence_rate",
+]
+
+# Upper bound on rows accepted by a single /predict/batch request
+MAX_BATCH_SIZE = 10000
+
+# Upper bound on rows accepted by a single /predict/bulk request
+BULK_MAX_ROWS = int(os.getenv("BULK_MAX_ROWS", "1000000"))
+
+# Arrow bodies carry schema and batch metadata on top of the raw values
+BULK_ARROW_OVERHEAD_BYTES = 1024 * 1024
+
+# /predict/stream scores this many rows per model call; lines longer than
+# STREAM_MAX_LINE_BYTES are reported as errors instead of being buffered
+STREAM_CHUNK_ROWS = int(os.getenv("STREAM_CHUNK_ROWS", "1000"))
+STREAM_MAX_LINE_BYTES = int(os.getenv("STREAM_MAX_LINE_BYTES", "65536"))
+
+# How long /predict/stream waits for room on a saturated inference pool
+# before ending the stream with an error record
+STREAM_MAX_WAIT_SECONDS = float(os.getenv("STREAM_MAX_WAIT_SECONDS", "30"))
+
+# Micro-batching settings for concurrent /predict requests
+MICRO_BATCH_ENABLED = os.getenv("MICRO_BATCH_ENABLED", "true").lower() == "true"
+MICRO_BATCH_WINDOW_MS = float(os.getenv("MICRO_BATCH_WINDOW_MS", "2"))
+MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", "64"))
+
+# Inference worker pool settings ("none" runs inference on the event loop)
+INFERENCE_POOL_KIND = os.getenv("INFERENCE_POOL_KIND", "thread").lower()
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", str(min(4, os.cpu_count() or 1))))
+INFERENCE_MAX_PENDING = int(os.getenv("INFERENCE_MAX_PENDING", "64"))
+INFERENCE_RETRY_AFTER_SECONDS = int(os.getenv("INFERENCE_RETRY_AFTER_SECONDS", "1"))
+
+# Hot reload settings: admin endpoints are disabled unless ADMIN_TOKEN is set,
+# and the model files are polled every MODEL_WATCH_INTERVAL seconds (0 disables)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "0"))
+
+# Prediction cache settings; PREDICTION_CACHE_STORE names a SQLite file shared
+# by all workers on the host (unset keeps the cache in process only)
+PREDICTION_CACHE_ENABLED = os.getenv("PREDICTION_CACHE_ENABLED", "true").lower() == "true"
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "300"))
+PREDICTION_CACHE_STORE = os.getenv("PREDICTION_CACHE_STORE")
+
 
 class PredictionInput(BaseModel):
     """Input model for adherence prediction requests."""
@@ -129,20 +251,486 @@ class PredictionOutput(BaseModel):
     )
 
 
+class BatchPredictionInput(BaseModel):
+    """Input model for batch adherence prediction requests."""
+
+    instances: List[Dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_SIZE,
+        description="Patient feature rows, each with the same fields as /predict"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "instances": [
+                    {
+                        "age": 45,
+                        "num_medications": 3,
+                        "medication_complexity": 2.5,
+                        "days_since_start": 120,
+                        "missed_doses_last_week": 1,
+                        "snooze_frequency": 0.2,
+                        "chronic_conditions": 2,
+                        "previous_adherence_rate": 85.5
+                    },
+                    {
+                        "age": 72,
+                        "num_medications": 8,
+                        "medication_complexity": 4.2,
+                        "days_since_start": 730,
+                        "missed_doses_last_week": 5,
+                        "snooze_frequency": 0.6,
+                        "chronic_conditions": 5,
+                        "previous_adherence_rate": 45.0
+                    }
+                ]
+            }
+        }
+
+
+class BatchRowsInput(BaseModel):
+    """Compact input for batch prediction: one array of feature values per patient."""
+
+    rows: List[List[Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_SIZE,
+        description=f"Feature rows in column order: {', '.join(FEATURE_ORDER)}"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "rows": [
+                    [45, 3, 2.5, 120, 1, 0.2, 2, 85.5],
+                    [72, 8, 4.2, 730, 5, 0.6, 5, 45.0]
+                ]
+            }
+        }
+
+
+class BatchPredictionResult(BaseModel):
+    """Result for a single row of a batch prediction request."""
+
+    index: int = Field(
+        ...,
+        description="Position of the row in the request"
+    )
+    predicted_adherence_rate: Optional[float] = Field(
+        None,
+        description="Predicted adherence rate percentage (0-100), absent if the row was invalid"
+    )
+    confidence: Optional[str] = Field(
+        None,
+        description="Confidence level of prediction, absent if the row was invalid"
+    )
+    errors: Optional[List[Dict[str, Any]]] = Field(
+        None,
+        description="Validation errors for the row, absent if the row was valid"
+    )
+
+
+class BatchPredictionOutput(BaseModel):
+    """Output model for batch adherence prediction responses."""
+
+    results: List[BatchPredictionResult] = Field(
+        ...,
+        description="Per-row results in request order"
+    )
+    total: int = Field(..., description="Number of rows received")
+    succeeded: int = Field(..., description="Number of rows scored")
+    failed: int = Field(..., description="Number of rows rejected by validation")
+    message: str = Field(..., description="Status message")
+
+
+# Queue depths and cache counters are read from their owners at scrape time
+REGISTRY.gauge(
+    "medmind_batcher_queue_depth",
+    "Rows waiting in the micro-batcher queue",
+    lambda: batcher.stats()["queue_depth"] if batcher is not None else 0
+)
+REGISTRY.gauge(
+    "medmind_inference_pending",
+    "Inference calls queued or running on the worker pool",
+    lambda: pool.pending if pool is not None else 0
+)
+REGISTRY.callback_counter(
+    "medmind_inference_rejected_total",
+    "Inference calls rejected with 503 because the pool was saturated",
+    lambda: pool.stats()["rejected"] if pool is not None else 0
+)
+REGISTRY.callback_counter(
+    "medmind_cache_hits_total",
+    "Predictions served from the cache",
+    lambda: cache.stats()["hits"] + cache.stats()["store_hits"] if cache is not None else 0
+)
+REGISTRY.callback_counter(
+    "medmind_cache_misses_total",
+    "Prediction cache lookups that ran the model",
+    lambda: cache.stats()["misses"] if cache is not None else 0
+)
+
+
+# Validates a whole batch in a single pydantic-core call
+_batch_adapter = TypeAdapter(List[PredictionInput])
+
+# Decodes batches into a feature matrix with vectorized PredictionInput checks
+_fast_decoder = FastDecoder(PredictionInput, FEATURE_ORDER)
+
+
+def _confidence_level(prediction: float) -> str:
+    """Map a predicted adherence rate to a confidence tier."""
+    if prediction >= 80:
+        return "high"
+    elif prediction >= 60:
+        return "medium"
+    return "low"
+
+
+def _features_matrix(inputs: List[PredictionInput]) -> np.ndarray:
+    """Stack validated inputs into a contiguous (n, 8) float64 matrix."""
+    features = np.empty((len(inputs), len(FEATURE_ORDER)), dtype=np.float64)
+    for row, item in enumerate(inputs):
+        features[row] = [getattr(item, name) for name in FEATURE_ORDER]
+    return features
+
+
+def _predict_matrix(features: np.ndarray) -> np.ndarray:
+    """Scale and score a feature matrix, clipping predictions to [0, 100]."""
+    # Read the global once: a reload swapping it mid-call must not mix versions
+    current = bundle
+    return current.predict(features)
+
+
+def _load_predictor(model_path: str, scaler_path: str, expected_version: Optional[str] = None):
+    """
+    Load a model and scaler pair and return a function scoring feature matrices.
+    
+    Used to preload a private copy of the model in each process-pool worker.
+    
+    Raises:
+        RuntimeError: If the files no longer hold expected_version, so a
+                      worker never serves a model that was not validated
+    """
+    loaded = load_bundle(model_path, scaler_path, mmap=MODEL_MMAP)
+    if expected_version is not None and loaded.version != expected_version:
+        raise RuntimeError(
+            f"Worker loaded model version {loaded.version}, expected {expected_version}"
+        )
+    return loaded.predict
+
+
+async def _score(features: np.ndarray) -> np.ndarray:
+    """Score a feature matrix on the inference pool, or inline if it is disabled."""
+    start = time.perf_counter()
+    try:
+        if pool is not None and pool.running:
+            return await pool.predict(features)
+        return _predict_matrix(features)
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, "inference")
+
+
+def _saturated_exception(e: PoolSaturatedError) -> HTTPException:
+    """Build the 503 response returned when the inference pool is saturated."""
+    logger.warning(f"Rejecting prediction: {e}")
+    return HTTPException(
+        status_code=503,
+        detail="Prediction service is busy. Please retry shortly.",
+        headers={"Retry-After": str(INFERENCE_RETRY_AFTER_SECONDS)}
+    )
+
+
+def _validate_batch(instances: List[Dict[str, Any]]):
+    """
+    Validate batch rows, separating valid inputs from per-row errors.
+
+    The whole batch is validated in one call; only when some rows fail is the
+    remainder re-validated so the valid rows can still be scored.
+
+    Returns:
+        Tuple of (valid row indices, validated inputs, {row index: errors})
+    """
+    try:
+        return list(range(len(instances))), _batch_adapter.validate_python(instances), {}
+    except ValidationError as e:
+        row_errors = defaultdict(list)
+        for error in e.errors(include_url=False, include_context=False):
+            index, *loc = error["loc"]
+            row_errors[index].append({**error, "loc": loc})
+
+    valid_indices = [i for i in range(len(instances)) if i not in row_errors]
+    valid_inputs = _batch_adapter.validate_python([instances[i] for i in valid_indices])
+    return valid_indices, valid_inputs, dict(row_errors)
+
+
+def _request_validation_error(e: ValidationError) -> RequestValidationError:
+    """Report a body validation failure the way FastAPI does for declared bodies."""
+    return RequestValidationError([
+        {**error, "loc": ("body", *error["loc"])}
+        for error in e.errors(include_url=False)
+    ])
+
+
+def _decode_fast(payload: Any):
+    """
+    Decode a batch body into a feature matrix, checking all rows at once.
+    
+    Accepts {"instances": [{...}, ...]} like /predict/batch, or the compact
+    {"rows": [[...], ...]} form with values in FEATURE_ORDER. Rows failing the
+    vectorized checks, and bodies that cannot be converted to a numeric
+    matrix, are validated by pydantic so errors match /predict/batch.
+    
+    Returns:
+        Tuple of (number of rows, valid row indices, feature matrix of the
+        valid rows, {row index: errors})
+        
+    Raises:
+        RequestValidationError: If the body itself is malformed
+    """
+    compact = isinstance(payload, dict) and "rows" in payload
+    envelope = BatchRowsInput if compact else BatchPredictionInput
+    rows = payload.get("rows" if compact else "instances") if isinstance(payload, dict) else None
+    if not fast_decode.is_sized_list(rows, MAX_BATCH_SIZE) or (
+        not compact and not all(isinstance(row, dict) for row in rows)
+    ):
+        try:
+            envelope.model_validate(payload)
+        except ValidationError as e:
+            raise _request_validation_error(e)
+    
+    return (len(rows), *_decode_rows(rows, compact))
+
+
+def _decode_rows(rows: List[Any], compact: bool):
+    """
+    Decode and validate a list of row objects (or arrays, if compact).
+    
+    Returns:
+        Tuple of (valid row indices, feature matrix of the valid rows,
+        {row index: errors})
+    """
+    matrix = _fast_decoder.decode_rows(rows) if compact else _fast_decoder.decode_objects(rows)
+    if matrix is None:
+        # Strings, nulls, missing fields or ragged rows: validate the slow way
+        instances = [_fast_decoder.row_object(row) for row in rows] if compact else rows
+        valid_indices, valid_inputs, row_errors = _validate_batch(instances)
+        return valid_indices, _features_matrix(valid_inputs), row_errors
+    
+    valid = _fast_decoder.valid_rows(matrix)
+    if valid.all():
+        return list(range(len(rows))), matrix, {}
+    
+    # Let pydantic report errors for the flagged rows (and accept any the
+    # vectorized checks were stricter about)
+    flagged = np.flatnonzero(~valid).tolist()
+    rechecked_indices, rechecked_inputs, flagged_errors = _validate_batch(
+        [_fast_decoder.row_object(rows[i]) for i in flagged]
+    )
+    row_errors = {flagged[i]: errors for i, errors in flagged_errors.items()}
+    for i in rechecked_indices:
+        valid[flagged[i]] = True
+    if rechecked_inputs:
+        matrix[[flagged[i] for i in rechecked_indices]] = _features_matrix(rechecked_inputs)
+    
+    valid_indices = np.flatnonzero(valid)
+    return valid_indices.tolist(), matrix[valid_indices], row_errors
+
+
+def _memory_usage_mb() -> Dict[str, float]:
+    """
+    Resident and shared memory of this process in MB.
+    
+    Reads /proc/self/statm on Linux; elsewhere falls back to peak RSS.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            _, resident, shared = (int(v) for v in f.read().split()[:3])
+        page_mb = os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+        return {"resident": resident * page_mb, "shared": shared * page_mb}
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return {"resident": peak / divisor, "shared": 0.0}
+
+
+def _log_memory(stage: str, usage: Dict[str, float]) -> None:
+    logger.info(
+        f"Worker {os.getpid()} memory {stage}: resident {usage['resident']:.1f} MB "
+        f"(shared {usage['shared']:.1f} MB)"
+    )
+
+
+def _load_artifacts() -> None:
+    """Load the model and scaler into the current bundle, logging memory use."""
+    global bundle
+    
+    _log_memory("before model load", _memory_usage_mb())
+    
+    logger.info(
+        f"Loading {MODEL_BACKEND} model from {MODEL_PATH} and scaler from "
+        f"{SCALER_PATH} (mmap={MODEL_MMAP})"
+    )
+    start = time.perf_counter()
+    bundle = load_bundle(MODEL_PATH, SCALER_PATH, mmap=MODEL_MMAP)
+    logger.info(
+        f"Model and scaler loaded successfully (version {bundle.version}) in "
+        f"{(time.perf_counter() - start) * 1000:.0f} ms"
+    )
+    
+    _log_memory("after model load", _memory_usage_mb())
+
+
+class ReloadRejectedError(Exception):
+    """Raised when a candidate model fails validation and is not swapped in."""
+
+
+def _new_pool(
+    model_path: Path = None,
+    scaler_path: Path = None,
+    expected_version: Optional[str] = None
+) -> InferencePool:
+    """Create an inference pool scoring with the given (default: current) model files."""
+    return InferencePool(
+        _predict_matrix,
+        kind=INFERENCE_POOL_KIND,
+        workers=INFERENCE_WORKERS,
+        max_pending=INFERENCE_MAX_PENDING,
+        loader=partial(
+            _load_predictor,
+            str(model_path or MODEL_PATH),
+            str(scaler_path or SCALER_PATH),
+            expected_version
+        )
+    )
+
+
+def _retire_pool(old_pool: InferencePool, snapshot_dir: Optional[str]) -> None:
+    """Drain a replaced pool, then delete the model snapshot its workers loaded."""
+    # Calls already queued on the old workers finish on the old model
+    old_pool.stop(cancel_pending=False)
+    _discard_snapshot(snapshot_dir)
+
+
+def _discard_snapshot(snapshot_dir: Optional[str]) -> None:
+    """Delete a model snapshot that was not swapped in."""
+    if snapshot_dir is not None:
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+
+async def reload_model(force: bool = False) -> Dict[str, Any]:
+    """
+    Load the model files in the background, validate them and swap them in.
+    
+    Loading and validation run on a worker thread so requests keep being
+    served by the current model meanwhile. The swap replaces the bundle
+    reference in one assignment: requests that already picked up the old
+    bundle finish on it, later requests use the new one. Process-pool workers
+    hold their own copies, so the pool is replaced and the old one drained
+    in the background. With a process pool the candidate is loaded from a
+    private snapshot of the files, and the new workers load that same
+    snapshot, so they serve exactly the version that was validated.
+    
+    Args:
+        force: Swap even if the files are unchanged
+        
+    Returns:
+        dict: Outcome, previous and current versions, and the validation report
+        
+    Raises:
+        ReloadRejectedError: If the candidate fails validation
+    """
+    global bundle, pool, _pool_snapshot
+    
+    async with _reload_lock:
+        loop = asyncio.get_running_loop()
+        current = bundle
+        model_path, scaler_path = MODEL_PATH, SCALER_PATH
+        snapshot_dir = None
+        if pool is not None and pool.kind == "process":
+            model_path, scaler_path = await loop.run_in_executor(
+                None, snapshot_files, MODEL_PATH, SCALER_PATH
+            )
+            snapshot_dir = os.path.dirname(model_path)
+        try:
+            candidate = await loop.run_in_executor(
+                None, partial(load_bundle, model_path, scaler_path, mmap=MODEL_MMAP)
+            )
+        except Exception:
+            _discard_snapshot(snapshot_dir)
+            raise
+        previous_version = current.version if current is not None else None
+        
+        if not force and candidate.version == previous_version:
+            _discard_snapshot(snapshot_dir)
+            logger.info(f"Model files unchanged (version {candidate.version}), keeping current model")
+            return {
+                "status": "unchanged",
+                "previous_version": previous_version,
+                "version": candidate.version
+            }
+        
+        report = await loop.run_in_executor(None, validate_bundle, candidate, current)
+        if not report["valid"]:
+            _discard_snapshot(snapshot_dir)
+            logger.error(f"Rejected model version {candidate.version}: {report['reason']}")
+            raise ReloadRejectedError(report["reason"])
+        
+        if snapshot_dir is not None:
+            new_pool = _new_pool(model_path, scaler_path, candidate.version)
+            await loop.run_in_executor(None, new_pool.start)
+            old_pool, pool = pool, new_pool
+            old_snapshot, _pool_snapshot = _pool_snapshot, snapshot_dir
+            loop.run_in_executor(None, _retire_pool, old_pool, old_snapshot)
+        
+        bundle = candidate
+        logger.info(f"Swapped model version {previous_version} -> {candidate.version}")
+        _log_memory("after model reload", _memory_usage_mb())
+        
+        return {
+            "status": "reloaded",
+            "previous_version": previous_version,
+            "version": candidate.version,
+            "validation": report
+        }
+
+
+async def _watch_model_files(interval: float) -> None:
+    """Reload the model whenever its files change on disk."""
+    last_seen = bundle.signature if bundle is not None else None
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            signature = file_signature(MODEL_PATH, SCALER_PATH)
+        except FileNotFoundError:
+            # Files are mid-replacement; check again on the next tick
+            continue
+        if signature == last_seen:
+            continue
+        last_seen = signature
+        
+        logger.info("Model files changed on disk, reloading")
+        try:
+            await reload_model()
+        except Exception as e:
+            # Keep serving the current model until the files change again
+            logger.error(f"Model reload failed, keeping current model: {e}", exc_info=True)
+
+
 @app.on_event("startup")
 async def load_model():
     """Load the trained model and scaler at startup."""
-    global model, scaler
+    if bundle is not None:
+        logger.info("Using model preloaded before fork")
+        _log_memory("at startup", _memory_usage_mb())
+        return
     
     try:
-        logger.info(f"Loading model from {MODEL_PATH}")
-        model = joblib.load(MODEL_PATH)
-        logger.info("Model loaded successfully")
-        
-        logger.info(f"Loading scaler from {SCALER_PATH}")
-        scaler = joblib.load(SCALER_PATH)
-        logger.info("Scaler loaded successfully")
-        
+        _load_artifacts()
     except FileNotFoundError as e:
         logger.error(f"Model or scaler file not found: {e}", exc_info=True)
         raise
@@ -151,6 +739,106 @@ async def load_model():
         raise
 
 
+if MODEL_PRELOAD:
+    _load_artifacts()
+
+
+@app.on_event("startup")
+async def start_inference():
+    """Start the inference pool and micro-batcher once the model is loaded."""
+    global pool, batcher
+    
+    if INFERENCE_POOL_KIND == "none":
+        logger.info("Inference pool disabled, scoring on the event loop")
+    else:
+        pool = _new_pool()
+        pool.start()
+    
+    if not MICRO_BATCH_ENABLED:
+        logger.info("Micro-batching disabled")
+        return
+    
+    batcher = MicroBatcher(
+        _score,
+        window_ms=MICRO_BATCH_WINDOW_MS,
+        max_batch_size=MICRO_BATCH_MAX_SIZE
+    )
+    await batcher.start()
+
+
+@app.on_event("startup")
+async def start_cache():
+    """Create the prediction cache if enabled."""
+    global cache
+    
+    if not PREDICTION_CACHE_ENABLED:
+        logger.info("Prediction cache disabled")
+        return
+    
+    store = SQLiteStore(PREDICTION_CACHE_STORE) if PREDICTION_CACHE_STORE else None
+    cache = PredictionCache(
+        max_entries=PREDICTION_CACHE_SIZE,
+        ttl_seconds=PREDICTION_CACHE_TTL_SECONDS,
+        store=store
+    )
+    logger.info(
+        f"Prediction cache enabled (size={PREDICTION_CACHE_SIZE}, "
+        f"ttl={PREDICTION_CACHE_TTL_SECONDS}s, store={PREDICTION_CACHE_STORE})"
+    )
+
+
+@app.on_event("shutdown")
+async def stop_cache():
+    """Close the prediction cache's shared store."""
+    global cache
+    
+    if cache is not None:
+        cache.close()
+    cache = None
+
+
+@app.on_event("startup")
+async def start_hot_reload():
+    """Create the reload lock and start the model file watcher if enabled."""
+    global _reload_lock, _watch_task
+    
+    _reload_lock = asyncio.Lock()
+    if MODEL_WATCH_INTERVAL > 0:
+        _watch_task = asyncio.create_task(_watch_model_files(MODEL_WATCH_INTERVAL))
+        logger.info(f"Watching model files for changes every {MODEL_WATCH_INTERVAL}s")
+
+
+@app.on_event("shutdown")
+async def stop_hot_reload():
+    """Stop the model file watcher."""
+    global _watch_task
+    
+    if _watch_task is not None:
+        _watch_task.cancel()
+        try:
+            await _watch_task
+        except asyncio.CancelledError:
+            pass
+        _watch_task = None
+
+
+@app.on_event("shutdown")
+async def stop_inference():
+    """Stop the micro-batcher and then the inference pool."""
+    global pool, batcher, _pool_snapshot
+    
+    if batcher is not None:
+        await batcher.stop()
+        batcher = None
+    
+    if pool is not None:
+        pool.stop()
+        pool = None
+    
+    _discard_snapshot(_pool_snapshot)
+    _pool_snapshot = None
+
+
 @app.get("/")
 async def root():
     """Root endpoint providing API information."""
@@ -165,16 +853,95 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    model_loaded = model is not None
-    scaler_loaded = scaler is not None
+    current = bundle
+    model_loaded = current is not None and current.model is not None
+    # Fused and ONNX models include the scaler, so no separate scaler is loaded
+    scaler_folded = model_loaded and getattr(current.model, "scaler_folded", False)
+    scaler_loaded = current is not None and (current.scaler is not None or scaler_folded)
     
     return {
         "status": "healthy" if (model_loaded and scaler_loaded) else "unhealthy",
         "model_loaded": model_loaded,
-        "scaler_loaded": scaler_loaded
+        "scaler_loaded": scaler_loaded,
+        "scaler_folded": scaler_folded,
+        "model_backend": MODEL_BACKEND,
+        "model_version": current.version if current is not None else None
     }
 
 
+@app.post("/admin/reload")
+async def admin_reload(force: bool = False, x_admin_token: Optional[str] = Header(None)):
+    """
+    Reload the model and scaler from disk without restarting the server.
+    
+    Requires the X-Admin-Token header to match the ADMIN_TOKEN setting. The
+    candidate is validated against canned inputs before it replaces the
+    current model; a rejected candidate leaves the current model in place.
+    
+    Args:
+        force: Swap even if the model files are unchanged
+        
+    Raises:
+        HTTPException: 403 if the token is missing or wrong, 422 if the
+                       candidate fails validation, 500 if it cannot be loaded
+    """
+    if not ADMIN_TOKEN or x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin token required")
+    
+    try:
+        return await reload_model(force=force)
+    except ReloadRejectedError as e:
+        raise HTTPException(
+            status_code=422,
+            detail=f"New model failed validation, keeping current model: {e}"
+        )
+    except Exception as e:
+        logger.error(f"Model reload failed: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Model reload failed, keeping current model: {e}"
+        )
+
+
+@app.get("/stats/batching")
+async def batching_stats():
+    """Report micro-batcher settings and the achieved batch-size histogram."""
+    if batcher is None:
+        return {
+            "enabled": False,
+            "window_ms": MICRO_BATCH_WINDOW_MS,
+            "max_batch_size": MICRO_BATCH_MAX_SIZE
+        }
+    return batcher.stats()
+
+
+@app.get("/stats/inference")
+async def inference_stats():
+    """Report inference pool settings, queue depth and rejections."""
+    if pool is None:
+        return {
+            "enabled": False,
+            "kind": INFERENCE_POOL_KIND,
+            "workers": INFERENCE_WORKERS,
+            "max_pending": INFERENCE_MAX_PENDING
+        }
+    return pool.stats()
+
+
+@app.get("/stats/cache")
+async def cache_stats():
+    """Report prediction cache settings and hit/miss counts."""
+    if cache is None:
+        return {"enabled": False}
+    return cache.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Export request counts and per-stage latency histograms for Prometheus."""
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 @app.post("/predict", response_model=PredictionOutput)
 async def predict_adherence(input_data: PredictionInput):
     """
@@ -189,8 +956,11 @@ async def predict_adherence(input_data: PredictionInput):
     Raises:
         HTTPException: If model is not loaded or prediction fails
     """
-    # Check if model and scaler are loaded
-    if model is None or scaler is None:
+    mark_handler_start()
+    
+    # Check if model and scaler are loaded, pinning the version for this request
+    current = bundle
+    if current is None:
         logger.error("Model or scaler not loaded")
         raise HTTPException(
             status_code=500,
@@ -199,46 +969,51 @@ async def predict_adherence(input_data: PredictionInput):
     
     try:
         # Log the prediction request
-        logger.info(f"Prediction request received: {input_data.dict()}")
+        # Formatted lazily on the logging thread, and only if sampled
+        request_log.info(
+            "Prediction request received: %s", vars(input_data),
+            extra={"event": "prediction_request"}
+        )
         
         # Prepare features in the correct order
-        features = np.array([[
-            input_data.age,
-            input_data.num_medications,
-            input_data.medication_complexity,
-            input_data.days_since_start,
-            input_data.missed_doses_last_week,
-            input_data.snooze_frequency,
-            input_data.chronic_conditions,
-            input_data.previous_adherence_rate
-        ]])
-        
-        # Preprocess features using the scaler
-        features_scaled = scaler.transform(features)
-        
-        # Make prediction
-        prediction = model.predict(features_scaled)[0]
-        
-        # Ensure prediction is within valid range
-        prediction = float(np.clip(prediction, 0.0, 100.0))
+        features = _features_matrix([input_data])
+        
+        # Repeated inputs skip the scaler and model entirely
+        key = cache_key(features[0], current.version) if cache is not None else None
+        prediction = await cache.get_async(key) if key is not None else None
+        cached = prediction is not None
+        
+        if prediction is None:
+            # Preprocess, predict and clip to the valid range, coalescing with
+            # concurrent requests when the micro-batcher is running
+            if batcher is not None and batcher.running:
+                prediction = await batcher.submit(features[0])
+            else:
+                prediction = float((await _score(features))[0])
+            
+            # Don't file a result under the old version if a reload swapped
+            # the model while this request was being scored
+            if key is not None and bundle is current:
+                cache.put_async(key, prediction)
         
         # Determine confidence level based on prediction value
-        if prediction >= 80:
-            confidence = "high"
-        elif prediction >= 60:
-            confidence = "medium"
-        else:
-            confidence = "low"
+        confidence = _confidence_level(prediction)
         
         # Log the prediction result
-        logger.info(f"Prediction successful: {prediction:.2f}%")
+        request_log.info(
+            "Prediction successful: %.2f%%", prediction,
+            extra={"event": "prediction_result", "prediction": prediction, "cached": cached}
+        )
         
+        mark_handler_end()
         return PredictionOutput(
             predicted_adherence_rate=round(prediction, 2),
             confidence=confidence,
             message="Prediction successful"
         )
         
+    except PoolSaturatedError as e:
+        raise _saturated_exception(e)
     except Exception as e:
         logger.error(f"Prediction failed: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -247,6 +1022,464 @@ async def predict_adherence(input_data: PredictionInput):
         )
 
 
+@app.post("/predict/batch", response_model=BatchPredictionOutput)
+async def predict_adherence_batch(batch: BatchPredictionInput):
+    """
+    Predict adherence rates for many patients in a single request.
+    
+    Rows are validated individually so an invalid row is reported in its
+    result instead of failing the whole batch. Valid rows are stacked into
+    one feature matrix and scored with a single scaler and model call.
+    
+    Args:
+        batch: Patient feature rows to score
+        
+    Returns:
+        BatchPredictionOutput: Per-row results in request order
+        
+    Raises:
+        HTTPException: If model is not loaded or prediction fails
+    """
+    mark_handler_start()
+    
+    if bundle is None:
+        logger.error("Model or scaler not loaded")
+        raise HTTPException(
+            status_code=500,
+            detail="Model not loaded. Please contact support."
+        )
+    
+    total = len(batch.instances)
+    request_log.info(
+        "Batch prediction request received: %d rows", total,
+        extra={"event": "batch_request", "rows": total}
+    )
+    
+    start = time.perf_counter()
+    valid_indices, valid_inputs, row_errors = _validate_batch(batch.instances)
+    STAGE_SECONDS.observe(time.perf_counter() - start, "validate")
+    
+    return await _batch_response(total, valid_indices, _features_matrix(valid_inputs), row_errors)
+
+
+async def _batch_response(
+    total: int,
+    valid_indices: List[int],
+    features: np.ndarray,
+    row_errors: Dict[int, List[Dict[str, Any]]]
+) -> BatchPredictionOutput:
+    """Score the valid rows of a batch and build per-row results in request order."""
+    results = [BatchPredictionResult(index=i) for i in range(total)]
+    for index, errors in row_errors.items():
+        results[index].errors = errors
+    
+    if valid_indices:
+        try:
+            predictions = await _score(features)
+        except PoolSaturatedError as e:
+            raise _saturated_exception(e)
+        except Exception as e:
+            logger.error(f"Batch prediction failed: {str(e)}", exc_info=True)
+            raise HTTPException(
+                status_code=500,
+                detail=f"Prediction failed: {str(e)}"
+            )
+        
+        for index, prediction in zip(valid_indices, predictions.tolist()):
+            results[index].predicted_adherence_rate = round(prediction, 2)
+            results[index].confidence = _confidence_level(prediction)
+    
+    request_log.info(
+        "Batch prediction complete: %d scored, %d rejected", len(valid_indices), len(row_errors),
+        extra={"event": "batch_result", "succeeded": len(valid_indices), "failed": len(row_errors)}
+    )
+    
+    mark_handler_end()
+    return BatchPredictionOutput(
+        results=results,
+        total=total,
+        succeeded=len(valid_indices),
+        failed=len(row_errors),
+        message="Batch prediction complete"
+    )
+
+
+@app.post(
+    "/predict/batch/fast",
+    response_model=BatchPredictionOutput,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "anyOf": [
+                            BatchPredictionInput.model_json_schema(),
+                            BatchRowsInput.model_json_schema()
+                        ]
+                    }
+                }
+            }
+        }
+    }
+)
+async def predict_adherence_batch_fast(request: Request):
+    """
+    Predict adherence rates for many patients, decoding straight into NumPy.
+    
+    Same results and per-row errors as /predict/batch, but the body is parsed
+    without building a pydantic object per row and all field constraints are
+    checked with vectorized comparisons. Also accepts the compact form
+    {"rows": [[age, num_medications, ...], ...]} in training column order.
+    
+    Returns:
+        BatchPredictionOutput: Per-row results in request order
+        
+    Raises:
+        HTTPException: If model is not loaded or prediction fails
+    """
+    mark_handler_start()
+    
+    if bundle is None:
+        logger.error("Model or scaler not loaded")
+        raise HTTPException(
+            status_code=500,
+            detail="Model not loaded. Please contact support."
+        )
+    
+    start = time.perf_counter()
+    body = await request.body()
+    try:
+        payload = fast_decode.loads(body)
+    except ValueError as e:
+        raise RequestValidationError([{
+            "type": "json_invalid",
+            "loc": ("body", 0),
+            "msg": "JSON decode error",
+            "input": {},
+            "ctx": {"error": str(e)}
+        }])
+    total, valid_indices, features, row_errors = _decode_fast(payload)
+    STAGE_SECONDS.observe(time.perf_counter() - start, "validate")
+    
+    request_log.info(
+        "Batch prediction request received: %d rows", total,
+        extra={"event": "batch_request", "rows": total}
+    )
+    
+    return await _batch_response(total, valid_indices, features, row_errors)
+
+
+def _too_many_rows(rows: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"Request has {rows} rows; the limit is {BULK_MAX_ROWS}"
+    )
+
+
+async def _read_bulk_body(request: Request, arrow: bool) -> bytearray:
+    """
+    Receive a /predict/bulk body, rejecting oversized uploads before buffering them.
+    
+    The body may be at most the size of a BULK_MAX_ROWS matrix (plus Arrow
+    metadata), checked against Content-Length up front and against the bytes
+    received so far for chunked uploads. For the raw matrix format the row
+    count is read from the header as soon as it arrives, so a request over
+    BULK_MAX_ROWS gets its 413 without the rest of the body being read, and
+    the chunks are collected into a single buffer of the announced size.
+    
+    Raises:
+        HTTPException: 413 if the body or its row count is over the limit
+        ColumnarFormatError: If the matrix header is malformed or the body
+                             length does not match it
+    """
+    limit = columnar.matrix_body_size(BULK_MAX_ROWS, FEATURE_ORDER)
+    if arrow:
+        limit += BULK_ARROW_OVERHEAD_BYTES
+    
+    declared = request.headers.get("content-length")
+    declared = int(declared) if declared and declared.isdigit() else None
+    if declared is not None and declared > limit:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Request body is {declared} bytes; the limit is {limit}"
+        )
+    
+    body = bytearray()
+    expected = None
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise HTTPException(status_code=413, detail=f"Request body exceeds {limit} bytes")
+        if arrow:
+            continue
+        if expected is None and len(body) >= columnar.MATRIX_HEADER_SIZE:
+            rows, expected = columnar.read_matrix_header(body)
+            if rows > BULK_MAX_ROWS:
+                raise _too_many_rows(rows)
+            if declared is not None and declared != expected:
+                raise columnar.ColumnarFormatError(
+                    f"Expected {expected} bytes for {rows} rows, Content-Length is {declared}"
+                )
+        if expected is not None and len(body) > expected:
+            raise columnar.ColumnarFormatError(
+                f"Expected {expected} bytes for {rows} rows, got more"
+            )
+    return body
+
+
+@app.post(
+    "/predict/bulk",
+    response_class=Response,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                columnar.MATRIX_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}},
+                columnar.ARROW_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}
+            }
+        }
+    }
+)
+async def predict_adherence_bulk(request: Request):
+    """
+    Score a binary feature matrix and return predictions as columns.
+    
+    The body is a raw little-endian float64 matrix with a header naming the
+    eight columns in training order, or an Arrow IPC stream if pyarrow is
+    installed (see columnar.py for the layouts). The body is received into one
+    buffer, which the matrix views without a further copy, and scored with a
+    single call; the response uses the request's format. Oversized uploads
+    are refused from Content-Length or the matrix header before the rest of
+    the body is read.
+    Rows failing the PredictionInput constraints get a NaN (or null)
+    prediction and the invalid confidence code instead of error details.
+    
+    Returns:
+        Response: Columnar predictions with X-Rows and X-Failed headers
+        
+    Raises:
+        HTTPException: 400 for a malformed body, 413 above BULK_MAX_ROWS rows,
+                       415 for an unsupported content type, 500 if the model
+                       is not loaded or prediction fails
+    """
+    mark_handler_start()
+    
+    if bundle is None:
+        logger.error("Model or scaler not loaded")
+        raise HTTPException(
+            status_code=500,
+            detail="Model not loaded. Please contact support."
+        )
+    
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if media_type not in (columnar.MATRIX_MEDIA_TYPE, columnar.ARROW_MEDIA_TYPE):
+        raise HTTPException(
+            status_code=415,
+            detail=f"Content-Type must be {columnar.MATRIX_MEDIA_TYPE} or {columnar.ARROW_MEDIA_TYPE}"
+        )
+    arrow = media_type == columnar.ARROW_MEDIA_TYPE
+    if arrow and not columnar.ARROW_AVAILABLE:
+        raise HTTPException(status_code=415, detail="Arrow input requires pyarrow on the server")
+    
+    start = time.perf_counter()
+    try:
+        body = await _read_bulk_body(request, arrow)
+        if arrow:
+            features = columnar.decode_arrow(body, FEATURE_ORDER)
+        else:
+            features = columnar.decode_matrix(body, FEATURE_ORDER)
+    except columnar.ColumnarFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    total = len(features)
+    if total == 0:
+        raise HTTPException(status_code=400, detail="Request contains no rows")
+    if total > BULK_MAX_ROWS:
+        raise _too_many_rows(total)
+    
+    valid = _fast_decoder.valid_rows(features)
+    failed = int(total - valid.sum())
+    STAGE_SECONDS.observe(time.perf_counter() - start, "validate")
+    
+    request_log.info(
+        "Bulk prediction request received: %d rows", total,
+        extra={"event": "bulk_request", "rows": total, "format": media_type}
+    )
+    
+    predictions = np.full(total, np.nan)
+    if failed < total:
+        try:
+            predictions[valid] = await _score(features if failed == 0 else features[valid])
+        except PoolSaturatedError as e:
+            raise _saturated_exception(e)
+        except Exception as e:
+            logger.error(f"Bulk prediction failed: {str(e)}", exc_info=True)
+            raise HTTPException(
+                status_code=500,
+                detail=f"Prediction failed: {str(e)}"
+            )
+    
+    # Tiers come from the unrounded predictions, as in the JSON endpoints
+    codes = columnar.confidence_codes(predictions, valid)
+    predictions = np.round(predictions, 2)
+    
+    if arrow:
+        content = columnar.encode_arrow(predictions, codes, valid)
+    else:
+        content = columnar.encode_predictions(predictions, codes)
+    
+    mark_handler_end()
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={"X-Rows": str(total), "X-Failed": str(failed)}
+    )
+
+
+async def _score_waiting(features: np.ndarray) -> np.ndarray:
+    """
+    Score a feature matrix, waiting up to STREAM_MAX_WAIT_SECONDS for room on the pool.
+    
+    Raises:
+        PoolSaturatedError: If the pool stays saturated for the whole wait
+    """
+    deadline = time.monotonic() + STREAM_MAX_WAIT_SECONDS
+    while True:
+        try:
+            return await _score(features)
+        except PoolSaturatedError:
+            if time.monotonic() >= deadline:
+                raise
+            # Not reading more of the body meanwhile pushes back on the client
+            await asyncio.sleep(0.01)
+
+
+def _score_chunk_error(message: str) -> Dict[str, Any]:
+    """Error reported for rows of a chunk that could not be scored."""
+    return {"type": "prediction_failed", "loc": [], "msg": message}
+
+
+async def _stream_results(request: Request):
+    """
+    Score NDJSON rows chunk by chunk, yielding one NDJSON result line per row.
+    
+    The status line is already sent when scoring starts, so failures are
+    reported in the body: a chunk that fails to score gets an error on each
+    of its rows, and if the pool stays saturated past STREAM_MAX_WAIT_SECONDS
+    the stream ends with an {"error": ...} record instead of more results.
+    """
+    reader = ndjson_stream.NDJSONReader(STREAM_CHUNK_ROWS, STREAM_MAX_LINE_BYTES)
+    total = succeeded = 0
+    async for start, rows in reader.chunks(request.stream()):
+        results = [BatchPredictionResult(index=start + i) for i in range(len(rows))]
+        
+        # Unparsable and over-long lines are reported without validation
+        positions = []
+        for i, row in enumerate(rows):
+            if isinstance(row, (ndjson_stream.InvalidJSON, ndjson_stream.LineTooLong)):
+                results[i].errors = [row.error()]
+            else:
+                positions.append(i)
+        
+        # Array rows take the compact fast path when the whole chunk uses them
+        parsed = [rows[i] for i in positions]
+        compact = all(isinstance(row, list) for row in parsed)
+        if not compact:
+            parsed = [_fast_decoder.row_object(row) for row in parsed]
+        
+        saturated = None
+        if parsed:
+            try:
+                valid_indices, features, row_errors = _decode_rows(parsed, compact)
+                for index, errors in row_errors.items():
+                    results[positions[index]].errors = errors
+                
+                if valid_indices:
+                    predictions = await _score_waiting(features)
+                    for index, prediction in zip(valid_indices, predictions.tolist()):
+                        result = results[positions[index]]
+                        result.predicted_adherence_rate = round(prediction, 2)
+                        result.confidence = _confidence_level(prediction)
+                    succeeded += len(valid_indices)
+            except Exception as e:
+                if isinstance(e, PoolSaturatedError):
+                    saturated = e
+                    logger.warning(f"Stream prediction stopped at row {start}: {e}")
+                    message = "Prediction service is busy. Please retry shortly."
+                else:
+                    logger.error(f"Stream prediction failed for rows {start}-{start + len(rows) - 1}: {e}", exc_info=True)
+                    message = f"Prediction failed: {e}"
+                for i in positions:
+                    results[i].predicted_adherence_rate = results[i].confidence = None
+                    results[i].errors = [_score_chunk_error(message)]
+        
+        total += len(rows)
+        yield b"".join(
+            fast_decode.dumps(result.model_dump(exclude_none=True)) + b"\n" for result in results
+        )
+        if saturated is not None:
+            yield fast_decode.dumps({
+                "error": "Prediction service is busy. Please retry shortly.",
+                "rows_read": total
+            }) + b"\n"
+            break
+    
+    request_log.info(
+        "Stream prediction complete: %d rows, %d scored, %d rejected",
+        total, succeeded, total - succeeded,
+        extra={"event": "stream_result", "rows": total, "succeeded": succeeded,
+               "failed": total - succeeded}
+    )
+
+
+@app.post(
+    "/predict/stream",
+    response_class=ndjson_stream.NDJSONResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                ndjson_stream.MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}
+            }
+        }
+    }
+)
+async def predict_adherence_stream(request: Request):
+    """
+    Score a newline-delimited JSON body of any size, streaming results back.
+    
+    Each line is a patient object with the /predict fields, or an array of
+    values in training column order. The body is read incrementally and
+    scored STREAM_CHUNK_ROWS rows at a time, and each chunk's results are
+    written out before the next is read, so memory use does not grow with
+    the input. Every non-blank line gets one result line with its index and
+    either a prediction or its errors, as in /predict/batch.
+    
+    Returns:
+        NDJSONResponse: NDJSON results in request order
+        
+    Raises:
+        HTTPException: If model is not loaded
+    """
+    mark_handler_start()
+    
+    if bundle is None:
+        logger.error("Model or scaler not loaded")
+        raise HTTPException(
+            status_code=500,
+            detail="Model not loaded. Please contact support."
+        )
+    
+    request_log.info(
+        "Stream prediction request received",
+        extra={"event": "stream_request"}
+    )
+    
+    mark_handler_end()
+    return ndjson_stream.NDJSONResponse(_stream_results(request))
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
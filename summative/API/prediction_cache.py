@@ -0,0 +1,251 @@
+"""
+Cache of /predict results keyed by quantized feature vector and model version.
+
+The mobile app re-requests the same patient's score on every dashboard load,
+and the eight input fields change rarely, so most single-row predictions are
+repeats. PredictionCache keeps recent results in an in-process LRU with a
+time-to-live and can be backed by a SQLite file shared by all workers on the
+host. Keys hash the feature row (rounded to a fixed number of decimals, so
+float noise in client payloads does not defeat the cache) together with the
+model version, so a hot-reloaded model never serves its predecessor's results.
+
+The shared store is a file other workers write to, so its queries can block
+on locks. The API uses get_async/put_async, which run store queries on a
+dedicated thread instead of the event loop; store failures are logged and
+treated as misses rather than failing the request.
+"""
+
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Decimals kept when quantizing features for the cache key
+KEY_DECIMALS = 6
+
+
+def cache_key(features: np.ndarray, model_version: str, decimals: int = KEY_DECIMALS) -> str:
+    """
+    Canonical hash of a feature row and model version.
+
+    Args:
+        features: 1-D array of the 8 model features
+        model_version: Version of the model producing the prediction
+        decimals: Decimals kept when quantizing the features
+
+    Returns:
+        str: 32-character hex digest
+    """
+    # + 0.0 turns -0.0 into 0.0 so both hash the same
+    quantized = np.round(np.asarray(features, dtype=np.float64), decimals) + 0.0
+    digest = hashlib.blake2b(quantized.tobytes(), digest_size=16)
+    digest.update(model_version.encode())
+    return digest.hexdigest()
+
+
+class SQLiteStore:
+    """
+    Prediction store in a local SQLite file, shared by every worker process.
+
+    Args:
+        path: Database file; created if missing
+        cleanup_every: Number of writes between purges of expired rows
+    """
+
+    def __init__(self, path: str, cleanup_every: int = 1000):
+        self.path = path
+        self.cleanup_every = cleanup_every
+        self._writes = 0
+        self._conn = sqlite3.connect(path, timeout=1.0, isolation_level=None, check_same_thread=False)
+        # WAL lets readers in other workers proceed while one worker writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS predictions "
+            "(key TEXT PRIMARY KEY, value REAL NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str, now: float) -> Optional[Tuple[float, float]]:
+        """Return (value, expires_at) for an unexpired key, or None."""
+        row = self._conn.execute(
+            "SELECT value, expires_at FROM predictions WHERE key = ? AND expires_at > ?",
+            (key, now)
+        ).fetchone()
+        return row
+
+    def put(self, key: str, value: float, expires_at: float) -> None:
+        """Store a prediction, periodically purging expired rows."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO predictions (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, expires_at)
+        )
+        self._writes += 1
+        if self._writes % self.cleanup_every == 0:
+            self._conn.execute("DELETE FROM predictions WHERE expires_at <= ?", (time.time(),))
+
+    def clear(self) -> None:
+        """Delete every stored prediction."""
+        self._conn.execute("DELETE FROM predictions")
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class PredictionCache:
+    """
+    In-process LRU/TTL cache of predictions, optionally backed by a shared store.
+
+    Lookups check the local LRU first and then the store, copying store hits
+    into the local LRU. The LRU is only used from the event loop thread, so no
+    lock is needed; store queries from get_async/put_async run on a single
+    background thread, which also serializes access to the store connection.
+
+    Args:
+        max_entries: Maximum number of predictions kept in process
+        ttl_seconds: Time after which a cached prediction is recomputed
+        store: Optional shared store (e.g. SQLiteStore) consulted on local misses
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 300.0, store=None):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, got {max_entries}")
+        if ttl_seconds <= 0:
+            raise ValueError(f"ttl_seconds must be positive, got {ttl_seconds}")
+
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.store = store
+        # key -> (prediction, expires_at), least recently used first
+        self._entries: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._hits = 0
+        self._store_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._store_errors = 0
+        self._store_executor = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-store")
+            if store is not None else None
+        )
+
+    def get(self, key: str) -> Optional[float]:
+        """Return the cached prediction for key, or None on a miss."""
+        now = time.time()
+        prediction = self._get_local(key, now)
+        if prediction is not None:
+            return prediction
+        return self._from_store(key, self._store_get(key, now) if self.store is not None else None)
+
+    async def get_async(self, key: str) -> Optional[float]:
+        """Like get, but query the shared store on the store thread."""
+        now = time.time()
+        prediction = self._get_local(key, now)
+        if prediction is not None:
+            return prediction
+        entry = None
+        if self.store is not None:
+            entry = await asyncio.get_running_loop().run_in_executor(
+                self._store_executor, self._store_get, key, now
+            )
+        return self._from_store(key, entry)
+
+    def put(self, key: str, prediction: float) -> None:
+        """Cache a prediction locally and in the shared store."""
+        entry = (prediction, time.time() + self.ttl_seconds)
+        self._store(key, entry)
+        if self.store is not None:
+            self._store_put(key, *entry)
+
+    def put_async(self, key: str, prediction: float) -> None:
+        """Cache a prediction locally now and write it to the shared store in the background."""
+        entry = (prediction, time.time() + self.ttl_seconds)
+        self._store(key, entry)
+        if self.store is not None:
+            self._store_executor.submit(self._store_put, key, *entry)
+
+    def _get_local(self, key: str, now: float) -> Optional[float]:
+        """Look up the local LRU, counting a hit and dropping an expired entry."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] > now:
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+        del self._entries[key]
+        self._expirations += 1
+        return None
+
+    def _from_store(self, key: str, entry: Optional[Tuple[float, float]]) -> Optional[float]:
+        """Count a local miss's store result (None if no store), copying a hit into the LRU."""
+        if entry is None:
+            self._misses += 1
+            return None
+        self._store(key, entry)
+        self._store_hits += 1
+        return entry[0]
+
+    def _store_get(self, key: str, now: float) -> Optional[Tuple[float, float]]:
+        """Query the shared store, treating a failure (e.g. a lock timeout) as a miss."""
+        try:
+            return self.store.get(key, now)
+        except sqlite3.Error as e:
+            self._store_errors += 1
+            logger.warning(f"Prediction cache store read failed, treating as a miss: {e}")
+            return None
+
+    def _store_put(self, key: str, value: float, expires_at: float) -> None:
+        """Write to the shared store, logging instead of raising on failure."""
+        try:
+            self.store.put(key, value, expires_at)
+        except sqlite3.Error as e:
+            self._store_errors += 1
+            logger.warning(f"Prediction cache store write failed, skipping: {e}")
+
+    def _store(self, key: str, entry: Tuple[float, float]) -> None:
+        """Insert into the local LRU, evicting the least recently used overflow."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached prediction, locally and in the shared store."""
+        self._entries.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    def stats(self) -> Dict:
+        """Report settings, size and hit, miss, eviction and expiration counts."""
+        lookups = self._hits + self._store_hits + self._misses
+        return {
+            "enabled": True,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "shared_store": self.store.path if self.store is not None else None,
+            "entries": len(self._entries),
+            "hits": self._hits,
+            "store_hits": self._store_hits,
+            "misses": self._misses,
+            "hit_rate": round((self._hits + self._store_hits) / lookups, 4) if lookups else 0.0,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+            "store_errors": self._store_errors
+        }
+
+    def close(self) -> None:
+        """Finish pending store writes and close the shared store."""
+        if self._store_executor is not None:
+            self._store_executor.shutdown(wait=True)
+            self._store_executor = None
+        if self.store is not None:
+            self.store.close()
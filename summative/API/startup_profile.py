@@ -0,0 +1,134 @@
+"""
+Cold start profile of the prediction service.
+
+The free-tier host scales the API to zero, so every idle period ends with a
+cold start: importing the service's dependencies and loading the model before
+the first request is answered. This tool measures both in fresh interpreters
+(so nothing is already imported or cached in-process) and reports:
+
+- import time per top-level package while importing prediction
+  (from python -X importtime, self time summed per package)
+- the time to import prediction, load the model, start the inference pool
+  and score the first row, i.e. the time to first prediction
+- whether scikit-learn was imported, which the fused and onnx backends avoid
+
+Usage:
+    python startup_profile.py
+    python startup_profile.py --backend fused --top 15
+"""
+
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, Optional
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Run in a fresh interpreter; prints one JSON line of timings in seconds
+_FIRST_PREDICTION_SCRIPT = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+import prediction
+from model_bundle import CANARY_INPUTS
+imported = time.perf_counter()
+prediction._load_artifacts()
+loaded = time.perf_counter()
+
+async def serve_first_row():
+    await prediction.app.router.startup()
+    started = time.perf_counter()
+    await prediction._score(CANARY_INPUTS[:1])
+    scored = time.perf_counter()
+    await prediction.app.router.shutdown()
+    return started, scored
+
+started, scored = asyncio.run(serve_first_row())
+print(json.dumps({
+    "import_seconds": imported - start,
+    "model_load_seconds": loaded - imported,
+    "startup_seconds": started - loaded,
+    "first_prediction_seconds": scored - started,
+    "time_to_first_prediction_seconds": scored - start,
+    "sklearn_imported": "sklearn" in sys.modules,
+}))
+"""
+
+
+def _run(args, env: Optional[Dict[str, str]]) -> subprocess.CompletedProcess:
+    """
+    Run a Python subprocess in the API directory with extra environment variables.
+
+    Raises:
+        RuntimeError: If the subprocess fails, with the end of its stderr
+    """
+    full_env = {**os.environ, "LOG_LEVEL": "WARNING", **(env or {})}
+    result = subprocess.run(
+        [sys.executable, *args], cwd=API_DIR, env=full_env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Profiling subprocess failed:\n{result.stderr[-2000:]}")
+    return result
+
+
+def parse_importtime(output: str) -> Dict[str, float]:
+    """
+    Sum python -X importtime self times per top-level package.
+
+    Returns:
+        dict: Package name to milliseconds, slowest first
+    """
+    totals: Dict[str, float] = defaultdict(float)
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        totals[name.strip().split(".")[0]] += int(self_us) / 1000
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def profile_imports(module: str = "prediction", env: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+    """Import times per top-level package for a fresh import of module."""
+    result = _run(["-X", "importtime", "-c", f"import {module}"], env)
+    return parse_importtime(result.stderr)
+
+
+def profile_first_prediction(env: Optional[Dict[str, str]] = None) -> Dict:
+    """
+    Time a fresh process from import to its first scored row.
+
+    Returns:
+        dict: import, model load, startup, first prediction and total seconds,
+              and whether scikit-learn was imported
+    """
+    result = _run(["-c", _FIRST_PREDICTION_SCRIPT], env)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Report cold start import and model load times")
+    parser.add_argument("--backend", help="MODEL_BACKEND to profile (default: the environment's)")
+    parser.add_argument("--top", type=int, default=10, help="Packages listed by import time (default: 10)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    env = {"MODEL_BACKEND": args.backend} if args.backend else None
+    imports = profile_imports(env=env)
+    timings = profile_first_prediction(env=env)
+    if args.json:
+        print(json.dumps({"imports_ms": imports, **timings}, indent=2))
+        raise SystemExit(0)
+
+    backend = args.backend or os.getenv("MODEL_BACKEND", "sklearn")
+    print(f"Cold start profile (MODEL_BACKEND={backend})")
+    print(f"\nImport time by package ({sum(imports.values()):.0f} ms total):")
+    for name, ms in list(imports.items())[:args.top]:
+        print(f"  {name:24s} {ms:8.1f} ms")
+    print("\nTime to first prediction:")
+    for key in ("import", "model_load", "startup", "first_prediction"):
+        print(f"  {key.replace('_', ' '):24s} {timings[key + '_seconds'] * 1000:8.1f} ms")
+    print(f"  {'total':24s} {timings['time_to_first_prediction_seconds'] * 1000:8.1f} ms")
+    print(f"\nscikit-learn imported: {'yes' if timings['sklearn_imported'] else 'no'}")
@@ -0,0 +1,109 @@
+"""
+Test the batch prediction endpoint (/predict/batch).
+
+This module verifies that batches are scored in request order, that invalid
+rows are reported individually instead of failing the whole batch, and that
+batch results match the single-row /predict endpoint.
+"""
+
+import pytest
+from prediction import MAX_BATCH_SIZE
+
+
+VALID_ROW = {
+    "age": 45,
+    "num_medications": 3,
+    "medication_complexity": 2.5,
+    "days_since_start": 120,
+    "missed_doses_last_week": 1,
+    "snooze_frequency": 0.2,
+    "chronic_conditions": 2,
+    "previous_adherence_rate": 85.5
+}
+
+LOW_ADHERENCE_ROW = {
+    "age": 72,
+    "num_medications": 8,
+    "medication_complexity": 4.2,
+    "days_since_start": 730,
+    "missed_doses_last_week": 5,
+    "snooze_frequency": 0.6,
+    "chronic_conditions": 5,
+    "previous_adherence_rate": 45.0
+}
+
+
+def test_batch_all_valid(client):
+    """Test that a batch of valid rows is scored in order."""
+    response = client.post(
+        "/predict/batch",
+        json={"instances": [VALID_ROW, LOW_ADHERENCE_ROW]}
+    )
+    
+    assert response.status_code == 200
+    result = response.json()
+    assert result["total"] == 2
+    assert result["succeeded"] == 2
+    assert result["failed"] == 0
+    assert [row["index"] for row in result["results"]] == [0, 1]
+    for row in result["results"]:
+        assert 0.0 <= row["predicted_adherence_rate"] <= 100.0
+        assert row["confidence"] in ("low", "medium", "high")
+        assert row["errors"] is None
+
+
+def test_batch_matches_single_predictions(client):
+    """Test that batch predictions equal the single-row endpoint."""
+    rows = [VALID_ROW, LOW_ADHERENCE_ROW]
+    batch = client.post("/predict/batch", json={"instances": rows}).json()
+    
+    for row, batch_result in zip(rows, batch["results"]):
+        single = client.post("/predict", json=row).json()
+        assert batch_result["predicted_adherence_rate"] == single["predicted_adherence_rate"]
+        assert batch_result["confidence"] == single["confidence"]
+
+
+def test_batch_invalid_rows_reported_individually(client):
+    """Test that invalid rows carry errors while valid rows are still scored."""
+    invalid_age = {**VALID_ROW, "age": 150}
+    missing_field = {k: v for k, v in VALID_ROW.items() if k != "snooze_frequency"}
+    
+    response = client.post(
+        "/predict/batch",
+        json={"instances": [invalid_age, VALID_ROW, missing_field]}
+    )
+    
+    assert response.status_code == 200
+    result = response.json()
+    assert result["succeeded"] == 1
+    assert result["failed"] == 2
+    
+    first, second, third = result["results"]
+    assert first["predicted_adherence_rate"] is None
+    assert any(error["loc"] == ["age"] for error in first["errors"])
+    assert second["errors"] is None
+    assert 0.0 <= second["predicted_adherence_rate"] <= 100.0
+    assert any(
+        error["loc"] == ["snooze_frequency"] and error["type"] == "missing"
+        for error in third["errors"]
+    )
+
+
+def test_batch_all_invalid(client):
+    """Test that a batch with no valid rows still returns 200 with errors."""
+    response = client.post(
+        "/predict/batch",
+        json={"instances": [{**VALID_ROW, "snooze_frequency": 1.5}]}
+    )
+    
+    assert response.status_code == 200
+    result = response.json()
+    assert result["succeeded"] == 0
+    assert result["failed"] == 1
+
+
+@pytest.mark.parametrize("instances", [[], [VALID_ROW] * (MAX_BATCH_SIZE + 1)])
+def test_batch_size_limits(client, instances):
+    """Test that empty and oversized batches are rejected with 422."""
+    response = client.post("/predict/batch", json={"instances": instances})
+    assert response.status_code == 422
@@ -0,0 +1,187 @@
+"""
+Test the binary columnar bulk scoring endpoint (/predict/bulk).
+
+These tests check the raw matrix encoding, header validation, confidence
+codes, and that bulk predictions match the JSON batch endpoint.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+import columnar
+from prediction import FEATURE_ORDER
+
+ROWS = np.array([
+    [45, 3, 2.5, 120, 1, 0.2, 2, 85.5],
+    [72, 8, 4.2, 730, 5, 0.6, 5, 45.0],
+    [150, 3, 2.5, 120, 1, 0.2, 2, 85.5],
+])
+
+
+def test_matrix_round_trip():
+    """Test that an encoded matrix decodes to the same values without copying."""
+    body = columnar.encode_matrix(ROWS, FEATURE_ORDER)
+    decoded = columnar.decode_matrix(body, FEATURE_ORDER)
+
+    assert np.array_equal(decoded, ROWS)
+    assert not decoded.flags.owndata
+
+
+def test_matrix_wrong_columns_rejected():
+    """Test that a header not matching the training column order is rejected."""
+    body = columnar.encode_matrix(ROWS, list(reversed(FEATURE_ORDER)))
+
+    with pytest.raises(columnar.ColumnarFormatError):
+        columnar.decode_matrix(body, FEATURE_ORDER)
+
+
+def test_truncated_matrix_rejected():
+    """Test that a body shorter than its header claims is rejected."""
+    body = columnar.encode_matrix(ROWS, FEATURE_ORDER)
+
+    with pytest.raises(columnar.ColumnarFormatError):
+        columnar.decode_matrix(body[:-8], FEATURE_ORDER)
+
+
+def test_confidence_codes():
+    """Test the vectorized confidence tiers and the invalid code."""
+    predictions = np.array([85.0, 80.0, 70.0, 10.0, np.nan])
+    valid = np.array([True, True, True, True, False])
+
+    codes = columnar.confidence_codes(predictions, valid)
+    assert codes.tolist() == [2, 2, 1, 0, columnar.INVALID_CODE]
+
+
+def test_bulk_matches_batch(client):
+    """Test that bulk predictions equal the JSON batch endpoint's."""
+    response = client.post(
+        "/predict/bulk",
+        content=columnar.encode_matrix(ROWS, FEATURE_ORDER),
+        headers={"Content-Type": columnar.MATRIX_MEDIA_TYPE}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["x-rows"] == "3"
+    assert response.headers["x-failed"] == "1"
+    predictions, codes = columnar.decode_predictions(response.content)
+
+    instances = [dict(zip(FEATURE_ORDER, row)) for row in ROWS.tolist()]
+    batch = client.post("/predict/batch", json={"instances": instances}).json()
+    for result, prediction, code in zip(batch["results"], predictions, codes):
+        if result["errors"]:
+            assert np.isnan(prediction)
+            assert code == columnar.INVALID_CODE
+        else:
+            assert prediction == result["predicted_adherence_rate"]
+            assert columnar.CONFIDENCE_LEVELS[code] == result["confidence"]
+
+
+def test_bulk_integer_overflow_row_is_invalid(client):
+    """Test that a whole float beyond int64 marks only its own row invalid."""
+    overflow = ROWS[0].copy()
+    overflow[FEATURE_ORDER.index("days_since_start")] = 1e300
+    rows = np.vstack([ROWS, overflow])
+    response = client.post(
+        "/predict/bulk",
+        content=columnar.encode_matrix(rows, FEATURE_ORDER),
+        headers={"Content-Type": columnar.MATRIX_MEDIA_TYPE}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["x-failed"] == "2"
+    predictions, codes = columnar.decode_predictions(response.content)
+    assert np.isnan(predictions[-1]) and codes[-1] == columnar.INVALID_CODE
+    assert not np.isnan(predictions[0])
+
+
+def test_bulk_rejects_unknown_content_type(client):
+    """Test that JSON bodies are refused with 415."""
+    response = client.post("/predict/bulk", json={"rows": ROWS.tolist()})
+    assert response.status_code == 415
+
+
+def test_bulk_rejects_malformed_body(client):
+    """Test that a body without a valid header is refused with 400."""
+    response = client.post(
+        "/predict/bulk",
+        content=b"not a matrix",
+        headers={"Content-Type": columnar.MATRIX_MEDIA_TYPE}
+    )
+    assert response.status_code == 400
+
+
+class _StreamingRequest:
+    """Request stand-in yielding the body in pieces and recording how far it was read."""
+
+    def __init__(self, *pieces, headers=None):
+        self.pieces = pieces
+        self.headers = headers or {}
+        self.read = 0
+
+    async def stream(self):
+        for piece in self.pieces:
+            self.read += 1
+            yield piece
+
+
+def test_bulk_rejects_too_many_rows_from_header(monkeypatch):
+    """Test that the row limit is enforced from the header before the body is read."""
+    import prediction
+    monkeypatch.setattr(prediction, "BULK_MAX_ROWS", 2)
+    body = columnar.encode_matrix(ROWS, FEATURE_ORDER)
+    request = _StreamingRequest(body[:columnar.MATRIX_HEADER_SIZE], body[columnar.MATRIX_HEADER_SIZE:])
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(prediction._read_bulk_body(request, arrow=False))
+    assert excinfo.value.status_code == 413
+    assert request.read == 1
+
+
+def test_bulk_body_length_must_match_header():
+    """Test that a Content-Length disagreeing with the header is rejected early."""
+    import prediction
+    body = columnar.encode_matrix(ROWS, FEATURE_ORDER)
+    request = _StreamingRequest(
+        body[:columnar.MATRIX_HEADER_SIZE], body[columnar.MATRIX_HEADER_SIZE:],
+        headers={"content-length": str(len(body) + 8)}
+    )
+
+    with pytest.raises(columnar.ColumnarFormatError):
+        asyncio.run(prediction._read_bulk_body(request, arrow=False))
+    assert request.read == 1
+
+
+def test_bulk_rejects_oversized_content_length(client, monkeypatch):
+    """Test that a Content-Length above the limit is refused with 413."""
+    import prediction
+    monkeypatch.setattr(prediction, "BULK_MAX_ROWS", 2)
+    response = client.post(
+        "/predict/bulk",
+        content=columnar.encode_matrix(ROWS, FEATURE_ORDER),
+        headers={"Content-Type": columnar.MATRIX_MEDIA_TYPE}
+    )
+    assert response.status_code == 413
+
+
+def test_bulk_arrow_round_trip(client):
+    """Test scoring an Arrow IPC stream."""
+    pa = pytest.importorskip("pyarrow")
+    table = pa.table({name: ROWS[:, i] for i, name in enumerate(FEATURE_ORDER)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    response = client.post(
+        "/predict/bulk",
+        content=sink.getvalue().to_pybytes(),
+        headers={"Content-Type": columnar.ARROW_MEDIA_TYPE}
+    )
+
+    assert response.status_code == 200
+    result = pa.ipc.open_stream(response.content).read_all().to_pydict()
+    assert result["valid"] == [True, True, False]
+    assert result["predicted_adherence_rate"][2] is None
+    assert result["confidence"][2] is None
@@ -0,0 +1,224 @@
+"""
+Test the flat-array compiled model engine.
+
+Small forests and trees are trained on synthetic data so that parity with
+scikit-learn can be checked without the deployed model files.
+"""
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.neighbors import KNeighborsRegressor
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeRegressor
+
+from compiled_model import (
+    CompiledForest,
+    CompiledLinear,
+    build_fused_predictor,
+    compile_model,
+    is_compiled_artifact,
+    load_compiled,
+    load_model_artifact,
+    save_compiled,
+    verify_compiled,
+    verify_fused,
+)
+
+
+@pytest.fixture(scope="module")
+def training_data():
+    """Synthetic standardized features with a non-linear target."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 8))
+    y = 70 + 10 * X[:, 7] - 5 * X[:, 2] + 3 * np.sin(X[:, 0]) + rng.normal(size=400)
+    return X, y
+
+
+@pytest.fixture(scope="module")
+def raw_training_data():
+    """Unscaled features on the dataset's column ranges, with a fitted scaler."""
+    rng = np.random.default_rng(4)
+    X = np.column_stack([
+        rng.integers(18, 121, 600),
+        rng.integers(1, 21, 600),
+        rng.uniform(1.0, 5.0, 600),
+        rng.integers(0, 3651, 600),
+        rng.integers(0, 51, 600),
+        rng.uniform(0.0, 1.0, 600),
+        rng.integers(0, 11, 600),
+        rng.uniform(0.0, 100.0, 600),
+    ]).astype(np.float64)
+    y = 75 - 5 * X[:, 2] - 2 * X[:, 4] + 0.4 * (X[:, 7] - 75) + rng.normal(0, 5, 600)
+    scaler = StandardScaler().fit(X)
+    return X, y, scaler
+
+
+@pytest.fixture(scope="module")
+def forest(training_data):
+    X, y = training_data
+    return RandomForestRegressor(n_estimators=25, max_depth=8, random_state=42).fit(X, y)
+
+
+@pytest.fixture(scope="module")
+def tree(training_data):
+    X, y = training_data
+    return DecisionTreeRegressor(random_state=42).fit(X, y)
+
+
+def test_forest_predictions_bit_for_bit(forest):
+    """Test that a compiled forest reproduces sklearn exactly."""
+    X = np.random.default_rng(1).normal(0, 1.5, size=(5000, 8))
+    compiled = compile_model(forest)
+    
+    assert compiled.n_trees == 25
+    np.testing.assert_array_equal(compiled.predict(X), forest.predict(X))
+
+
+def test_tree_predictions_bit_for_bit(tree, training_data):
+    """Test that a compiled decision tree reproduces sklearn exactly."""
+    X, _ = training_data
+    compiled = compile_model(tree)
+    
+    assert compiled.n_trees == 1
+    assert not compiled.average
+    np.testing.assert_array_equal(compiled.predict(X), tree.predict(X))
+
+
+def test_single_row_prediction(forest):
+    """Test that a single row gives a one-element result."""
+    compiled = compile_model(forest)
+    row = np.zeros((1, 8))
+    
+    assert compiled.predict(row).shape == (1,)
+    assert compiled.predict(row)[0] == forest.predict(row)[0]
+
+
+def test_verify_compiled_report(forest):
+    """Test that the parity report flags identical output."""
+    X = np.random.default_rng(2).normal(size=(100, 8))
+    report = verify_compiled(forest, compile_model(forest), X)
+    
+    assert report["identical"]
+    assert report["mismatched_rows"] == 0
+    assert report["rows"] == 100
+
+
+def test_save_and_load_round_trip(forest, tmp_path):
+    """Test that saved artifacts load without the original estimator."""
+    path = tmp_path / "compiled.pkl"
+    compiled = compile_model(forest)
+    save_compiled(compiled, path)
+    
+    assert is_compiled_artifact(joblib.load(path))
+    loaded = load_compiled(path)
+    X = np.random.default_rng(3).normal(size=(50, 8))
+    np.testing.assert_array_equal(loaded.predict(X), compiled.predict(X))
+    assert isinstance(load_model_artifact(path), CompiledForest)
+
+
+def test_load_model_artifact_passes_through_pickles(tree, tmp_path):
+    """Test that pickled sklearn models are returned unchanged."""
+    path = tmp_path / "model.pkl"
+    joblib.dump(tree, path)
+    
+    assert isinstance(load_model_artifact(path), DecisionTreeRegressor)
+
+
+def test_load_compiled_rejects_plain_pickles(tree, tmp_path):
+    """Test that load_compiled refuses files that are not compiled artifacts."""
+    path = tmp_path / "model.pkl"
+    joblib.dump(tree, path)
+    
+    with pytest.raises(ValueError):
+        load_compiled(path)
+
+
+def test_unsupported_models_rejected(training_data):
+    """Test that estimators without trees or coefficients cannot be compiled."""
+    X, y = training_data
+    with pytest.raises(TypeError):
+        compile_model(KNeighborsRegressor().fit(X, y))
+
+
+def test_linear_model_compiles(training_data):
+    """Test that a compiled linear model matches sklearn."""
+    X, y = training_data
+    linear = LinearRegression().fit(X, y)
+    compiled = compile_model(linear)
+    
+    assert isinstance(compiled, CompiledLinear)
+    np.testing.assert_allclose(compiled.predict(X), linear.predict(X), rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize("estimator", [
+    RandomForestRegressor(n_estimators=20, random_state=42),
+    DecisionTreeRegressor(random_state=42),
+])
+def test_fused_tree_matches_two_stage_pipeline(raw_training_data, estimator):
+    """Test that folding the scaler into split thresholds is exact."""
+    X, y, scaler = raw_training_data
+    estimator.fit(scaler.transform(X), y)
+    fused = build_fused_predictor(estimator, scaler)
+    
+    assert fused.scaler_folded
+    # Include the training rows, which sit exactly on either side of splits
+    X_check = np.vstack([X, np.random.default_rng(5).uniform(X.min(0), X.max(0), (2000, 8))])
+    report = verify_fused(estimator, scaler, fused, X_check)
+    assert report["identical"]
+
+
+def test_fused_linear_matches_two_stage_pipeline(raw_training_data):
+    """Test that folding the scaler into coefficients matches within tolerance."""
+    X, y, scaler = raw_training_data
+    linear = LinearRegression().fit(scaler.transform(X), y)
+    fused = build_fused_predictor(linear, scaler)
+    
+    report = verify_fused(linear, scaler, fused, X)
+    assert report["passed"]
+    assert report["max_abs_diff"] < 1e-8
+
+
+def test_fused_keeps_infinite_thresholds(raw_training_data):
+    """Test that +inf split thresholds (every value goes left) survive folding."""
+    X, y, scaler = raw_training_data
+    compiled = compile_model(DecisionTreeRegressor(max_depth=4, random_state=0).fit(scaler.transform(X), y))
+    compiled.threshold[0] = np.inf
+    
+    fused = compiled.fold_scaler(scaler.mean_, scaler.scale_)
+    assert fused.threshold[0] == np.inf
+    np.testing.assert_array_equal(fused.predict(X), compiled.predict(scaler.transform(X)))
+
+
+def test_fused_artifact_round_trip(raw_training_data, tmp_path):
+    """Test that fused artifacts keep the scaler_folded flag when saved."""
+    X, y, scaler = raw_training_data
+    tree = DecisionTreeRegressor(max_depth=6, random_state=0).fit(scaler.transform(X), y)
+    path = tmp_path / "fused.pkl"
+    save_compiled(build_fused_predictor(tree, scaler), path)
+    
+    loaded = load_model_artifact(path)
+    assert loaded.scaler_folded
+    np.testing.assert_array_equal(loaded.predict(X), tree.predict(scaler.transform(X)))
+
+
+def test_wrong_feature_count_rejected(forest):
+    """Test that inputs with the wrong number of features are rejected."""
+    with pytest.raises(ValueError):
+        compile_model(forest).predict(np.zeros((2, 5)))
+
+
+def test_memory_mapped_load(forest, tmp_path):
+    """Test that compiled artifacts can be memory-mapped and still predict identically."""
+    path = tmp_path / "compiled.pkl"
+    compiled = compile_model(forest)
+    save_compiled(compiled, path)
+    
+    mapped = load_model_artifact(path, mmap_mode="r")
+    
+    assert isinstance(mapped.threshold, np.memmap)
+    assert not mapped.threshold.flags.writeable
+    X = np.random.default_rng(6).normal(size=(200, 8))
+    np.testing.assert_array_equal(mapped.predict(X), compiled.predict(X))
@@ -0,0 +1,163 @@
+"""
+Test the fast batch decoding path (/predict/batch/fast).
+
+These tests check that the vectorized checks mirror PredictionInput's
+constraints, and that the fast endpoint returns the same results and
+per-row errors as /predict/batch for the same rows.
+"""
+
+import numpy as np
+import pytest
+
+from fast_decode import FastDecoder
+from prediction import FEATURE_ORDER, MAX_BATCH_SIZE, PredictionInput
+
+VALID_ROW = {
+    "age": 45,
+    "num_medications": 3,
+    "medication_complexity": 2.5,
+    "days_since_start": 120,
+    "missed_doses_last_week": 1,
+    "snooze_frequency": 0.2,
+    "chronic_conditions": 2,
+    "previous_adherence_rate": 85.5
+}
+
+LOW_ADHERENCE_ROW = {
+    "age": 72,
+    "num_medications": 8,
+    "medication_complexity": 4.2,
+    "days_since_start": 730,
+    "missed_doses_last_week": 5,
+    "snooze_frequency": 0.6,
+    "chronic_conditions": 5,
+    "previous_adherence_rate": 45.0
+}
+
+
+@pytest.fixture
+def decoder():
+    return FastDecoder(PredictionInput, FEATURE_ORDER)
+
+
+def test_bounds_read_from_field_constraints(decoder):
+    """Test that range and integer checks come from PredictionInput."""
+    age = FEATURE_ORDER.index("age")
+    days = FEATURE_ORDER.index("days_since_start")
+
+    assert (decoder.lower[age], decoder.upper[age]) == (0, 120)
+    assert decoder.upper[days] == np.inf
+    assert decoder.integer[age]
+    assert not decoder.integer[FEATURE_ORDER.index("snooze_frequency")]
+
+
+@pytest.mark.parametrize("field, value, valid", [
+    ("age", 120, True),
+    ("age", 121, False),
+    ("age", 45.0, True),
+    ("age", 45.5, False),
+    ("snooze_frequency", 1.0, True),
+    ("snooze_frequency", 1.0001, False),
+    ("num_medications", 0, False),
+    ("days_since_start", float("inf"), False),
+    ("days_since_start", 1e300, False),
+    ("days_since_start", 2.0 ** 63, False),
+    ("days_since_start", 2.0 ** 63 - 1024, True),
+])
+def test_vectorized_checks_match_pydantic(decoder, field, value, valid):
+    """Test that each vectorized check agrees with PredictionInput."""
+    matrix = decoder.decode_objects([{**VALID_ROW, field: value}])
+
+    assert decoder.valid_rows(matrix).tolist() == [valid]
+    try:
+        PredictionInput(**{**VALID_ROW, field: value})
+        pydantic_valid = True
+    except ValueError:
+        pydantic_valid = False
+    assert pydantic_valid == valid
+
+
+@pytest.mark.parametrize("instances", [
+    [{k: v for k, v in VALID_ROW.items() if k != "age"}],
+    [{**VALID_ROW, "age": "45"}],
+    [{**VALID_ROW, "age": None}],
+    [[45, 3, 2.5, 120, 1, 0.2, 2, 85.5]],
+])
+def test_unconvertible_objects_fall_back(decoder, instances):
+    """Test that rows needing pydantic's handling are not decoded."""
+    assert decoder.decode_objects(instances) is None
+
+
+def test_compact_rows_decoded(decoder):
+    """Test that array rows in feature order decode to the same matrix."""
+    rows = [[VALID_ROW[name] for name in FEATURE_ORDER]]
+
+    assert np.array_equal(decoder.decode_rows(rows), decoder.decode_objects([VALID_ROW]))
+    assert decoder.decode_rows([rows[0][:7]]) is None
+
+
+def test_fast_endpoint_matches_batch(client):
+    """Test that the fast endpoint returns the same body as /predict/batch."""
+    instances = [
+        VALID_ROW,
+        {**VALID_ROW, "age": 150},
+        LOW_ADHERENCE_ROW,
+        {k: v for k, v in VALID_ROW.items() if k != "snooze_frequency"},
+        {**VALID_ROW, "age": "45"},
+    ]
+    slow = client.post("/predict/batch", json={"instances": instances})
+    fast = client.post("/predict/batch/fast", json={"instances": instances})
+
+    assert fast.status_code == slow.status_code == 200
+    assert fast.json() == slow.json()
+
+
+def test_fast_endpoint_rejects_integer_overflow_row(client):
+    """Test that a whole float beyond int64 fails only its own row, as in /predict/batch."""
+    instances = [VALID_ROW, {**VALID_ROW, "days_since_start": 1e300}, LOW_ADHERENCE_ROW]
+    slow = client.post("/predict/batch", json={"instances": instances})
+    fast = client.post("/predict/batch/fast", json={"instances": instances})
+
+    assert fast.status_code == slow.status_code == 200
+    assert fast.json() == slow.json()
+    assert fast.json()["failed"] == 1
+
+
+def test_fast_endpoint_compact_rows(client):
+    """Test that the compact array form scores like the object form."""
+    rows = [[row[name] for name in FEATURE_ORDER] for row in (VALID_ROW, LOW_ADHERENCE_ROW)]
+    compact = client.post("/predict/batch/fast", json={"rows": rows})
+    objects = client.post("/predict/batch", json={"instances": [VALID_ROW, LOW_ADHERENCE_ROW]})
+
+    assert compact.status_code == 200
+    assert compact.json() == objects.json()
+
+
+def test_fast_endpoint_reports_row_errors_by_field(client):
+    """Test that compact rows failing checks get field-named errors."""
+    bad_row = [150, 3, 2.5, 120, 1, 0.2, 2, 85.5]
+    result = client.post("/predict/batch/fast", json={"rows": [bad_row]}).json()
+
+    assert result["failed"] == 1
+    assert any(error["loc"] == ["age"] for error in result["results"][0]["errors"])
+
+
+@pytest.mark.parametrize("body", [
+    {"instances": []},
+    {"instances": [VALID_ROW] * (MAX_BATCH_SIZE + 1)},
+    {"rows": []},
+    {},
+])
+def test_fast_endpoint_rejects_bad_envelope(client, body):
+    """Test that malformed bodies are rejected with 422."""
+    assert client.post("/predict/batch/fast", json=body).status_code == 422
+
+
+def test_fast_endpoint_rejects_invalid_json(client):
+    """Test that a body that is not JSON is rejected with 422."""
+    response = client.post(
+        "/predict/batch/fast",
+        content=b"{not json",
+        headers={"Content-Type": "application/json"}
+    )
+    assert response.status_code == 422
@@ -0,0 +1,205 @@
+"""
+Test hot reloading of the model and scaler.
+
+These tests check that candidate models are validated against canned inputs,
+that the admin endpoint swaps in a new version without a restart, and that
+a rejected candidate leaves the current model serving.
+"""
+
+import asyncio
+import time
+
+import joblib
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+import prediction
+from inference_pool import InferencePool
+from model_bundle import CANARY_INPUTS, load_bundle, validate_bundle
+
+ADMIN_TOKEN = "test-token"
+
+VALID_INPUT = {
+    "age": 45,
+    "num_medications": 3,
+    "medication_complexity": 2.5,
+    "days_since_start": 120,
+    "missed_doses_last_week": 1,
+    "snooze_frequency": 0.2,
+    "chronic_conditions": 2,
+    "previous_adherence_rate": 85.5
+}
+
+
+def _write_model(path, scaler, offset=0.0, scale=1.0):
+    """Save a linear model predicting scale * previous_adherence_rate + offset."""
+    X = scaler.inverse_transform(np.random.default_rng(0).normal(size=(200, 8)))
+    y = scale * X[:, 7] + offset
+    joblib.dump(LinearRegression().fit(scaler.transform(X), y), path)
+
+
+def _slow_predict(features):
+    time.sleep(0.2)
+    return np.full(len(features), -1.0)
+
+
+def _slow_loader():
+    """Process-pool loader for workers that hold each call for a while."""
+    return _slow_predict
+
+
+@pytest.fixture
+def model_files(tmp_path):
+    """Write a model and scaler pair to a temporary directory."""
+    scaler = StandardScaler().fit(CANARY_INPUTS)
+    scaler_path = tmp_path / "scaler.pkl"
+    model_path = tmp_path / "model.pkl"
+    joblib.dump(scaler, scaler_path)
+    _write_model(model_path, scaler)
+    return model_path, scaler_path, scaler
+
+
+@pytest.fixture
+def reload_client(model_files, monkeypatch):
+    """Serve the temporary model files with admin endpoints enabled."""
+    model_path, scaler_path, _ = model_files
+    monkeypatch.setattr(prediction, "MODEL_PATH", model_path)
+    monkeypatch.setattr(prediction, "SCALER_PATH", scaler_path)
+    monkeypatch.setattr(prediction, "ADMIN_TOKEN", ADMIN_TOKEN)
+    monkeypatch.setattr(prediction, "bundle", None)
+    with TestClient(prediction.app) as test_client:
+        yield test_client
+
+
+def test_valid_bundle_passes_validation(model_files):
+    """Test that a working model passes canary validation."""
+    model_path, scaler_path, _ = model_files
+    report = validate_bundle(load_bundle(model_path, scaler_path))
+
+    assert report["valid"]
+    assert len(report["predictions"]) == len(CANARY_INPUTS)
+
+
+def test_implausible_bundle_rejected(model_files):
+    """Test that a model predicting far outside 0-100 is rejected."""
+    model_path, scaler_path, scaler = model_files
+    _write_model(model_path, scaler, scale=10.0)
+    report = validate_bundle(load_bundle(model_path, scaler_path))
+
+    assert not report["valid"]
+    assert "plausible range" in report["reason"]
+
+
+def test_version_tracks_file_contents(model_files):
+    """Test that the bundle version changes only when the files change."""
+    model_path, scaler_path, scaler = model_files
+    first = load_bundle(model_path, scaler_path)
+    assert load_bundle(model_path, scaler_path).version == first.version
+
+    _write_model(model_path, scaler, offset=5.0)
+    assert load_bundle(model_path, scaler_path).version != first.version
+
+
+def test_reload_requires_admin_token(reload_client):
+    """Test that reloads are refused without the admin token."""
+    assert reload_client.post("/admin/reload").status_code == 403
+    response = reload_client.post("/admin/reload", headers={"X-Admin-Token": "wrong"})
+    assert response.status_code == 403
+
+
+def test_reload_swaps_new_model(reload_client, model_files):
+    """Test that a reload serves the new model without a restart."""
+    model_path, _, scaler = model_files
+    old_version = reload_client.get("/health").json()["model_version"]
+    before = reload_client.post("/predict", json=VALID_INPUT).json()
+
+    _write_model(model_path, scaler, offset=-10.0)
+    response = reload_client.post("/admin/reload", headers={"X-Admin-Token": ADMIN_TOKEN})
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["status"] == "reloaded"
+    assert result["previous_version"] == old_version
+    assert result["validation"]["max_drift"] == pytest.approx(10.0, abs=0.01)
+
+    after = reload_client.post("/predict", json=VALID_INPUT).json()
+    assert after["predicted_adherence_rate"] == pytest.approx(
+        before["predicted_adherence_rate"] - 10.0, abs=0.01
+    )
+    assert reload_client.get("/health").json()["model_version"] == result["version"]
+
+
+def test_unchanged_files_not_swapped(reload_client):
+    """Test that reloading identical files keeps the current model."""
+    response = reload_client.post("/admin/reload", headers={"X-Admin-Token": ADMIN_TOKEN})
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "unchanged"
+
+
+def test_rejected_model_keeps_current(reload_client, model_files):
+    """Test that a model failing validation is not swapped in."""
+    model_path, _, scaler = model_files
+    version = reload_client.get("/health").json()["model_version"]
+
+    _write_model(model_path, scaler, scale=10.0)
+    response = reload_client.post("/admin/reload", headers={"X-Admin-Token": ADMIN_TOKEN})
+
+    assert response.status_code == 422
+    assert reload_client.get("/health").json()["model_version"] == version
+    assert reload_client.post("/predict", json=VALID_INPUT).status_code == 200
+
+
+def test_worker_rejects_unvalidated_version(model_files):
+    """Test that a pool worker refuses files that are not the validated version."""
+    model_path, scaler_path, _ = model_files
+    with pytest.raises(RuntimeError, match="expected"):
+        prediction._load_predictor(str(model_path), str(scaler_path), "not-a-version")
+
+
+def test_process_reload_drains_queued_calls(model_files, monkeypatch):
+    """Test that calls queued on a replaced process pool finish instead of being cancelled."""
+    model_path, scaler_path, scaler = model_files
+    monkeypatch.setattr(prediction, "MODEL_PATH", model_path)
+    monkeypatch.setattr(prediction, "SCALER_PATH", scaler_path)
+    monkeypatch.setattr(prediction, "INFERENCE_POOL_KIND", "process")
+    monkeypatch.setattr(prediction, "INFERENCE_WORKERS", 1)
+    monkeypatch.setattr(prediction, "bundle", load_bundle(model_path, scaler_path))
+    monkeypatch.setattr(prediction, "_pool_snapshot", None)
+
+    old_pool = InferencePool(
+        prediction._predict_matrix, kind="process", workers=1, max_pending=16, loader=_slow_loader
+    )
+    old_pool.start()
+    monkeypatch.setattr(prediction, "pool", old_pool)
+
+    async def scenario():
+        prediction._reload_lock = asyncio.Lock()
+        # More calls than workers, so most are still queued during the reload
+        queued = [asyncio.create_task(old_pool.predict(np.ones((1, 8)))) for _ in range(4)]
+        await asyncio.sleep(0.05)
+
+        _write_model(model_path, scaler, offset=-10.0)
+        result = await prediction.reload_model()
+        # Replacing the files again must not change what the new workers serve
+        _write_model(model_path, scaler, offset=20.0)
+
+        served = await prediction.pool.predict(CANARY_INPUTS)
+        return result, await asyncio.gather(*queued), served
+
+    try:
+        result, queued_results, served = asyncio.run(scenario())
+        new_pool = prediction.pool
+    finally:
+        old_pool.stop()
+        prediction.pool.stop()
+        prediction._discard_snapshot(prediction._pool_snapshot)
+
+    assert result["status"] == "reloaded"
+    assert [r.tolist() for r in queued_results] == [[-1.0]] * 4
+    assert new_pool is not old_pool
+    assert prediction.bundle.version == result["version"]
+    assert served.tolist() == prediction.bundle.predict(CANARY_INPUTS).tolist()
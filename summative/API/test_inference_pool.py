@@ -0,0 +1,160 @@
+"""
+Test the bounded inference worker pool.
+
+These tests check that predictions run off the event loop, that the pool
+rejects work once max_pending calls are queued or running, and that the API
+surfaces saturation as 503 with a Retry-After header.
+"""
+
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+import prediction
+from inference_pool import InferencePool, PoolSaturatedError
+from metrics import STAGE_SECONDS
+
+
+def _row_sums(features):
+    return features.sum(axis=1)
+
+
+def _timed_row_sums(features):
+    STAGE_SECONDS.observe(0.001, "predict")
+    return _row_sums(features)
+
+
+def _load_timed_row_sums():
+    return _timed_row_sums
+
+
+def test_thread_pool_scores_features():
+    """Test that the thread pool returns the predict function's output."""
+    pool = InferencePool(_row_sums, kind="thread", workers=2, max_pending=4)
+    pool.start()
+    try:
+        result = asyncio.run(pool.predict(np.ones((3, 8))))
+    finally:
+        pool.stop()
+    
+    assert result.tolist() == [8.0, 8.0, 8.0]
+    assert pool.stats()["completed"] == 1
+
+
+def test_pool_rejects_when_saturated():
+    """Test that calls beyond max_pending raise PoolSaturatedError."""
+    release = threading.Event()
+    
+    def blocking_predict(features):
+        release.wait(timeout=5)
+        return _row_sums(features)
+    
+    pool = InferencePool(blocking_predict, kind="thread", workers=1, max_pending=1)
+    
+    async def scenario():
+        first = asyncio.create_task(pool.predict(np.ones((1, 8))))
+        await asyncio.sleep(0)
+        assert pool.pending == 1
+        with pytest.raises(PoolSaturatedError):
+            await pool.predict(np.ones((1, 8)))
+        release.set()
+        return await first
+    
+    pool.start()
+    try:
+        result = asyncio.run(scenario())
+    finally:
+        release.set()
+        pool.stop()
+    
+    assert result.tolist() == [8.0]
+    assert pool.stats()["rejected"] == 1
+    assert pool.pending == 0
+
+
+def test_event_loop_stays_responsive():
+    """Test that a slow prediction does not block other coroutines."""
+    release = threading.Event()
+    
+    def blocking_predict(features):
+        release.wait(timeout=5)
+        return _row_sums(features)
+    
+    pool = InferencePool(blocking_predict, kind="thread", workers=1, max_pending=2)
+    
+    async def scenario():
+        slow = asyncio.create_task(pool.predict(np.ones((1, 8))))
+        # This would never run if the prediction blocked the event loop
+        await asyncio.sleep(0.01)
+        assert not slow.done()
+        release.set()
+        await slow
+    
+    pool.start()
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        pool.stop()
+
+
+def test_process_pool_returns_worker_stage_timings():
+    """Test that stages timed in a worker process reach the parent's histogram."""
+    pool = InferencePool(_row_sums, kind="process", workers=1, max_pending=2, loader=_load_timed_row_sums)
+    before = STAGE_SECONDS.count("predict")
+    pool.start()
+    try:
+        result = asyncio.run(pool.predict(np.ones((2, 8))))
+        asyncio.run(pool.predict(np.ones((1, 8))))
+    finally:
+        pool.stop()
+
+    assert result.tolist() == [8.0, 8.0]
+    assert STAGE_SECONDS.count("predict") == before + 2
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"kind": "fiber"},
+    {"workers": 0},
+    {"workers": 4, "max_pending": 2},
+    {"kind": "process"},
+])
+def test_invalid_settings_rejected(kwargs):
+    """Test that invalid pool settings are rejected."""
+    with pytest.raises(ValueError):
+        InferencePool(_row_sums, **kwargs)
+
+
+def test_saturated_pool_returns_503(client, monkeypatch):
+    """Test that the API maps pool saturation to 503 with Retry-After."""
+    async def saturated(features):
+        raise PoolSaturatedError("saturated")
+    
+    monkeypatch.setattr(prediction, "_score", saturated)
+    monkeypatch.setattr(prediction, "batcher", None)
+    
+    response = client.post("/predict", json={
+        "age": 45,
+        "num_medications": 3,
+        "medication_complexity": 2.5,
+        "days_since_start": 120,
+        "missed_doses_last_week": 1,
+        "snooze_frequency": 0.2,
+        "chronic_conditions": 2,
+        "previous_adherence_rate": 85.5
+    })
+    
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(prediction.INFERENCE_RETRY_AFTER_SECONDS)
+
+
+def test_inference_stats_endpoint(client):
+    """Test that the API reports inference pool settings."""
+    response = client.get("/stats/inference")
+    
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["kind"] == prediction.INFERENCE_POOL_KIND
+    assert "max_pending" in stats
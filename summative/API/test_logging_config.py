@@ -0,0 +1,62 @@
+"""
+Test the structured, sampled and queue-backed logging setup.
+
+These tests check JSON output, request-log sampling, and that messages are
+formatted on the listener thread rather than by the logging call.
+"""
+
+import json
+import logging
+import queue
+import threading
+
+import pytest
+
+from logging_config import DeferredQueueHandler, JsonFormatter, SamplingFilter
+
+
+def _record(level=logging.INFO, msg="Prediction request received: %s", args=({"age": 45},), **extra):
+    record = logging.LogRecord("prediction.requests", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_extra_fields():
+    """Test that JSON lines carry the message and extra= fields."""
+    entry = json.loads(JsonFormatter().format(_record(event="prediction_request")))
+
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "prediction.requests"
+    assert entry["message"] == "Prediction request received: {'age': 45}"
+    assert entry["event"] == "prediction_request"
+
+
+def test_sampling_drops_info_keeps_warnings():
+    """Test that sampling applies to INFO records only."""
+    sampler = SamplingFilter(rate=0.0)
+
+    assert not sampler.filter(_record(logging.INFO))
+    assert sampler.filter(_record(logging.WARNING))
+    assert SamplingFilter(rate=1.0).filter(_record(logging.INFO))
+
+
+def test_sampling_rate_validated():
+    """Test that rates outside [0, 1] are rejected."""
+    with pytest.raises(ValueError):
+        SamplingFilter(rate=1.5)
+
+
+def test_queue_handler_defers_formatting():
+    """Test that the message is not built on the logging thread."""
+    formatted_on = []
+
+    class Payload:
+        def __repr__(self):
+            formatted_on.append(threading.current_thread().name)
+            return "payload"
+
+    records = queue.SimpleQueue()
+    DeferredQueueHandler(records).handle(_record(args=(Payload(),)))
+
+    assert formatted_on == []
+    assert records.get_nowait().getMessage() == "Prediction request received: payload"
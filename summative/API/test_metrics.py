@@ -0,0 +1,91 @@
+"""
+Test the Prometheus-style metrics and the /metrics endpoint.
+
+These tests check histogram bucketing, the text exposition format, and that
+serving a prediction records request counts and per-stage latencies.
+"""
+
+import pytest
+
+from metrics import Registry
+
+
+def test_histogram_cumulative_buckets():
+    """Test that bucket counts are cumulative and end with +Inf."""
+    registry = Registry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, "predict")
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{stage="predict",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{stage="predict",le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{stage="predict",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{stage="predict"} 4' in text
+    assert 'latency_seconds_sum{stage="predict"} 6.05' in text
+
+
+def test_counter_and_gauge_render():
+    """Test counter labels, callback gauges and HELP/TYPE lines."""
+    registry = Registry()
+    counter = registry.counter("requests_total", "Requests", ("status",))
+    counter.inc("200")
+    counter.inc("200")
+    registry.gauge("queue_depth", "Queue depth", lambda: 3)
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{status="200"} 2' in text
+    assert "# TYPE queue_depth gauge" in text
+    assert "queue_depth 3" in text
+
+
+def test_duplicate_metric_rejected():
+    """Test that registering a metric name twice fails."""
+    registry = Registry()
+    registry.counter("requests_total", "Requests")
+    with pytest.raises(ValueError):
+        registry.counter("requests_total", "Requests")
+
+
+def test_metrics_endpoint_records_prediction(client):
+    """Test that /metrics reports the stages of a served prediction."""
+    client.post("/predict", json={
+        "age": 45,
+        "num_medications": 3,
+        "medication_complexity": 2.5,
+        "days_since_start": 120,
+        "missed_doses_last_week": 1,
+        "snooze_frequency": 0.2,
+        "chronic_conditions": 2,
+        "previous_adherence_rate": 85.5
+    })
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'medmind_requests_total{endpoint="/predict",status="200"}' in text
+    for stage in ("parse", "serialize"):
+        assert f'medmind_stage_duration_seconds_count{{stage="{stage}"}}' in text
+    assert "medmind_cache_misses_total" in text
+    assert "medmind_batcher_queue_depth" in text
+
+
+def test_histogram_drain_and_merge():
+    """Test that drained series merge into another histogram with the same buckets."""
+    registry = Registry()
+    worker = Registry().histogram("latency_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+    parent = registry.histogram("latency_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+    parent.observe(0.05, "predict")
+    for value in (0.5, 5.0):
+        worker.observe(value, "predict")
+    worker.observe(0.05, "transform")
+
+    parent.merge(worker.drain())
+
+    assert worker.count("predict") == 0
+    assert (parent.count("predict"), parent.count("transform")) == (3, 1)
+    text = registry.render()
+    assert 'latency_seconds_bucket{stage="predict",le="1.0"} 2' in text
+    assert 'latency_seconds_sum{stage="predict"} 5.55' in text
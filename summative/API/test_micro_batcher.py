@@ -0,0 +1,161 @@
+"""
+Test the asyncio micro-batcher used by the /predict endpoint.
+
+These tests drive the MicroBatcher directly with a stub predict function so
+that coalescing, batch size limits and error propagation can be checked
+without a trained model.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from micro_batcher import MicroBatcher
+
+
+class RecordingPredictor:
+    """Stub predict function that records the batch sizes it receives."""
+    
+    def __init__(self, fail=False):
+        self.batch_sizes = []
+        self.fail = fail
+    
+    def __call__(self, features):
+        self.batch_sizes.append(features.shape[0])
+        if self.fail:
+            raise RuntimeError("model exploded")
+        return features.sum(axis=1)
+
+
+async def _submit_all(batcher, rows):
+    await batcher.start()
+    try:
+        return await asyncio.gather(*(batcher.submit(row) for row in rows))
+    finally:
+        await batcher.stop()
+
+
+def test_concurrent_rows_are_coalesced():
+    """Test that concurrent rows are scored together and resolved in order."""
+    predictor = RecordingPredictor()
+    batcher = MicroBatcher(predictor, window_ms=50, max_batch_size=64)
+    rows = [np.full(8, float(i)) for i in range(10)]
+    
+    results = asyncio.run(_submit_all(batcher, rows))
+    
+    assert results == [8.0 * i for i in range(10)]
+    assert predictor.batch_sizes == [10]
+    assert batcher.stats()["batch_size_histogram"] == {"10": 1}
+
+
+def test_lone_row_skips_window():
+    """Test that a row arriving at an idle batcher is scored without waiting the window."""
+    predictor = RecordingPredictor()
+    batcher = MicroBatcher(predictor, window_ms=5000)
+
+    async def scenario():
+        await batcher.start()
+        try:
+            return await asyncio.wait_for(batcher.submit(np.ones(8)), timeout=1.0)
+        finally:
+            await batcher.stop()
+
+    assert asyncio.run(scenario()) == 8.0
+    assert predictor.batch_sizes == [1]
+
+
+def test_rows_arriving_while_busy_are_coalesced():
+    """Test that rows arriving during an in-flight batch wait the window together."""
+    batch_sizes = []
+    release = None
+
+    async def slow_predict(features):
+        batch_sizes.append(features.shape[0])
+        await release.wait()
+        return features.sum(axis=1)
+
+    batcher = MicroBatcher(slow_predict, window_ms=200)
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        await batcher.start()
+        try:
+            first = asyncio.create_task(batcher.submit(np.ones(8)))
+            await asyncio.sleep(0.01)
+            second = asyncio.create_task(batcher.submit(np.ones(8)))
+            await asyncio.sleep(0.01)
+            third = asyncio.create_task(batcher.submit(np.ones(8)))
+            await asyncio.sleep(0.3)
+            release.set()
+            return await asyncio.gather(first, second, third)
+        finally:
+            await batcher.stop()
+
+    assert asyncio.run(scenario()) == [8.0, 8.0, 8.0]
+    assert batch_sizes == [1, 2]
+
+
+def test_max_batch_size_splits_batches():
+    """Test that no batch exceeds max_batch_size."""
+    predictor = RecordingPredictor()
+    batcher = MicroBatcher(predictor, window_ms=50, max_batch_size=4)
+    rows = [np.ones(8) for _ in range(10)]
+    
+    results = asyncio.run(_submit_all(batcher, rows))
+    
+    assert len(results) == 10
+    assert max(predictor.batch_sizes) <= 4
+    assert sum(predictor.batch_sizes) == 10
+    
+    stats = batcher.stats()
+    assert stats["rows"] == 10
+    assert stats["batches"] == len(predictor.batch_sizes)
+
+
+def test_prediction_errors_reach_every_caller():
+    """Test that a failing batch raises in every waiting request."""
+    batcher = MicroBatcher(RecordingPredictor(fail=True), window_ms=10)
+    
+    with pytest.raises(RuntimeError, match="model exploded"):
+        asyncio.run(_submit_all(batcher, [np.ones(8), np.ones(8)]))
+
+
+def test_submit_requires_running_batcher():
+    """Test that submitting before start() is rejected."""
+    batcher = MicroBatcher(RecordingPredictor())
+    
+    with pytest.raises(RuntimeError):
+        asyncio.run(batcher.submit(np.ones(8)))
+
+
+@pytest.mark.parametrize("kwargs", [{"window_ms": -1}, {"max_batch_size": 0}])
+def test_invalid_settings_rejected(kwargs):
+    """Test that invalid window and batch size settings are rejected."""
+    with pytest.raises(ValueError):
+        MicroBatcher(RecordingPredictor(), **kwargs)
+
+
+def test_batching_stats_endpoint(client):
+    """Test that the API reports micro-batcher settings and histogram."""
+    client.post("/predict", json={
+        "age": 45,
+        "num_medications": 3,
+        "medication_complexity": 2.5,
+        "days_since_start": 120,
+        "missed_doses_last_week": 1,
+        "snooze_frequency": 0.2,
+        "chronic_conditions": 2,
+        "previous_adherence_rate": 85.5
+    })
+    
+    response = client.get("/stats/batching")
+    
+    assert response.status_code == 200
+    stats = response.json()
+    assert "window_ms" in stats
+    assert "max_batch_size" in stats
+    if stats["enabled"]:
+        assert stats["rows"] >= 1
+        assert sum(stats["batch_size_histogram"].values()) == stats["batches"]
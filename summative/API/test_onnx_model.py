@@ -0,0 +1,87 @@
+"""
+Test the ONNX export and onnxruntime backend.
+
+Small models are trained on synthetic unscaled data so parity with the
+two-stage scikit-learn pipeline can be checked without the deployed files.
+Skipped when skl2onnx or onnxruntime is not installed.
+"""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeRegressor
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("skl2onnx")
+
+from compiled_model import load_model_artifact, verify_fused
+from model_bundle import load_bundle
+from onnx_model import PARITY_ATOL, OnnxPredictor, benchmark_backends, export_onnx, to_onnx
+
+
+@pytest.fixture(scope="module")
+def raw_training_data():
+    """Unscaled features on the dataset's column ranges, with a fitted scaler."""
+    rng = np.random.default_rng(4)
+    X = rng.uniform([18, 1, 1.0, 0, 0, 0.0, 0, 0.0], [120, 20, 5.0, 3650, 50, 1.0, 10, 100.0], (600, 8))
+    y = 75 - 5 * X[:, 2] - 2 * X[:, 4] + 0.4 * (X[:, 7] - 75) + rng.normal(0, 5, 600)
+    return X, y, StandardScaler().fit(X)
+
+
+@pytest.mark.parametrize("estimator", [
+    RandomForestRegressor(n_estimators=20, max_depth=10, random_state=42),
+    DecisionTreeRegressor(random_state=42),
+    LinearRegression(),
+])
+def test_onnx_matches_sklearn_pipeline(raw_training_data, estimator):
+    """Test that the exported graph matches scaler.transform + predict within PARITY_ATOL."""
+    X, y, scaler = raw_training_data
+    estimator.fit(scaler.transform(X), y)
+    predictor = OnnxPredictor(to_onnx(estimator, scaler))
+
+    # Include the training rows, which sit exactly on either side of splits
+    X_check = np.vstack([X, np.random.default_rng(5).uniform(X.min(0), X.max(0), (2000, 8))])
+    report = verify_fused(estimator, scaler, predictor, X_check, atol=PARITY_ATOL)
+    assert report["passed"], report
+
+
+def test_onnx_file_served_through_bundle(raw_training_data, tmp_path):
+    """Test that .onnx files load as artifacts and the bundle skips its own scaling."""
+    import joblib
+
+    X, y, scaler = raw_training_data
+    tree = DecisionTreeRegressor(max_depth=6, random_state=0).fit(scaler.transform(X), y)
+    model_path, scaler_path = tmp_path / "best_model.onnx", tmp_path / "scaler.pkl"
+    export_onnx(tree, scaler, str(model_path))
+    joblib.dump(scaler, scaler_path)
+
+    assert isinstance(load_model_artifact(model_path), OnnxPredictor)
+    bundle = load_bundle(model_path, scaler_path)
+    assert bundle.model.scaler_folded
+    np.testing.assert_allclose(
+        bundle.predict_raw(X), tree.predict(scaler.transform(X)), atol=PARITY_ATOL
+    )
+
+
+def test_wrong_feature_count_rejected(raw_training_data):
+    """Test that inputs with the wrong number of features are rejected."""
+    X, y, scaler = raw_training_data
+    predictor = OnnxPredictor(to_onnx(LinearRegression().fit(scaler.transform(X), y), scaler))
+    with pytest.raises(ValueError):
+        predictor.predict(np.zeros((2, 5)))
+
+
+def test_benchmark_reports_each_backend(raw_training_data):
+    """Test the latency/throughput comparison structure."""
+    X, y, scaler = raw_training_data
+    linear = LinearRegression().fit(scaler.transform(X), y)
+    engines = {
+        "sklearn": lambda rows: linear.predict(scaler.transform(rows)),
+        "onnx": OnnxPredictor(to_onnx(linear, scaler)).predict,
+    }
+
+    results = benchmark_backends(engines, X, repeats=5)
+    assert set(results) == {"sklearn", "onnx"}
+    assert all(r["single_row_ms"] > 0 and r["batch_rows_per_second"] > 0 for r in results.values())
@@ -0,0 +1,156 @@
+"""
+Test the /predict result cache.
+
+These tests check key canonicalization, LRU eviction, TTL expiry, the shared
+SQLite store, and that the API serves repeated inputs from the cache.
+"""
+
+import asyncio
+import sqlite3
+import time
+
+import numpy as np
+import pytest
+
+import prediction
+from prediction_cache import PredictionCache, SQLiteStore, cache_key
+
+ROW = np.array([45, 3, 2.5, 120, 1, 0.2, 2, 85.5])
+
+VALID_INPUT = {
+    "age": 45,
+    "num_medications": 3,
+    "medication_complexity": 2.5,
+    "days_since_start": 120,
+    "missed_doses_last_week": 1,
+    "snooze_frequency": 0.2,
+    "chronic_conditions": 2,
+    "previous_adherence_rate": 85.5
+}
+
+
+def test_key_ignores_float_noise():
+    """Test that tiny float differences map to the same key."""
+    assert cache_key(ROW, "v1") == cache_key(ROW + 1e-9, "v1")
+    assert cache_key(ROW, "v1") != cache_key(ROW + 1e-3, "v1")
+
+
+def test_key_includes_model_version():
+    """Test that a different model version never shares keys."""
+    assert cache_key(ROW, "v1") != cache_key(ROW, "v2")
+
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted first."""
+    cache = PredictionCache(max_entries=2)
+    cache.put("a", 1.0)
+    cache.put("b", 2.0)
+    cache.get("a")
+    cache.put("c", 3.0)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1.0
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry():
+    """Test that entries are recomputed after the TTL."""
+    cache = PredictionCache(ttl_seconds=0.01)
+    cache.put("a", 1.0)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_shared_store_across_caches(tmp_path):
+    """Test that a second cache (another worker) reads results from the store."""
+    path = str(tmp_path / "cache.sqlite")
+    first = PredictionCache(store=SQLiteStore(path))
+    second = PredictionCache(store=SQLiteStore(path))
+    first.put("a", 42.0)
+
+    assert second.get("a") == 42.0
+    assert second.stats()["store_hits"] == 1
+    # Copied into the local LRU after the store hit
+    assert second.get("a") == 42.0
+    assert second.stats()["hits"] == 1
+
+
+class _LockedStore:
+    """Shared store whose database is always locked by another worker."""
+
+    path = "locked.sqlite"
+
+    def get(self, key, now):
+        raise sqlite3.OperationalError("database is locked")
+
+    def put(self, key, value, expires_at):
+        raise sqlite3.OperationalError("database is locked")
+
+    def close(self):
+        pass
+
+
+def test_store_errors_are_misses():
+    """Test that a failing shared store degrades to a local-only cache."""
+    cache = PredictionCache(store=_LockedStore())
+
+    async def scenario():
+        miss = await cache.get_async("a")
+        cache.put_async("a", 42.0)
+        return miss, await cache.get_async("a")
+
+    try:
+        assert asyncio.run(scenario()) == (None, 42.0)
+        assert cache.get("b") is None
+    finally:
+        cache.close()
+    stats = cache.stats()
+    assert stats["store_errors"] == 3
+    assert stats["misses"] == 2
+    assert stats["hits"] == 1
+
+
+def test_async_store_round_trip(tmp_path):
+    """Test that background store writes are visible to another worker's cache."""
+    path = str(tmp_path / "cache.sqlite")
+    first = PredictionCache(store=SQLiteStore(path))
+    second = PredictionCache(store=SQLiteStore(path))
+
+    first.put_async("a", 42.0)
+    first.close()
+    try:
+        assert asyncio.run(second.get_async("a")) == 42.0
+        assert second.stats()["store_hits"] == 1
+    finally:
+        second.close()
+
+
+@pytest.mark.parametrize("kwargs", [{"max_entries": 0}, {"ttl_seconds": 0}])
+def test_invalid_settings_rejected(kwargs):
+    """Test that invalid cache settings are rejected."""
+    with pytest.raises(ValueError):
+        PredictionCache(**kwargs)
+
+
+def test_repeated_prediction_served_from_cache(client, monkeypatch):
+    """Test that a repeated /predict request skips the model."""
+    if prediction.cache is None:
+        pytest.skip("Prediction cache disabled")
+
+    first = client.post("/predict", json=VALID_INPUT)
+    assert first.status_code == 200
+
+    async def fail(features):
+        raise AssertionError("model called for a cached input")
+
+    monkeypatch.setattr(prediction, "_score", fail)
+    monkeypatch.setattr(prediction, "batcher", None)
+    second = client.post("/predict", json=VALID_INPUT)
+
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    stats = client.get("/stats/cache").json()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
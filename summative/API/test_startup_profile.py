@@ -0,0 +1,70 @@
+"""
+Test the cold start profile and the scikit-learn-free serving path.
+"""
+
+import subprocess
+import sys
+
+import joblib
+import numpy as np
+from fastapi.testclient import TestClient
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeRegressor
+
+import prediction
+from compiled_model import build_fused_predictor, save_compiled
+from model_bundle import CANARY_INPUTS, load_bundle
+from startup_profile import API_DIR, parse_importtime
+
+
+def _fused_files(tmp_path):
+    """Write a fused tree artifact and its scaler."""
+    scaler = StandardScaler().fit(CANARY_INPUTS)
+    X = scaler.inverse_transform(np.random.default_rng(0).normal(size=(200, 8)))
+    tree = DecisionTreeRegressor(max_depth=5, random_state=0).fit(scaler.transform(X), X[:, 7])
+    model_path, scaler_path = tmp_path / "best_model_fused.pkl", tmp_path / "scaler.pkl"
+    save_compiled(build_fused_predictor(tree, scaler), model_path)
+    joblib.dump(scaler, scaler_path)
+    return model_path, scaler_path
+
+
+def test_parse_importtime_sums_per_package():
+    """Test that self times are summed per top-level package."""
+    output = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 |   numpy._core",
+        "import time:       400 |        500 | numpy",
+        "import time:      2000 |       2000 | fastapi",
+    ])
+
+    assert parse_importtime(output) == {"fastapi": 2.0, "numpy": 0.5}
+
+
+def test_fused_bundle_does_not_import_sklearn(tmp_path):
+    """Test that importing the API and loading a fused bundle never imports scikit-learn."""
+    model_path, scaler_path = _fused_files(tmp_path)
+    script = (
+        "import sys, prediction\n"
+        "from model_bundle import CANARY_INPUTS, load_bundle\n"
+        f"bundle = load_bundle({str(model_path)!r}, {str(scaler_path)!r})\n"
+        "bundle.predict(CANARY_INPUTS)\n"
+        "print('sklearn' in sys.modules, bundle.scaler is None)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=API_DIR, capture_output=True, text=True, timeout=120
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["False", "True"]
+
+
+def test_health_reports_folded_scaler(tmp_path, monkeypatch):
+    """Test that a fused bundle without a loaded scaler is reported healthy."""
+    model_path, scaler_path = _fused_files(tmp_path)
+    monkeypatch.setattr(prediction, "bundle", load_bundle(model_path, scaler_path))
+
+    with TestClient(prediction.app) as client:
+        health = client.get("/health").json()
+
+    assert health["status"] == "healthy"
+    assert health["scaler_folded"] and health["scaler_loaded"]
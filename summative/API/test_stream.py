@@ -0,0 +1,177 @@
+"""
+Test the streaming NDJSON scoring endpoint (/predict/stream).
+
+These tests check line splitting across body chunks, chunked scoring,
+per-line errors, and that streamed predictions match the batch endpoint.
+"""
+
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+import ndjson_stream
+import prediction
+from model_bundle import CANARY_INPUTS
+
+# Seconds before a hanging request fails the test instead of the whole run
+REQUEST_TIMEOUT = 15
+
+VALID = {
+    "age": 45,
+    "num_medications": 3,
+    "medication_complexity": 2.5,
+    "days_since_start": 120,
+    "missed_doses_last_week": 1,
+    "snooze_frequency": 0.2,
+    "chronic_conditions": 2,
+    "previous_adherence_rate": 85.5
+}
+
+
+@pytest.fixture
+def stream_client(tmp_path, monkeypatch):
+    """Serve a small linear model written to a temporary directory."""
+    scaler = StandardScaler().fit(CANARY_INPUTS)
+    X = scaler.inverse_transform(np.random.default_rng(0).normal(size=(200, 8)))
+    joblib.dump(scaler, tmp_path / "scaler.pkl")
+    joblib.dump(LinearRegression().fit(scaler.transform(X), X[:, 7]), tmp_path / "model.pkl")
+    monkeypatch.setattr(prediction, "MODEL_PATH", tmp_path / "model.pkl")
+    monkeypatch.setattr(prediction, "SCALER_PATH", tmp_path / "scaler.pkl")
+    monkeypatch.setattr(prediction, "bundle", None)
+    with TestClient(prediction.app) as test_client:
+        yield test_client
+
+
+def _post(client, path, **kwargs):
+    """POST on a helper thread, failing after REQUEST_TIMEOUT seconds."""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(client.post, path, **kwargs).result(timeout=REQUEST_TIMEOUT)
+
+
+async def _body(*pieces):
+    for piece in pieces:
+        yield piece
+
+
+def _collect(reader, *pieces):
+    async def run():
+        return [chunk async for chunk in reader.chunks(_body(*pieces))]
+    return asyncio.run(run())
+
+
+def test_reader_splits_lines_across_chunks():
+    """Test that lines split between body chunks are reassembled and grouped."""
+    reader = ndjson_stream.NDJSONReader(chunk_rows=2)
+    chunks = _collect(reader, b'[1]\n[2', b']\n\n[3]\n', b'[4]')
+
+    assert chunks == [(0, [[1], [2]]), (2, [[3], [4]])]
+
+
+def test_reader_flags_bad_lines():
+    """Test that invalid and over-long lines become placeholders in place."""
+    reader = ndjson_stream.NDJSONReader(chunk_rows=10, max_line_bytes=8)
+    (start, rows), = _collect(reader, b'{oops\n[1, 2', b'3456789, 0]\n[5]\n')
+
+    assert start == 0
+    assert isinstance(rows[0], ndjson_stream.InvalidJSON)
+    assert isinstance(rows[1], ndjson_stream.LineTooLong)
+    assert rows[2] == [5]
+
+
+def test_stream_matches_batch(stream_client, monkeypatch):
+    """Test that streamed results equal /predict/batch across several chunks."""
+    monkeypatch.setattr(prediction, "STREAM_CHUNK_ROWS", 2)
+    instances = [VALID, {**VALID, "age": 150}, {**VALID, "age": 72}, {**VALID, "snooze_frequency": 0.9}, VALID]
+    body = "".join(json.dumps(row) + "\n" for row in instances)
+
+    response = _post(
+        stream_client,
+        "/predict/stream",
+        content=body,
+        headers={"Content-Type": ndjson_stream.MEDIA_TYPE}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(ndjson_stream.MEDIA_TYPE)
+    streamed = [json.loads(line) for line in response.text.splitlines()]
+
+    batch = _post(stream_client, "/predict/batch", json={"instances": instances}).json()["results"]
+    assert [row["index"] for row in streamed] == list(range(len(instances)))
+    for got, expected in zip(streamed, batch):
+        assert got.get("predicted_adherence_rate") == expected["predicted_adherence_rate"]
+        assert got.get("confidence") == expected["confidence"]
+        assert ("errors" in got) == (expected["errors"] is not None)
+
+
+def test_stream_integer_overflow_row_fails_alone(stream_client):
+    """Test that a whole float beyond int64 is one validation error, not a failed chunk."""
+    instances = [VALID, {**VALID, "days_since_start": 1e300}, VALID]
+    body = "".join(json.dumps(row) + "\n" for row in instances)
+
+    response = _post(stream_client, "/predict/stream", content=body)
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert lines[0]["predicted_adherence_rate"] == lines[2]["predicted_adherence_rate"]
+    assert "predicted_adherence_rate" not in lines[1]
+    assert [error["type"] for error in lines[1]["errors"]] == ["int_parsing_size"]
+
+
+def test_stream_compact_rows_and_bad_json(stream_client):
+    """Test that array rows are scored and unparsable lines reported in place."""
+    row = [VALID[name] for name in prediction.FEATURE_ORDER]
+    body = json.dumps(row) + "\nnot json\n" + json.dumps(VALID) + "\n"
+
+    response = _post(stream_client, "/predict/stream", content=body)
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert lines[0]["predicted_adherence_rate"] == lines[2]["predicted_adherence_rate"]
+    assert lines[1]["index"] == 1
+    assert lines[1]["errors"][0]["type"] == "json_invalid"
+
+
+def test_stream_reports_saturation(stream_client, monkeypatch):
+    """Test that a pool saturated past the wait ends the stream with an error record."""
+    async def saturated(features):
+        raise prediction.PoolSaturatedError("Inference pool saturated (64 calls pending)")
+
+    monkeypatch.setattr(prediction, "_score", saturated)
+    monkeypatch.setattr(prediction, "STREAM_CHUNK_ROWS", 1)
+    monkeypatch.setattr(prediction, "STREAM_MAX_WAIT_SECONDS", 0.05)
+    body = "".join(json.dumps(VALID) + "\n" for _ in range(3))
+
+    response = _post(stream_client, "/predict/stream", content=body)
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert lines[0]["errors"][0]["type"] == "prediction_failed"
+    assert lines[-1] == {"error": "Prediction service is busy. Please retry shortly.", "rows_read": 1}
+
+
+def test_stream_reports_scoring_failure(stream_client, monkeypatch):
+    """Test that a chunk failing to score gets an error line per row and the stream continues."""
+    calls = []
+
+    async def flaky(features):
+        calls.append(len(features))
+        if len(calls) == 1:
+            raise RuntimeError("model exploded")
+        return np.full(len(features), 50.0)
+
+    monkeypatch.setattr(prediction, "_score", flaky)
+    monkeypatch.setattr(prediction, "STREAM_CHUNK_ROWS", 2)
+    body = "".join(json.dumps(VALID) + "\n" for _ in range(4))
+
+    response = _post(stream_client, "/predict/stream", content=body)
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert [line["index"] for line in lines] == [0, 1, 2, 3]
+    assert all(line["errors"][0]["msg"] == "Prediction failed: model exploded" for line in lines[:2])
+    assert [line["predicted_adherence_rate"] for line in lines[2:]] == [50.0, 50.0]
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Access to the inference modules that live with the API.
+
+compiled_model.py and onnx_model.py sit in summative/API so the deployed
+service can load compiled and ONNX artifacts without this directory. The
+training-side modules (predict_adherence.py, parallel_scoring.py,
+compare_and_select_model.py) import them after calling add_api_path(),
+which puts that directory on sys.path once, however many modules ask.
+
+Author: MedMind Development Team
+"""
+
+import os
+import sys
+
+API_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'API'))
+
+
+def add_api_path() -> None:
+    """Make summative/API importable; a no-op if it already is."""
+    if API_DIR not in (os.path.normpath(os.path.abspath(entry)) for entry in sys.path if entry):
+        sys.path.insert(0, API_DIR)
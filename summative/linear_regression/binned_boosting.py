@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Histogram gradient boosting trained on memory-mapped, binned features.
+
+scikit-learn's HistGradientBoostingRegressor bins its input internally, but
+needs the whole float64 feature matrix in memory first. fit_binned_gbm()
+instead trains on a file of uint8 bin codes (one byte per value, at most 255
+bins per feature) and a file of targets, mapping one chunk of rows at a time,
+so the training set only has to fit on disk.
+
+Trees (squared loss) grow level by level. Each pass over the rows moves them
+below the splits chosen at the previous level, or adds a finished tree's leaf
+values to the running predictions, and accumulates the gradient sum and row
+count of every (node, feature, bin). Every split of the next level is chosen
+from those histograms, so a tree of depth d costs d passes over the files.
+
+BinnedGradientBoosting.predict() takes standardized features, like the other
+saved models, and bins them with the training edges. train_out_of_core.py
+builds the bin files from a streamed dataset.
+
+Author: MedMind Development Team
+"""
+
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MAX_BINS = 255
+
+
+def bin_edges(sample: np.ndarray, max_bins: int = MAX_BINS) -> List[np.ndarray]:
+    """
+    Per-feature bin edges: midpoints between distinct values, or quantiles when there are too many.
+    """
+    edges = []
+    for column in sample.T:
+        distinct = np.unique(column)
+        if len(distinct) <= max_bins:
+            edges.append((distinct[:-1] + distinct[1:]) / 2)
+        else:
+            quantiles = np.linspace(0, 100, max_bins + 1)[1:-1]
+            edges.append(np.unique(np.percentile(column, quantiles, method='midpoint')))
+    return edges
+
+
+def bin_features(X: np.ndarray, edges: Sequence[np.ndarray]) -> np.ndarray:
+    """uint8 bin code of every value."""
+    codes = np.empty(X.shape, dtype=np.uint8)
+    for j, feature_edges in enumerate(edges):
+        codes[:, j] = np.searchsorted(feature_edges, X[:, j], side='right')
+    return codes
+
+
+@dataclass
+class _Tree:
+    """A regression tree over bin codes; feature -1 marks a leaf."""
+
+    feature: List[int] = field(default_factory=lambda: [-1])
+    threshold: List[int] = field(default_factory=lambda: [0])
+    left: List[int] = field(default_factory=lambda: [0])
+    right: List[int] = field(default_factory=lambda: [0])
+    value: List[float] = field(default_factory=lambda: [0.0])
+
+    def split(self, node: int, feature: int, threshold: int, left_value: float, right_value: float) -> Tuple[int, int]:
+        """Turn a leaf into a split; returns the new children's ids."""
+        children = []
+        for value in (left_value, right_value):
+            children.append(len(self.feature))
+            self.feature.append(-1)
+            self.threshold.append(0)
+            self.left.append(0)
+            self.right.append(0)
+            self.value.append(value)
+        self.feature[node], self.threshold[node] = feature, threshold
+        self.left[node], self.right[node] = children
+        return children[0], children[1]
+
+    def arrays(self) -> Tuple[np.ndarray, ...]:
+        return (np.asarray(self.feature, dtype=np.int64), np.asarray(self.threshold, dtype=np.int64),
+                np.asarray(self.left, dtype=np.int64), np.asarray(self.right, dtype=np.int64),
+                np.asarray(self.value, dtype=np.float64))
+
+
+def _route(arrays: Tuple[np.ndarray, ...], nodes: np.ndarray, codes: np.ndarray, active: np.ndarray) -> None:
+    """Move the rows whose node is active one level down, in place."""
+    feature, threshold, left, right, _ = arrays
+    rows = np.flatnonzero(active[nodes])
+    if len(rows):
+        current = nodes[rows]
+        go_left = codes[rows, feature[current]] <= threshold[current]
+        nodes[rows] = np.where(go_left, left[current], right[current])
+
+
+class BinnedGradientBoosting:
+    """
+    Gradient-boosted regression trees over binned features.
+
+    Trained by fit_binned_gbm(); predict() takes standardized features, like
+    the other saved models, and bins them with the training edges.
+    """
+
+    def __init__(self, edges: List[np.ndarray], baseline: float, trees: List[_Tree], max_depth: int):
+        self.edges = edges
+        self.baseline = baseline
+        self.trees = [tree.arrays() for tree in trees]
+        self.max_depth = max_depth
+        self.n_features_in_ = len(edges)
+
+    def predict(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        codes = bin_features(X, self.edges)
+        predictions = np.full(len(X), self.baseline)
+        for arrays in self.trees:
+            nodes = np.zeros(len(X), dtype=np.int64)
+            internal = arrays[0] >= 0
+            for _ in range(self.max_depth):
+                _route(arrays, nodes, codes, internal)
+            predictions += arrays[4][nodes]
+        return predictions
+
+
+def map_rows(path: str, dtype, width: int, start: int, stop: int, mode: str = 'r+') -> np.memmap:
+    """Memory-map rows start:stop of a row-major binary file."""
+    itemsize = np.dtype(dtype).itemsize * max(width, 1)
+    shape = (stop - start, width) if width else (stop - start,)
+    return np.memmap(path, dtype=dtype, mode=mode, offset=start * itemsize, shape=shape)
+
+
+def fit_binned_gbm(
+    work_dir: str,
+    n_rows: int,
+    edges: List[np.ndarray],
+    baseline: float,
+    n_estimators: int = 100,
+    learning_rate: float = 0.1,
+    max_depth: int = 6,
+    min_samples_leaf: int = 20,
+    l2_regularization: float = 0.0,
+    chunk_rows: int = 500_000,
+    progress: bool = False
+) -> BinnedGradientBoosting:
+    """
+    Train gradient boosting on the memory-mapped bins.bin/target.bin in work_dir.
+
+    Trees grow level by level. Each pass over the rows first moves them below
+    the splits chosen at the previous level (or adds the finished tree's leaf
+    values to the running predictions), then accumulates gradient sums and
+    counts per (node, feature, bin); every split of the next level is chosen
+    from those histograms.
+
+    Args:
+        work_dir: Directory holding bins.bin (n_rows x features, uint8) and target.bin (float64)
+        n_rows: Number of training rows
+        edges: Bin edges the codes were made with
+        baseline: Initial prediction (the training target mean)
+        n_estimators: Number of trees
+        learning_rate: Shrinkage of each tree's leaf values
+        max_depth: Maximum tree depth
+        min_samples_leaf: Minimum training rows in a leaf
+        l2_regularization: L2 penalty on leaf values
+        chunk_rows: Rows mapped per step
+        progress: Print the training MSE to stderr every 10 trees
+
+    Returns:
+        BinnedGradientBoosting: The fitted model
+    """
+    n_features = len(edges)
+    n_bins = MAX_BINS
+    bins_path, target_path = os.path.join(work_dir, 'bins.bin'), os.path.join(work_dir, 'target.bin')
+    raw_path, node_path = os.path.join(work_dir, 'raw.bin'), os.path.join(work_dir, 'node.bin')
+    # Every row starts at the root (zero-filled node ids) predicting the baseline
+    for path, itemsize in ((raw_path, 8), (node_path, 4)):
+        with open(path, 'wb') as f:
+            f.truncate(n_rows * itemsize)
+    for start in range(0, n_rows, chunk_rows):
+        raw_map = map_rows(raw_path, np.float64, 0, start, min(start + chunk_rows, n_rows))
+        raw_map[:] = baseline
+        raw_map.flush()
+        del raw_map
+
+    def scan(routing, finished: Optional[np.ndarray], level: Sequence[int], n_nodes: int):
+        """
+        One pass over the rows; returns (gradient sums, counts) per level node, feature
+        and bin, and the squared error of the level's rows.
+
+        routing: (tree arrays, active nodes) to move rows one level down first
+        finished: leaf values of a completed tree to add to the predictions, resetting rows to the root
+        level: nodes whose histograms are accumulated; n_nodes bounds the node ids after routing
+        """
+        lookup = np.full(n_nodes, -1, dtype=np.int64)
+        lookup[list(level)] = np.arange(len(level))
+        size = len(level) * n_features * n_bins
+        grad_hist, count_hist = np.zeros(size), np.zeros(size)
+        offsets = np.arange(n_features) * n_bins
+        squared_error = 0.0
+        for start in range(0, n_rows, chunk_rows):
+            stop = min(start + chunk_rows, n_rows)
+            codes = np.asarray(map_rows(bins_path, np.uint8, n_features, start, stop, mode='r'))
+            node_map = map_rows(node_path, np.int32, 0, start, stop)
+            raw_map = map_rows(raw_path, np.float64, 0, start, stop)
+            nodes = node_map.astype(np.int64)
+            if routing is not None:
+                _route(routing[0], nodes, codes, routing[1])
+            if finished is not None:
+                raw_map += finished[nodes]
+                nodes[:] = 0
+            node_map[:] = nodes
+            if level:
+                gradient = raw_map - map_rows(target_path, np.float64, 0, start, stop, mode='r')
+                position = lookup[nodes]
+                keep = position >= 0
+                squared_error += float(gradient[keep] @ gradient[keep])
+                index = (position[keep, None] * (n_features * n_bins) + offsets + codes[keep]).ravel()
+                grad_hist += np.bincount(index, weights=np.repeat(gradient[keep], n_features), minlength=size)
+                count_hist += np.bincount(index, minlength=size)
+            node_map.flush()
+            raw_map.flush()
+            del node_map, raw_map
+        shape = (len(level), n_features, n_bins)
+        return grad_hist.reshape(shape), count_hist.reshape(shape), squared_error
+
+    def leaf_value(gradient_sum, count):
+        return -learning_rate * gradient_sum / (count + l2_regularization)
+
+    trees: List[_Tree] = []
+    routing, finished = None, None
+    for tree_index in range(n_estimators):
+        tree = _Tree()
+        level = [0]
+        for depth in range(max_depth):
+            # The first pass of a tree also finishes the previous one
+            grad_hist, count_hist, squared_error = scan(routing, finished, level, n_nodes=len(tree.feature))
+            routing, finished = None, None
+            if depth == 0:
+                tree.value[0] = leaf_value(grad_hist[0, 0].sum(), count_hist[0, 0].sum())
+                if progress and tree_index % 10 == 0:
+                    print(f"  tree {tree_index}: train MSE {squared_error / n_rows:.4f}", file=sys.stderr)
+
+            # Gain of every "bin <= threshold" split of every level node and feature
+            grad_left = np.cumsum(grad_hist, axis=2)[:, :, :-1]
+            count_left = np.cumsum(count_hist, axis=2)[:, :, :-1]
+            grad_total = grad_hist[:, :1].sum(axis=2, keepdims=True)
+            count_total = count_hist[:, :1].sum(axis=2, keepdims=True)
+            grad_right, count_right = grad_total - grad_left, count_total - count_left
+            with np.errstate(divide='ignore', invalid='ignore'):
+                gain = (grad_left ** 2 / (count_left + l2_regularization)
+                        + grad_right ** 2 / (count_right + l2_regularization)
+                        - grad_total ** 2 / (count_total + l2_regularization))
+            gain[(count_left < min_samples_leaf) | (count_right < min_samples_leaf)] = -np.inf
+
+            next_level = []
+            for position, node in enumerate(level):
+                feature, threshold = divmod(int(np.argmax(gain[position])), n_bins - 1)
+                if not gain[position, feature, threshold] > 1e-12:
+                    continue
+                next_level.extend(tree.split(
+                    node, feature, threshold,
+                    leaf_value(grad_left[position, feature, threshold], count_left[position, feature, threshold]),
+                    leaf_value(grad_right[position, feature, threshold], count_right[position, feature, threshold])
+                ))
+            if not next_level:
+                break
+            # Rows are moved below these splits at the start of the next pass
+            arrays = tree.arrays()
+            active = np.zeros(len(tree.feature), dtype=bool)
+            active[level] = arrays[0][level] >= 0
+            routing = (arrays, active)
+            level = next_level
+        trees.append(tree)
+        finished = tree.arrays()[4]
+
+    # Route below the last splits and add the last tree's leaf values
+    scan(routing, finished, [], n_nodes=1)
+    return BinnedGradientBoosting(edges, baseline, trees, max_depth)
@@ -2,10 +2,11 @@
 """
 Script to compare all three models and select the best performer.
 This script:
-1. Loads metrics from all three trained models
+1. Loads the latest metrics of all three models from models/metrics.db
 2. Creates a comprehensive comparison table
 3. Identifies the best model based on test MSE
-4. Trains and saves the best model to disk
+4. Saves the best model to disk, reusing the estimator persisted by
+   train_models.py when it matches the compared metrics
 5. Documents the model selection rationale
 """
 
@@ -15,11 +16,6 @@ import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LinearRegression
-from sklearn.tree import DecisionTreeRegressor
-from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, r2_score
 import joblib
 import os
@@ -27,6 +23,17 @@ import time
 import warnings
 warnings.filterwarnings('ignore')
 
+# Flat-array inference engine shared with the API
+from api_path import add_api_path
+add_api_path()
+from compiled_model import compile_model, fold_scaler, save_compiled, verify_compiled, verify_fused
+import onnx_model
+
+# Cached data preparation, the shared search driver and the run metrics store
+from metrics_store import MetricsStore
+from preprocess import TARGET_COLUMN, dataset_hash, prepare_data
+import train_models
+
 print("="*80)
 print("MODEL COMPARISON AND SELECTION")
 print("="*80)
@@ -36,7 +43,7 @@ print("\n1. Loading metrics from trained models...")
 print("-"*80)
 
 def parse_metrics_file(filepath):
-    """Parse metrics file and extract key values."""
+    """Parse a metrics file; used for runs that predate models/metrics.db."""
     metrics = {}
     with open(filepath, 'r') as f:
         content = f.read()
@@ -75,14 +82,22 @@ def parse_metrics_file(filepath):
     
     return metrics
 
-# Load metrics for all models
-lr_metrics = parse_metrics_file('models/lr_metrics.txt')
-dt_metrics = parse_metrics_file('models/dt_metrics.txt')
-rf_metrics = parse_metrics_file('models/rf_metrics.txt')
+def load_family_metrics(latest_runs, family, name):
+    """Latest recorded run of a family, or its metrics file if none was recorded."""
+    run = latest_runs.get(family)
+    if run is not None:
+        print(f"   ✅ {name} metrics loaded (run {run['run_id'][:8]} from {run['source']})")
+        return {**run, 'training_time': run['training_seconds']}
+    print(f"   ✅ {name} metrics loaded (models/{family}_metrics.txt)")
+    return parse_metrics_file(f'models/{family}_metrics.txt')
 
-print("   ✅ Linear Regression metrics loaded")
-print("   ✅ Decision Tree metrics loaded")
-print("   ✅ Random Forest metrics loaded")
+# Latest run of each family on the current dataset, in one query
+with MetricsStore() as store:
+    latest_runs = store.latest(dataset_hash=dataset_hash('adherence_data.csv'))
+
+lr_metrics = load_family_metrics(latest_runs, 'lr', 'Linear Regression')
+dt_metrics = load_family_metrics(latest_runs, 'dt', 'Decision Tree')
+rf_metrics = load_family_metrics(latest_runs, 'rf', 'Random Forest')
 
 # Step 2: Create comparison table
 print("\n2. Creating comprehensive comparison table...")
@@ -132,75 +147,34 @@ for idx, row in comparison_df.iterrows():
 print(f"\n4. Training and saving the best model ({best_model_name})...")
 print("-"*80)
 
-# Load dataset
+# Cached data preparation (same cleaning, scaler and 80/20 split as the run_*.py scripts)
 print("   Loading dataset...")
-df = pd.read_csv('adherence_data.csv')
-df_clean = df.dropna()
-
-# Prepare features and target
-target_col = 'adherence_rate'
-feature_cols = [col for col in df_clean.columns if col != target_col]
-X = df_clean[feature_cols]
-y = df_clean[target_col]
-
-# Standardize features
-print("   Standardizing features...")
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
-
-# Train-test split
-X_train, X_test, y_train, y_test = train_test_split(
-    X_scaled, y, test_size=0.2, random_state=42
-)
-
-# Train the best model
-print(f"   Training {best_model_name}...")
+data = prepare_data('adherence_data.csv')
+feature_cols = data.feature_cols
+scaler = data.scaler
+X_train, X_test, y_train, y_test = data.X_train, data.X_test, data.y_train, data.y_test
+
+# Reuse the estimator saved by train_models.py when it matches the compared metrics;
+# otherwise search for it again on the shared driver
+best_key = {family.name: key for key, family in train_models.MODEL_FAMILIES.items()}[best_model_name]
+saved_model_path = f'models/{best_key}_model.pkl'
 start_time = time.time()
-
-if best_model_name == 'Linear Regression':
-    best_model = LinearRegression()
-    best_model.fit(X_train, y_train)
-    
-elif best_model_name == 'Decision Tree':
-    # Use best hyperparameters from tuning
-    param_grid = {
-        'max_depth': [3, 5, 7, 10, 15, 20, None],
-        'min_samples_split': [2, 5, 10, 20],
-        'min_samples_leaf': [1, 2, 4, 8]
-    }
-    dt_base = DecisionTreeRegressor(random_state=42)
-    grid_search = GridSearchCV(
-        estimator=dt_base,
-        param_grid=param_grid,
-        cv=5,
-        scoring='neg_mean_squared_error',
-        n_jobs=-1,
-        verbose=0
-    )
-    grid_search.fit(X_train, y_train)
-    best_model = grid_search.best_estimator_
-    
-elif best_model_name == 'Random Forest':
-    # Use best hyperparameters from tuning
-    param_grid = {
-        'n_estimators': [100, 200, 300],
-        'max_depth': [10, 15, 20, None],
-        'min_samples_split': [2, 5, 10],
-        'min_samples_leaf': [1, 2, 4]
-    }
-    rf_base = RandomForestRegressor(random_state=42, n_jobs=-1)
-    grid_search = GridSearchCV(
-        estimator=rf_base,
-        param_grid=param_grid,
-        cv=5,
-        scoring='neg_mean_squared_error',
-        n_jobs=-1,
-        verbose=0
-    )
-    grid_search.fit(X_train, y_train)
-    best_model = grid_search.best_estimator_
-
-training_time = time.time() - start_time
+best_model = None
+if os.path.exists(saved_model_path):
+    saved_model = joblib.load(saved_model_path)
+    saved_test_mse = mean_squared_error(y_test, saved_model.predict(X_test))
+    if abs(saved_test_mse - best_test_mse) < 1e-3:
+        best_model = saved_model
+        training_time = comparison_df.loc[best_idx, 'Training Time (s)']
+        print(f"   ✅ Reusing trained {best_model_name} from {saved_model_path}")
+    else:
+        print(f"   ⚠️  {saved_model_path} does not match the compared metrics; retraining")
+
+if best_model is None:
+    print(f"   Training {best_model_name}...")
+    result = train_models.search_all(data, [best_key])[best_key]
+    best_model = result.estimator
+    training_time = time.time() - start_time
 print(f"   ✅ Model trained in {training_time:.2f} seconds")
 
 # Verify model performance
@@ -226,6 +200,57 @@ scaler_size = os.path.getsize(scaler_path) / 1024  # KB
 print(f"   ✅ Best model saved: {model_path} ({model_size:.2f} KB)")
 print(f"   ✅ Scaler saved: {scaler_path} ({scaler_size:.2f} KB)")
 
+# Compile tree models into the flat-array inference engine used by the API
+compiled_path = None
+if best_model_name in ('Random Forest', 'Decision Tree'):
+    print("\n   Compiling model to flat-array inference artifact...")
+    compiled_model = compile_model(best_model)
+    parity = verify_compiled(best_model, compiled_model, X_test)
+    if parity['identical']:
+        compiled_path = 'models/best_model_compiled.pkl'
+        save_compiled(compiled_model, compiled_path)
+        compiled_size = os.path.getsize(compiled_path) / 1024  # KB
+        print(f"   ✅ Compiled model saved: {compiled_path} ({compiled_size:.2f} KB, "
+              f"{compiled_model.n_trees} trees, {compiled_model.node_count} nodes)")
+        print(f"   ✅ Parity verified on {parity['rows']} test rows (bit-for-bit identical)")
+    else:
+        print(f"   ⚠️  Compiled model differs on {parity['mismatched_rows']} rows "
+              f"(max |diff| {parity['max_abs_diff']:.3e}); artifact not saved")
+
+# Fold the scaler into the model so serving does a single pass on raw features
+print("\n   Exporting fused predictor (scaler folded into model)...")
+X_test_raw = data.X_test_raw
+fused_model = fold_scaler(compile_model(best_model), scaler)
+fused_parity = verify_fused(best_model, scaler, fused_model, X_test_raw)
+fused_path = None
+if fused_parity['passed']:
+    fused_path = 'models/best_model_fused.pkl'
+    save_compiled(fused_model, fused_path)
+    print(f"   ✅ Fused predictor saved: {fused_path}")
+    print(f"   ✅ Verified against scaler.transform + predict on {fused_parity['rows']} "
+          f"test rows (max |diff| {fused_parity['max_abs_diff']:.3e})")
+else:
+    print(f"   ⚠️  Fused predictor differs from the two-stage pipeline "
+          f"(max |diff| {fused_parity['max_abs_diff']:.3e}); artifact not saved")
+
+# Export scaler + model as one ONNX graph so the API can serve without scikit-learn
+onnx_path = None
+if onnx_model.convert_sklearn is None or onnx_model.ort is None:
+    print("\n   Skipping ONNX export (requires skl2onnx and onnxruntime)")
+else:
+    print("\n   Exporting ONNX graph (scaler + model)...")
+    onnx_predictor = onnx_model.OnnxPredictor(onnx_model.to_onnx(best_model, scaler))
+    onnx_parity = verify_fused(best_model, scaler, onnx_predictor, X_test_raw, atol=onnx_model.PARITY_ATOL)
+    if onnx_parity['passed']:
+        onnx_path = 'models/best_model.onnx'
+        onnx_model.export_onnx(best_model, scaler, onnx_path)
+        print(f"   ✅ ONNX graph saved: {onnx_path} ({os.path.getsize(onnx_path) / 1024:.2f} KB)")
+        print(f"   ✅ Verified against scaler.transform + predict on {onnx_parity['rows']} "
+              f"test rows (max |diff| {onnx_parity['max_abs_diff']:.3e})")
+    else:
+        print(f"   ⚠️  ONNX graph differs from the two-stage pipeline "
+              f"(max |diff| {onnx_parity['max_abs_diff']:.3e}); not saved")
+
 # Step 5: Document model selection rationale
 print("\n5. Documenting model selection rationale...")
 print("-"*80)
@@ -324,10 +349,10 @@ with open(rationale_path, 'w') as f:
     
     f.write("DATASET CHARACTERISTICS\n")
     f.write("-"*80 + "\n")
-    f.write(f"Dataset Size: {len(df_clean)} records\n")
+    f.write(f"Dataset Size: {len(data.X_train) + len(data.X_test)} records\n")
     f.write(f"Number of Features: {len(feature_cols)}\n")
     f.write(f"Features: {', '.join(feature_cols)}\n")
-    f.write(f"Target Variable: {target_col} (continuous, 0-100%)\n\n")
+    f.write(f"Target Variable: {TARGET_COLUMN} (continuous, 0-100%)\n\n")
     
     f.write("The medication adherence dataset contains patient demographics,\n")
     f.write("medication complexity, and behavioral patterns. The selected model\n")
@@ -421,6 +446,12 @@ print(f"  - Test RMSE: {best_test_rmse:.4f} (average error in percentage points)
 print(f"\nFiles Created:")
 print(f"  - models/best_model.pkl ({model_size:.2f} KB)")
 print(f"  - models/scaler.pkl ({scaler_size:.2f} KB)")
+if compiled_path:
+    print(f"  - {compiled_path}")
+if fused_path:
+    print(f"  - {fused_path}")
+if onnx_path:
+    print(f"  - {onnx_path}")
 print(f"  - models/model_selection_rationale.txt")
 print(f"  - plots/model_comparison.png")
 print(f"\nThe best model is ready for deployment in the FastAPI prediction service!")
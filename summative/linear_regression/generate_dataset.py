@@ -3,114 +3,296 @@ Generate a synthetic medication adherence dataset for training ML models.
 
 This script creates a realistic dataset with 1500 patient records and 8+ features
 that influence medication adherence rates.
+
+For load-testing training and serving, --rows generates any number of rows
+with the same generative formula. The rows are produced in fixed-size chunks,
+each drawn from its own np.random.Generator stream spawned from --seed, and
+each chunk is written by a worker process straight to its own partition file
+(part-00000.parquet, part-00001.parquet, ...). Memory stays at one chunk per
+worker however many rows are requested, and because a chunk's stream depends
+only on the seed and its index, the output is identical for any --workers.
+
+Usage:
+    python generate_dataset.py          # The 1500-row adherence_data.csv (run from the repository root)
+    python generate_dataset.py --rows 100000000 --output data/adherence_100m --workers 8
+
+Parquet output requires pyarrow.
 """
 
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Union
+
 import pandas as pd
 import numpy as np
 
-# Set random seed for reproducibility
-np.random.seed(42)
-
-# Number of records
-n_samples = 1500
-
-# Generate features
-data = {
-    # Patient demographics
-    'age': np.random.randint(18, 121, n_samples),
-    
-    # Medication characteristics
-    'num_medications': np.random.randint(1, 21, n_samples),
-    'medication_complexity': np.random.uniform(1.0, 5.0, n_samples),
-    
-    # Temporal factors
-    'days_since_start': np.random.randint(0, 3651, n_samples),
-    
-    # Recent behavior
-    'missed_doses_last_week': np.random.randint(0, 51, n_samples),
-    'snooze_frequency': np.random.uniform(0.0, 1.0, n_samples),
-    
-    # Health factors
-    'chronic_conditions': np.random.randint(0, 11, n_samples),
-    'previous_adherence_rate': np.random.uniform(0.0, 100.0, n_samples),
-}
-
-# Create DataFrame
-df = pd.DataFrame(data)
-
-# Generate target variable (adherence_rate) based on features
-# This creates realistic relationships between features and adherence
-
-# Base adherence rate
-adherence_rate = 75.0
-
-# Age effect: older patients tend to be more adherent (up to age 70, then slight decline)
-age_effect = np.where(df['age'] < 70, 
-                      (df['age'] - 18) * 0.15,  # Increase with age
-                      (df['age'] - 70) * -0.05 + (70 - 18) * 0.15)  # Slight decline after 70
-
-# Medication complexity: more complex = lower adherence
-complexity_effect = -5.0 * (df['medication_complexity'] - 1.0)
-
-# Number of medications: polypharmacy reduces adherence
-num_meds_effect = -1.5 * (df['num_medications'] - 1)
-
-# Days since start: adherence decreases over time
-days_effect = -0.002 * df['days_since_start']
-
-# Recent missed doses: strong negative predictor
-missed_effect = -2.0 * df['missed_doses_last_week']
-
-# Snooze frequency: procrastination reduces adherence
-snooze_effect = -15.0 * df['snooze_frequency']
-
-# Chronic conditions: more conditions = slightly better adherence (health awareness)
-conditions_effect = 1.0 * df['chronic_conditions']
-
-# Previous adherence: strongest predictor (regression to mean)
-previous_effect = 0.4 * (df['previous_adherence_rate'] - 75.0)
-
-# Combine all effects
-df['adherence_rate'] = (
-    adherence_rate +
-    age_effect +
-    complexity_effect +
-    num_meds_effect +
-    days_effect +
-    missed_effect +
-    snooze_effect +
-    conditions_effect +
-    previous_effect +
-    np.random.normal(0, 5, n_samples)  # Add noise
-)
-
-# Clip to valid range [0, 100]
-df['adherence_rate'] = df['adherence_rate'].clip(0, 100)
-
-# Round to 2 decimal places
-df['adherence_rate'] = df['adherence_rate'].round(2)
-
-# Introduce some missing values (realistic scenario)
-# Randomly set 2% of values to NaN across different columns
-for col in ['medication_complexity', 'snooze_frequency', 'previous_adherence_rate']:
-    mask = np.random.random(n_samples) < 0.02
-    df.loc[mask, col] = np.nan
-
-# Save to CSV
-output_path = 'summative/linear_regression/adherence_data.csv'
-df.to_csv(output_path, index=False)
-
-print(f"Dataset generated successfully!")
-print(f"Saved to: {output_path}")
-print(f"\nDataset Statistics:")
-print(f"- Total records: {len(df)}")
-print(f"- Number of features: {len(df.columns) - 1}")  # Exclude target
-print(f"- Target variable: adherence_rate")
-print(f"\nFeature columns:")
-for col in df.columns:
-    if col != 'adherence_rate':
-        print(f"  - {col}")
-print(f"\nTarget column:")
-print(f"  - adherence_rate (range: {df['adherence_rate'].min():.2f} - {df['adherence_rate'].max():.2f})")
-print(f"\nMissing values:")
-print(df.isnull().sum())
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pq = None
+
+# Seed and size of the committed dataset
+SEED = 42
+N_SAMPLES = 1500
+OUTPUT_PATH = 'summative/linear_regression/adherence_data.csv'
+
+# Columns that get 2% missing values
+MISSING_COLUMNS = ['medication_complexity', 'snooze_frequency', 'previous_adherence_rate']
+MISSING_RATE = 0.02
+
+
+def simulate_patients(rng: Union[np.random.Generator, np.random.RandomState], n_samples: int) -> Dict[str, np.ndarray]:
+    """
+    Draw n_samples patient records and their adherence rate.
+
+    Args:
+        rng: Random source; draws are made in the same order for either type,
+            so a RandomState seeded with SEED reproduces adherence_data.csv
+        n_samples: Number of records
+
+    Returns:
+        dict: Column name to array, in adherence_data.csv column order
+    """
+    integers = rng.integers if isinstance(rng, np.random.Generator) else rng.randint
+
+    # Generate features
+    data = {
+        # Patient demographics
+        'age': integers(18, 121, n_samples),
+
+        # Medication characteristics
+        'num_medications': integers(1, 21, n_samples),
+        'medication_complexity': rng.uniform(1.0, 5.0, n_samples),
+
+        # Temporal factors
+        'days_since_start': integers(0, 3651, n_samples),
+
+        # Recent behavior
+        'missed_doses_last_week': integers(0, 51, n_samples),
+        'snooze_frequency': rng.uniform(0.0, 1.0, n_samples),
+
+        # Health factors
+        'chronic_conditions': integers(0, 11, n_samples),
+        'previous_adherence_rate': rng.uniform(0.0, 100.0, n_samples),
+    }
+
+    # Generate target variable (adherence_rate) based on features
+    # This creates realistic relationships between features and adherence
+
+    # Base adherence rate
+    adherence_rate = 75.0
+
+    # Age effect: older patients tend to be more adherent (up to age 70, then slight decline)
+    age = data['age']
+    age_effect = np.where(age < 70,
+                          (age - 18) * 0.15,  # Increase with age
+                          (age - 70) * -0.05 + (70 - 18) * 0.15)  # Slight decline after 70
+
+    # Medication complexity: more complex = lower adherence
+    complexity_effect = -5.0 * (data['medication_complexity'] - 1.0)
+
+    # Number of medications: polypharmacy reduces adherence
+    num_meds_effect = -1.5 * (data['num_medications'] - 1)
+
+    # Days since start: adherence decreases over time
+    days_effect = -0.002 * data['days_since_start']
+
+    # Recent missed doses: strong negative predictor
+    missed_effect = -2.0 * data['missed_doses_last_week']
+
+    # Snooze frequency: procrastination reduces adherence
+    snooze_effect = -15.0 * data['snooze_frequency']
+
+    # Chronic conditions: more conditions = slightly better adherence (health awareness)
+    conditions_effect = 1.0 * data['chronic_conditions']
+
+    # Previous adherence: strongest predictor (regression to mean)
+    previous_effect = 0.4 * (data['previous_adherence_rate'] - 75.0)
+
+    # Combine all effects
+    target = (
+        adherence_rate +
+        age_effect +
+        complexity_effect +
+        num_meds_effect +
+        days_effect +
+        missed_effect +
+        snooze_effect +
+        conditions_effect +
+        previous_effect +
+        rng.normal(0, 5, n_samples)  # Add noise
+    )
+
+    # Clip to valid range [0, 100] and round to 2 decimal places
+    data['adherence_rate'] = np.round(np.clip(target, 0, 100), 2)
+
+    # Introduce some missing values (realistic scenario)
+    # Randomly set 2% of values to NaN across different columns
+    for col in MISSING_COLUMNS:
+        mask = rng.random(n_samples) < MISSING_RATE
+        data[col][mask] = np.nan
+
+    return data
+
+
+def _chunk_rng(seed: int, index: int) -> np.random.Generator:
+    """Independent stream of chunk index: child `index` of SeedSequence(seed).spawn()."""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+
+
+def _write_chunk(output_dir: str, index: int, n_rows: int, seed: int, file_format: str) -> int:
+    """Generate chunk index and write it to its partition file; returns the file size."""
+    data = simulate_patients(_chunk_rng(seed, index), n_rows)
+    path = os.path.join(output_dir, f'part-{index:05d}.{file_format}')
+    # Write under a temporary name so a partition file is never half-written
+    staging = os.path.join(output_dir, f'.part-{index:05d}.tmp')
+    if file_format == 'parquet':
+        # from_pandas turns NaN into Parquet nulls
+        table = pa.table({name: pa.array(values, from_pandas=True) for name, values in data.items()})
+        pq.write_table(table, staging)
+    else:
+        pd.DataFrame(data).to_csv(staging, index=False)
+    os.replace(staging, path)
+    return os.path.getsize(path)
+
+
+def generate_partitioned(
+    output_dir: str,
+    rows: int,
+    chunk_rows: int = 1_000_000,
+    workers: int = 1,
+    seed: int = SEED,
+    file_format: str = 'parquet',
+    progress: bool = False
+) -> Dict[str, float]:
+    """
+    Generate rows records as partition files of chunk_rows rows each.
+
+    The output depends only on rows, chunk_rows and seed, not on workers.
+    Partition files left in output_dir by an earlier run are removed first.
+
+    Args:
+        output_dir: Directory for the part-NNNNN files (created if missing)
+        rows: Total number of records
+        chunk_rows: Records per chunk and partition file
+        workers: Processes generating chunks in parallel (1 generates inline)
+        seed: Root seed of the chunk streams
+        file_format: 'parquet' or 'csv'
+        progress: Print a line to stderr after each chunk
+
+    Returns:
+        dict: rows, chunks, bytes, seconds and rows_per_second
+
+    Raises:
+        ValueError: If a size or the format is invalid
+        RuntimeError: If Parquet output is requested without pyarrow
+    """
+    if rows < 1 or chunk_rows < 1:
+        raise ValueError(f"rows and chunk_rows must be at least 1, got {rows} and {chunk_rows}")
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    if file_format not in ('parquet', 'csv'):
+        raise ValueError(f"file_format must be 'parquet' or 'csv', got {file_format!r}")
+    if file_format == 'parquet' and pq is None:
+        raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+
+    os.makedirs(output_dir, exist_ok=True)
+    for stale in glob.glob(os.path.join(output_dir, 'part-*.*')):
+        os.remove(stale)
+
+    n_chunks = -(-rows // chunk_rows)
+    sizes = [min(chunk_rows, rows - index * chunk_rows) for index in range(n_chunks)]
+    stats = {'rows': 0, 'chunks': 0, 'bytes': 0}
+    start = time.perf_counter()
+
+    def finish(index: int, size_bytes: int) -> None:
+        stats['rows'] += sizes[index]
+        stats['chunks'] += 1
+        stats['bytes'] += size_bytes
+        if progress:
+            elapsed = time.perf_counter() - start
+            print(f"  chunk {stats['chunks']}/{n_chunks}: {stats['rows']:,} rows "
+                  f"({stats['rows'] / elapsed:,.0f} rows/s)", file=sys.stderr)
+
+    if workers == 1:
+        for index, n_rows in enumerate(sizes):
+            finish(index, _write_chunk(output_dir, index, n_rows, seed, file_format))
+    else:
+        # Workers write their own partitions and return only the file size
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            written = executor.map(
+                _write_chunk,
+                [output_dir] * n_chunks, range(n_chunks), sizes, [seed] * n_chunks, [file_format] * n_chunks
+            )
+            for index, size_bytes in enumerate(written):
+                finish(index, size_bytes)
+
+    stats['seconds'] = round(time.perf_counter() - start, 3)
+    stats['rows_per_second'] = round(stats['rows'] / stats['seconds'], 1) if stats['seconds'] else 0.0
+    return stats
+
+
+def generate_dataset(output_path: str = OUTPUT_PATH) -> pd.DataFrame:
+    """Write the 1500-row dataset, drawn from the legacy global-seed stream."""
+    df = pd.DataFrame(simulate_patients(np.random.RandomState(SEED), N_SAMPLES))
+    df.to_csv(output_path, index=False)
+    return df
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate the synthetic medication adherence dataset.")
+    parser.add_argument('--rows', type=int, default=None,
+                        help=f"Generate this many rows as partition files instead of the {N_SAMPLES}-row CSV")
+    parser.add_argument('--output', default=None,
+                        help=f"CSV to write (default: {OUTPUT_PATH}); with --rows, the partition directory")
+    parser.add_argument('--format', choices=('parquet', 'csv'), default='parquet', help="Partition file format")
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000, help="Rows per partition (default: 1000000)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help=f"Generating processes (default: 1; this machine has {os.cpu_count()} cores)")
+    parser.add_argument('--seed', type=int, default=SEED, help=f"Root seed of the chunk streams (default: {SEED})")
+    parser.add_argument('--progress', action='store_true', help="Report throughput after each chunk")
+    args = parser.parse_args(argv)
+
+    if args.rows is not None:
+        if args.output is None:
+            parser.error("--rows requires --output DIR")
+        stats = generate_partitioned(
+            args.output, args.rows,
+            chunk_rows=args.chunk_rows,
+            workers=args.workers,
+            seed=args.seed,
+            file_format=args.format,
+            progress=args.progress
+        )
+        print(f"Generated {stats['rows']:,} rows in {stats['chunks']} {args.format} partitions "
+              f"({stats['bytes'] / 1e6:,.1f} MB)")
+        print(f"Time: {stats['seconds']:.2f}s ({stats['rows_per_second']:,.0f} rows/s) -> {args.output}")
+        return 0
+
+    output_path = args.output or OUTPUT_PATH
+    df = generate_dataset(output_path)
+
+    print(f"Dataset generated successfully!")
+    print(f"Saved to: {output_path}")
+    print(f"\nDataset Statistics:")
+    print(f"- Total records: {len(df)}")
+    print(f"- Number of features: {len(df.columns) - 1}")  # Exclude target
+    print(f"- Target variable: adherence_rate")
+    print(f"\nFeature columns:")
+    for col in df.columns:
+        if col != 'adherence_rate':
+            print(f"  - {col}")
+    print(f"\nTarget column:")
+    print(f"  - adherence_rate (range: {df['adherence_rate'].min():.2f} - {df['adherence_rate'].max():.2f})")
+    print(f"\nMissing values:")
+    print(df.isnull().sum())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Structured store of training run metrics.
+
+The training scripts wrote their scores only to models/*_metrics.txt, and
+compare_and_select_model.py and the per-family scripts recovered MSE, R² and
+timings by string-matching those lines. Every run now also records one row in
+an SQLite database (models/metrics.db): run id, model family, hyperparameters,
+dataset hash, search method, timings and scores. Indexes on (family, dataset)
+and (dataset, test MSE) make "latest or best run per family for this dataset"
+a single query however many runs accumulate.
+
+The database uses write-ahead logging, so the pipeline's concurrent training
+stages can record runs at the same time.
+
+Usage:
+    python metrics_store.py                  # Latest run per family
+    python metrics_store.py --best           # Best test MSE per family
+    python metrics_store.py --family rf --limit 20
+
+Author: MedMind Development Team
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+
+DEFAULT_DB = 'models/metrics.db'
+
+SCORE_COLUMNS = ('train_mse', 'train_rmse', 'train_r2', 'test_mse', 'test_rmse', 'test_r2', 'cv_mse')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    family TEXT NOT NULL,
+    model_name TEXT NOT NULL,
+    source TEXT,
+    dataset_hash TEXT,
+    params TEXT NOT NULL,
+    search TEXT,
+    training_seconds REAL,
+    train_mse REAL,
+    train_rmse REAL,
+    train_r2 REAL,
+    test_mse REAL,
+    test_rmse REAL,
+    test_r2 REAL,
+    cv_mse REAL,
+    extra TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_family_dataset ON runs (family, dataset_hash, created);
+CREATE INDEX IF NOT EXISTS runs_dataset_test_mse ON runs (dataset_hash, test_mse);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created);
+"""
+
+# Columns a query may be ordered by
+ORDER_COLUMNS = ('created', 'training_seconds') + SCORE_COLUMNS
+
+
+class MetricsStore:
+    """
+    SQLite-backed log of training runs.
+
+    Args:
+        path: Database file, created with its parent directory if missing
+    """
+
+    def __init__(self, path: str = DEFAULT_DB):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def record_run(
+        self,
+        family: str,
+        model_name: str,
+        metrics: Dict[str, float],
+        params: Optional[Dict[str, Any]] = None,
+        dataset_hash: Optional[str] = None,
+        training_seconds: Optional[float] = None,
+        source: Optional[str] = None,
+        search: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Store one training run.
+
+        Args:
+            family: Model family key ('lr', 'dt', 'rf')
+            model_name: Display name ('Random Forest')
+            metrics: Scores keyed by SCORE_COLUMNS names; missing ones are stored as NULL
+            params: Hyperparameters of the fitted model
+            dataset_hash: SHA-256 of the training CSV
+            training_seconds: Fit time, or tuning time for searched families
+            source: Script that produced the run
+            search: How the hyperparameters were searched
+            extra: Any other JSON-serializable details
+
+        Returns:
+            str: The new run id
+        """
+        run_id = uuid.uuid4().hex
+        scores = [None if metrics.get(name) is None else float(metrics[name]) for name in SCORE_COLUMNS]
+        with self._conn:
+            self._conn.execute(
+                f"INSERT INTO runs (run_id, created, family, model_name, source, dataset_hash, params, search, "
+                f"training_seconds, {', '.join(SCORE_COLUMNS)}, extra) "
+                f"VALUES ({', '.join('?' * (10 + len(SCORE_COLUMNS)))})",
+                [run_id, time.time(), family, model_name, source, dataset_hash,
+                 json.dumps(params or {}, sort_keys=True, default=str), search,
+                 None if training_seconds is None else float(training_seconds),
+                 *scores, json.dumps(extra or {}, sort_keys=True, default=str)]
+            )
+        return run_id
+
+    def runs(
+        self,
+        family: Optional[str] = None,
+        dataset_hash: Optional[str] = None,
+        source: Optional[str] = None,
+        since: Optional[float] = None,
+        order_by: str = 'created',
+        descending: bool = True,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Runs matching every given filter.
+
+        Args:
+            family: Only this model family
+            dataset_hash: Only runs on this dataset
+            source: Only runs recorded by this script
+            since: Only runs created at or after this Unix time
+            order_by: One of ORDER_COLUMNS
+            descending: Sort order
+            limit: Maximum number of runs returned
+
+        Raises:
+            ValueError: If order_by is not a known column
+        """
+        if order_by not in ORDER_COLUMNS:
+            raise ValueError(f"order_by must be one of {ORDER_COLUMNS}, got {order_by!r}")
+        clauses, values = [], []
+        for column, value in (('family', family), ('dataset_hash', dataset_hash), ('source', source)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                values.append(value)
+        if since is not None:
+            clauses.append("created >= ?")
+            values.append(since)
+        sql = "SELECT * FROM runs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {order_by} {'DESC' if descending else 'ASC'}, created DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            values.append(int(limit))
+        return [self._to_dict(row) for row in self._conn.execute(sql, values)]
+
+    def latest(self, dataset_hash: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Most recent run of each family (on one dataset if given)."""
+        return self._per_family("created DESC", dataset_hash)
+
+    def best(self, dataset_hash: Optional[str] = None, metric: str = 'test_mse') -> Dict[str, Dict[str, Any]]:
+        """
+        Run of each family with the lowest error metric (highest if it is an R²).
+
+        Raises:
+            ValueError: If metric is not a score column
+        """
+        if metric not in SCORE_COLUMNS:
+            raise ValueError(f"metric must be one of {SCORE_COLUMNS}, got {metric!r}")
+        direction = 'DESC' if metric.endswith('r2') else 'ASC'
+        return self._per_family(f"{metric} IS NULL, {metric} {direction}, created DESC", dataset_hash)
+
+    def _per_family(self, ordering: str, dataset_hash: Optional[str]) -> Dict[str, Dict[str, Any]]:
+        """First run of each family under an ordering, in one windowed query."""
+        where, values = ("WHERE dataset_hash = ?", [dataset_hash]) if dataset_hash is not None else ("", [])
+        rows = self._conn.execute(
+            f"SELECT * FROM (SELECT *, ROW_NUMBER() OVER (PARTITION BY family ORDER BY {ordering}) AS rank "
+            f"FROM runs {where}) WHERE rank = 1 ORDER BY family",
+            values
+        )
+        return {row['family']: self._to_dict(row) for row in rows}
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        run = {key: row[key] for key in row.keys() if key != 'rank'}
+        run['params'] = json.loads(run['params'])
+        run['extra'] = json.loads(run['extra'])
+        return run
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "MetricsStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _format_runs(runs: Sequence[Dict[str, Any]]) -> str:
+    """Text table of runs."""
+    lines = [
+        f"{'Run':<10} {'Created':<17} {'Model':<18} {'Test MSE':>9} {'Test R²':>8} {'Time (s)':>9}  Params",
+        "-"*100
+    ]
+    for run in runs:
+        created = time.strftime('%Y-%m-%d %H:%M', time.localtime(run['created']))
+        test_mse = f"{run['test_mse']:.4f}" if run['test_mse'] is not None else '-'
+        test_r2 = f"{run['test_r2']:.4f}" if run['test_r2'] is not None else '-'
+        seconds = f"{run['training_seconds']:.2f}" if run['training_seconds'] is not None else '-'
+        lines.append(f"{run['run_id'][:8]:<10} {created:<17} {run['model_name']:<18} {test_mse:>9} "
+                     f"{test_r2:>8} {seconds:>9}  {run['params'] or '-'}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Query recorded training runs.")
+    parser.add_argument('--db', default=DEFAULT_DB, help=f"Metrics database (default: {DEFAULT_DB})")
+    parser.add_argument('--family', help="Only runs of this model family (lr, dt, rf)")
+    parser.add_argument('--dataset', help="Only runs on the dataset with this hash")
+    parser.add_argument('--best', action='store_true', help="Best test MSE per family")
+    parser.add_argument('--limit', type=int, default=None, help="List up to this many runs, newest first")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"⚠️  No metrics database at {args.db}; run a training script first.")
+        return 1
+    with MetricsStore(args.db) as store:
+        if args.family or args.limit:
+            runs = store.runs(family=args.family, dataset_hash=args.dataset, limit=args.limit)
+        else:
+            per_family = store.best(args.dataset) if args.best else store.latest(args.dataset)
+            runs = list(per_family.values())
+    print(_format_runs(runs))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Process-wide cache of loaded model artifacts.
+
+predict_adherence() used to joblib.load the model and scaler on every call,
+which for a 300-tree forest costs tens of milliseconds and megabytes of
+allocation per prediction. The ModelRegistry loads each file once and reuses
+the object across calls and threads. Entries are keyed by (path, mtime, size)
+so a file replaced on disk is reloaded on its next use, and the registry
+keeps at most max_entries objects, evicting the least recently used, so a
+process that serves several model versions stays bounded in memory.
+
+Author: MedMind Development Team
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import joblib
+
+# (absolute path, mtime in nanoseconds, size in bytes)
+CacheKey = Tuple[str, int, int]
+
+
+class ModelRegistry:
+    """
+    Thread-safe LRU cache of objects loaded from files.
+
+    Args:
+        max_entries: Maximum number of loaded objects kept at once
+        loader: Function loading an object from a path (default: joblib.load)
+    """
+
+    def __init__(self, max_entries: int = 4, loader: Callable[[str], Any] = joblib.load):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, got {max_entries}")
+        self.max_entries = max_entries
+        self.loader = loader
+        self._entries: "OrderedDict[CacheKey, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._path_locks: Dict[str, threading.Lock] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def _key(path: str) -> CacheKey:
+        """Build the cache key for a file, raising FileNotFoundError if it is missing."""
+        abs_path = os.path.abspath(path)
+        stat = os.stat(abs_path)
+        return abs_path, stat.st_mtime_ns, stat.st_size
+
+    def _lookup(self, key: CacheKey) -> Optional[Any]:
+        """Return a cached object and mark it recently used (caller holds the lock)."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return self._entries[key]
+        return None
+
+    def get(self, path: str) -> Any:
+        """
+        Return the object stored at path, loading it only if not already cached.
+
+        Args:
+            path: Path to the model or scaler file
+
+        Returns:
+            The loaded object
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        key = self._key(path)
+
+        with self._lock:
+            cached = self._lookup(key)
+            if cached is not None:
+                return cached
+            path_lock = self._path_locks.setdefault(key[0], threading.Lock())
+
+        # Load outside the registry lock so other files stay available, but
+        # only once per path when several threads miss at the same time
+        with path_lock:
+            with self._lock:
+                cached = self._lookup(key)
+                if cached is not None:
+                    return cached
+                self._misses += 1
+
+            obj = self.loader(key[0])
+
+            with self._lock:
+                self._store(key, obj)
+        return obj
+
+    def _store(self, key: CacheKey, obj: Any) -> None:
+        """Insert a loaded object, dropping stale versions and LRU overflow (caller holds the lock)."""
+        for stale in [k for k in self._entries if k[0] == key[0] and k != key]:
+            del self._entries[stale]
+            self._invalidations += 1
+
+        self._entries[key] = obj
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached object."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Report cache size and hit, miss, eviction and invalidation counts."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations
+            }
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Multi-core batch scoring with one shared copy of the model.
+
+Forest inference is independent per row, but predict_adherence_batch() runs
+on a single core. ParallelScorer spreads a large feature matrix over a
+process pool without pickling the model or the rows per task:
+
+- The model and scaler are fused into one compiled flat-array predictor
+  (see compiled_model.py) and saved uncompressed once, in /dev/shm when
+  available. Every worker memory-maps it at startup, so all processes share
+  one page-cached copy of the node arrays.
+- Each batch is written once to a memory-mapped input matrix, and the
+  predictions go straight into a preallocated memory-mapped output array.
+  Tasks carry only a row range, and each worker writes its shard's slice.
+
+compiled_model verifies the fused predictor against scaler.transform +
+predict when artifacts are built. For tree models the folded thresholds
+reproduce it exactly, so the parallel path returns the same numbers as
+predict_adherence_matrix(); for linear models the folded coefficients only
+differ by floating-point reassociation, so results match within float
+tolerance (verify_fused's atol), not bit for bit.
+
+Usage:
+    python parallel_scoring.py --rows 2000000 --workers 1 2 4 8
+
+Author: MedMind Development Team
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from predict_adherence import _load_model_and_scaler, predict_adherence_matrix
+
+from api_path import add_api_path
+add_api_path()
+from compiled_model import compile_model, fold_scaler, load_compiled, save_compiled
+
+# Rows per task; large enough to amortize dispatch, small enough to balance load
+DEFAULT_SHARD_ROWS = 50_000
+
+# Fused predictor memory-mapped by this worker process (set by _init_worker)
+_worker_model = None
+
+# Input and output memmaps of the batch this worker last scored
+_worker_batch: Dict[str, np.ndarray] = {}
+
+
+def _shared_dir() -> Optional[str]:
+    """Directory backed by RAM (tmpfs) where available, else the default temp dir."""
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm'
+    return None
+
+
+def _fused_predictor(model, scaler):
+    """Compile a model (if needed) and fold the scaler into it."""
+    if getattr(model, 'kind', None) == 'onnx':
+        raise ValueError("Parallel scoring shares compiled arrays; pass the pickled or compiled model, not an ONNX graph")
+    if getattr(model, 'scaler_folded', False):
+        return model
+    if not hasattr(model, 'to_arrays'):
+        model = compile_model(model)
+    return fold_scaler(model, scaler)
+
+
+def _init_worker(model_file: str) -> None:
+    """Pool initializer: memory-map the shared fused predictor once per worker."""
+    global _worker_model
+    _worker_model = load_compiled(model_file, mmap_mode='r')
+
+
+def _open_batch(path: str) -> np.ndarray:
+    """Memory-map a batch file, reusing the mapping across shards of the same batch."""
+    array = _worker_batch.get(path)
+    if array is None:
+        if len(_worker_batch) >= 2:
+            _worker_batch.clear()
+        array = _worker_batch[path] = np.load(path, mmap_mode='r+')
+    return array
+
+
+def _score_shard(input_file: str, output_file: str, start: int, stop: int) -> int:
+    """Score rows [start, stop) of the shared input into the shared output."""
+    features = _open_batch(input_file)
+    output = _open_batch(output_file)
+    predictions = _worker_model.predict(features[start:stop])
+    output[start:stop] = np.clip(predictions, 0.0, 100.0)
+    return stop - start
+
+
+class ParallelScorer:
+    """
+    Process pool scoring feature matrices against one shared fused model.
+
+    Create it once and reuse it: starting the pool and writing the model
+    happens here, not per call. Use as a context manager or call close().
+
+    Args:
+        model_path: Saved model, compiled or fused artifact
+        scaler_path: Saved scaler
+        workers: Worker processes (default: all cores)
+        shard_rows: Rows per task; batches no larger than this are scored inline
+    """
+
+    def __init__(
+        self,
+        model_path: str = 'models/best_model.pkl',
+        scaler_path: str = 'models/scaler.pkl',
+        workers: Optional[int] = None,
+        shard_rows: int = DEFAULT_SHARD_ROWS
+    ):
+        if shard_rows < 1:
+            raise ValueError(f"shard_rows must be at least 1, got {shard_rows}")
+        self.workers = workers or os.cpu_count() or 1
+        if self.workers < 1:
+            raise ValueError(f"workers must be at least 1, got {self.workers}")
+        self.shard_rows = shard_rows
+
+        model, scaler = _load_model_and_scaler(model_path, scaler_path)
+        self._predictor = _fused_predictor(model, scaler)
+        self._dir = tempfile.mkdtemp(prefix='medmind-score-', dir=_shared_dir())
+        self.model_file = os.path.join(self._dir, 'model.pkl')
+        save_compiled(self._predictor, self.model_file)
+        self._batches = 0
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.model_file,)
+        )
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """
+        Predict adherence rates for an (n, 8) feature matrix.
+
+        Returns:
+            np.ndarray: n predictions (0.0-100.0), in row order
+        """
+        if self._executor is None:
+            raise RuntimeError("ParallelScorer is closed")
+        features = np.asarray(features, dtype=np.float64)
+        if features.ndim != 2 or features.shape[1] != self._predictor.n_features:
+            raise ValueError(f"Each feature array must have 8 elements, got shape {features.shape}")
+
+        rows = len(features)
+        if rows <= self.shard_rows or self.workers == 1:
+            return np.clip(self._predictor.predict(features), 0.0, 100.0)
+
+        self._batches += 1
+        input_file = os.path.join(self._dir, f'input-{self._batches}.npy')
+        output_file = os.path.join(self._dir, f'output-{self._batches}.npy')
+        try:
+            shared_input = np.lib.format.open_memmap(input_file, mode='w+', dtype=np.float64, shape=features.shape)
+            shared_input[:] = features
+            shared_input.flush()
+            del shared_input
+            np.lib.format.open_memmap(output_file, mode='w+', dtype=np.float64, shape=(rows,)).flush()
+
+            starts = range(0, rows, self.shard_rows)
+            stops = [min(start + self.shard_rows, rows) for start in starts]
+            scored = sum(self._executor.map(
+                _score_shard, [input_file] * len(starts), [output_file] * len(starts), starts, stops
+            ))
+            if scored != rows:
+                raise RuntimeError(f"Scored {scored} of {rows} rows")
+            return np.array(np.load(output_file, mmap_mode='r'))
+        finally:
+            for path in (input_file, output_file):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def close(self) -> None:
+        """Stop the pool and delete the shared files."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+    def __enter__(self) -> "ParallelScorer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def predict_parallel(
+    features: np.ndarray,
+    model_path: str = 'models/best_model.pkl',
+    scaler_path: str = 'models/scaler.pkl',
+    workers: Optional[int] = None,
+    shard_rows: int = DEFAULT_SHARD_ROWS
+) -> np.ndarray:
+    """One-off parallel prediction; hold a ParallelScorer to score many batches."""
+    with ParallelScorer(model_path, scaler_path, workers, shard_rows) as scorer:
+        return scorer.predict(features)
+
+
+def benchmark_scaling(
+    features: np.ndarray,
+    model_path: str = 'models/best_model.pkl',
+    scaler_path: str = 'models/scaler.pkl',
+    worker_counts: Sequence[int] = (1, 2, 4, 8),
+    shard_rows: int = DEFAULT_SHARD_ROWS,
+    repeats: int = 3
+) -> List[Dict]:
+    """
+    Time parallel scoring of features with each worker count.
+
+    Pool startup is excluded (as when a scorer is reused); each count's best
+    of repeats is reported along with its speedup over the single-core
+    predict_adherence_matrix() baseline.
+
+    Returns:
+        list of dict: workers, seconds, rows_per_second and speedup per count
+    """
+    start = time.perf_counter()
+    predict_adherence_matrix(features, model_path, scaler_path)
+    baseline = time.perf_counter() - start
+
+    results = [{
+        'workers': 'baseline',
+        'seconds': baseline,
+        'rows_per_second': len(features) / baseline,
+        'speedup': 1.0
+    }]
+    for workers in worker_counts:
+        with ParallelScorer(model_path, scaler_path, workers, shard_rows) as scorer:
+            # Warm up the workers (model mapping, imports) before timing
+            scorer.predict(features[:scorer.shard_rows * workers + 1])
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                scorer.predict(features)
+                timings.append(time.perf_counter() - start)
+        seconds = min(timings)
+        results.append({
+            'workers': workers,
+            'seconds': seconds,
+            'rows_per_second': len(features) / seconds,
+            'speedup': baseline / seconds
+        })
+    return results
+
+
+def _synthetic_features(rows: int, seed: int = 42) -> np.ndarray:
+    """Random patients within the training feature ranges."""
+    low = [18, 1, 1.0, 0, 0, 0.0, 0, 0.0]
+    high = [90, 20, 5.0, 3650, 50, 1.0, 10, 100.0]
+    return np.random.default_rng(seed).uniform(low, high, size=(rows, 8))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report parallel scoring throughput per worker count")
+    parser.add_argument('--model', default='models/best_model.pkl', help="Model, compiled or fused artifact")
+    parser.add_argument('--scaler', default='models/scaler.pkl', help="Fitted StandardScaler")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Synthetic rows to score (default: 1000000)")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help="Worker counts to time")
+    parser.add_argument('--shard-rows', type=int, default=DEFAULT_SHARD_ROWS, help="Rows per task")
+    args = parser.parse_args()
+
+    print(f"Scoring {args.rows:,} rows on a machine with {os.cpu_count()} cores")
+    for result in benchmark_scaling(_synthetic_features(args.rows), args.model, args.scaler,
+                                    args.workers, args.shard_rows):
+        print(f"  workers={str(result['workers']):8s} {result['seconds']:7.3f}s "
+              f"{result['rows_per_second']:>12,.0f} rows/s  x{result['speedup']:.2f}")
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Incremental runner for the training and evaluation pipeline.
+
+The scripts in this directory hand their results to each other through files
+(adherence_data.csv, models/*_metrics.txt, models/best_model.pkl, ...), and
+refreshing anything meant re-running all of them by hand, in order. Each
+stage below declares the files it reads and writes; the runner derives the
+dependency graph from them and:
+
+- skips a stage when the SHA-256 of every input (the stage's own script
+  included) matches its last successful run and all its outputs exist, so
+  only stages downstream of a real change run again; a stage that rewrites
+  an output with identical bytes does not invalidate its dependents
+- runs stages as soon as their dependencies finish, independent ones in
+  parallel (the three model families train concurrently)
+- stops dependents of a failed stage and keeps each stage's output in a log
+
+The per-family scripts also print a comparison with the other families'
+metrics when those files exist. That console output does not affect what
+they write, so those files are not declared as inputs and the families stay
+independent.
+
+Run state (input fingerprints and file hashes) is kept in
+.cache/pipeline/state.json, logs in .cache/pipeline/logs/.
+
+Usage:
+    python pipeline.py                   # Run everything that is out of date
+    python pipeline.py --dry-run         # Show what would run
+    python pipeline.py deploy --jobs 2   # Bring one stage and its dependencies up to date
+    python pipeline.py --force lr        # Re-run a stage (and whatever its outputs change)
+
+Author: MedMind Development Team
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, TextIO, Tuple
+
+PIPELINE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Artifacts the API serves; the optional backends are copied when they were built
+API_ARTIFACTS = (
+    'best_model.pkl',
+    'scaler.pkl',
+    'best_model_compiled.pkl',
+    'best_model_fused.pkl',
+    'best_model.onnx',
+)
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One pipeline step.
+
+    Paths are relative to the pipeline root. A missing input is fingerprinted
+    as absent, which lets a stage list files that only sometimes exist.
+
+    Args:
+        name: Stage name used on the command line
+        inputs: Files the stage reads
+        outputs: Files the stage must produce; a stage is re-run if one is missing
+        script: Python script run in a subprocess (relative to the root)
+        action: In-process function called with the root and the log stream
+                instead of a script
+        cwd: Working directory of the script, relative to the root
+    """
+
+    name: str
+    inputs: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+    script: Optional[str] = None
+    action: Optional[Callable[[str, TextIO], None]] = None
+    cwd: str = '.'
+
+
+@dataclass
+class StageResult:
+    """What happened to a stage in one run."""
+
+    # 'ran', 'up-to-date', 'would-run', 'failed' or 'blocked'
+    status: str
+    seconds: float = 0.0
+    log_path: Optional[str] = None
+    reason: str = ''
+
+
+def deploy_artifacts(root: str, log: TextIO = sys.stdout) -> None:
+    """Copy the selected model artifacts into the API's models directory."""
+    source_dir = os.path.join(root, 'models')
+    target_dir = os.path.join(root, '..', 'API', 'models')
+    os.makedirs(target_dir, exist_ok=True)
+    for name in API_ARTIFACTS:
+        source = os.path.join(source_dir, name)
+        if not os.path.exists(source):
+            continue
+        # Copy then rename, so a running API never loads a half-written file
+        staging = os.path.join(target_dir, f'.{name}.tmp')
+        shutil.copy2(source, staging)
+        os.replace(staging, os.path.join(target_dir, name))
+        print(f"   ✅ {name} -> {os.path.relpath(os.path.join(target_dir, name), root)}", file=log)
+
+
+PIPELINE_STAGES: List[Stage] = [
+    Stage('generate', inputs=('generate_dataset.py',), outputs=('adherence_data.csv',),
+          script='generate_dataset.py', cwd='../..'),
+    Stage('eda', inputs=('run_eda.py', 'adherence_data.csv'),
+          outputs=('plots/correlation_heatmap.png', 'plots/feature_distributions.png',
+                   'plots/feature_relationships.png'),
+          script='run_eda.py'),
+    Stage('lr', inputs=('run_linear_regression.py', 'preprocess.py', 'adherence_data.csv'),
+          outputs=('models/lr_metrics.txt', 'models/lr_model.pkl',
+                   'plots/lr_actual_vs_predicted.png', 'plots/lr_residuals.png'),
+          script='run_linear_regression.py'),
+    Stage('dt', inputs=('run_decision_tree.py', 'preprocess.py', 'adherence_data.csv'),
+          outputs=('models/dt_metrics.txt', 'models/dt_model.pkl',
+                   'plots/dt_feature_importance.png', 'plots/dt_actual_vs_predicted.png'),
+          script='run_decision_tree.py'),
+    Stage('rf', inputs=('run_random_forest.py', 'preprocess.py', 'adherence_data.csv'),
+          outputs=('models/rf_metrics.txt', 'models/rf_model.pkl',
+                   'plots/rf_feature_importance.png', 'plots/rf_actual_vs_predicted.png'),
+          script='run_random_forest.py'),
+    Stage('compare',
+          inputs=('compare_and_select_model.py', 'train_models.py', 'preprocess.py', 'adherence_data.csv',
+                  'models/lr_metrics.txt', 'models/dt_metrics.txt', 'models/rf_metrics.txt',
+                  'models/lr_model.pkl', 'models/dt_model.pkl', 'models/rf_model.pkl',
+                  '../API/compiled_model.py', '../API/onnx_model.py'),
+          outputs=('models/best_model.pkl', 'models/scaler.pkl',
+                   'models/model_selection_rationale.txt', 'plots/model_comparison.png'),
+          script='compare_and_select_model.py'),
+    Stage('deploy', inputs=tuple(f'models/{name}' for name in API_ARTIFACTS),
+          outputs=('../API/models/best_model.pkl', '../API/models/scaler.pkl'),
+          action=deploy_artifacts),
+]
+
+
+def build_graph(stages: Sequence[Stage]) -> Dict[str, List[str]]:
+    """
+    Dependencies of each stage: the stages producing its inputs.
+
+    Raises:
+        ValueError: On duplicate stage names, a file produced by two stages, or a cycle
+    """
+    names = [stage.name for stage in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate stage names in {names}")
+    producers: Dict[str, str] = {}
+    for stage in stages:
+        for output in stage.outputs:
+            path = os.path.normpath(output)
+            if path in producers:
+                raise ValueError(f"{output} is produced by both '{producers[path]}' and '{stage.name}'")
+            producers[path] = stage.name
+
+    graph = {
+        stage.name: sorted({
+            producers[os.path.normpath(path)] for path in stage.inputs
+            if os.path.normpath(path) in producers and producers[os.path.normpath(path)] != stage.name
+        })
+        for stage in stages
+    }
+    # Every stage must be reachable by repeatedly taking stages whose dependencies are done
+    done: set = set()
+    while len(done) < len(graph):
+        ready = [name for name, deps in graph.items() if name not in done and set(deps) <= done]
+        if not ready:
+            raise ValueError(f"Dependency cycle among stages {sorted(set(graph) - done)}")
+        done.update(ready)
+    return graph
+
+
+def _ancestors(graph: Dict[str, List[str]], targets: Iterable[str]) -> set:
+    """The targets and every stage they depend on, directly or not."""
+    selected, stack = set(), list(targets)
+    while stack:
+        name = stack.pop()
+        if name not in graph:
+            raise ValueError(f"Unknown stage '{name}' (expected one of {', '.join(graph)})")
+        if name not in selected:
+            selected.add(name)
+            stack.extend(graph[name])
+    return selected
+
+
+class _FileHashes:
+    """SHA-256 of files, reused while a file's size and modification time are unchanged."""
+
+    def __init__(self, known: Optional[Dict[str, Dict]] = None):
+        self.known = dict(known or {})
+        self._lock = threading.Lock()
+
+    def sha256(self, path: str) -> Optional[str]:
+        """Hash of the file's bytes, or None if it does not exist."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            entry = self.known.get(path)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['sha256']
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        with self._lock:
+            self.known[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+        return digest.hexdigest()
+
+
+def _fingerprint(stage: Stage, root: str, hashes: _FileHashes) -> str:
+    """Hash of the stage's definition and the contents of its inputs."""
+    description = {
+        'script': stage.script,
+        'action': getattr(stage.action, '__qualname__', None),
+        'cwd': stage.cwd,
+        'outputs': list(stage.outputs),
+        'inputs': {path: hashes.sha256(os.path.join(root, path)) for path in stage.inputs}
+    }
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+
+def _execute(stage: Stage, root: str, log_path: str) -> bool:
+    """Run a stage, writing its output to log_path; True if it succeeded."""
+    with open(log_path, 'w') as log:
+        if stage.action is not None:
+            try:
+                stage.action(root, log)
+                return True
+            except Exception as e:  # noqa: BLE001 - a failing stage must not stop the runner
+                log.write(f"\n{type(e).__name__}: {e}\n")
+                return False
+        result = subprocess.run(
+            [sys.executable, os.path.join(root, stage.script)],
+            cwd=os.path.join(root, stage.cwd),
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            env={**os.environ, 'MPLBACKEND': 'Agg'}
+        )
+        return result.returncode == 0
+
+
+def _load_state(path: str) -> Dict:
+    """Previous run state, or an empty one."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'stages': {}, 'files': {}}
+
+
+def _save_state(state: Dict, path: str) -> None:
+    """Write the run state atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    staging = f'{path}.tmp'
+    with open(staging, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(staging, path)
+
+
+def run_pipeline(
+    stages: Sequence[Stage] = PIPELINE_STAGES,
+    root: str = PIPELINE_DIR,
+    targets: Optional[Sequence[str]] = None,
+    jobs: Optional[int] = None,
+    force: Sequence[str] = (),
+    dry_run: bool = False,
+    state_dir: Optional[str] = None,
+    progress: Optional[Callable[[str, StageResult], None]] = None
+) -> Dict[str, StageResult]:
+    """
+    Bring stages up to date, running independent ones in parallel.
+
+    Args:
+        stages: Pipeline definition
+        root: Directory the stage paths are relative to
+        targets: Stages to bring up to date with their dependencies (default: all)
+        jobs: Stages run at once (default: all cores)
+        force: Stages to run even if their inputs are unchanged
+        dry_run: Report which stages are out of date without running them
+        state_dir: Where state.json and logs/ live (default: root/.cache/pipeline)
+        progress: Called with (stage name, result) as each stage finishes
+
+    Returns:
+        dict: Stage name to its StageResult, in pipeline order
+
+    Raises:
+        ValueError: On an invalid pipeline definition or unknown stage name
+    """
+    graph = build_graph(stages)
+    selected = _ancestors(graph, targets) if targets else set(graph)
+    unknown = set(force) - set(graph)
+    if unknown:
+        raise ValueError(f"Unknown stage(s) {sorted(unknown)} (expected one of {', '.join(graph)})")
+    by_name = {stage.name: stage for stage in stages}
+
+    state_dir = state_dir or os.path.join(root, '.cache', 'pipeline')
+    state_path = os.path.join(state_dir, 'state.json')
+    log_dir = os.path.join(state_dir, 'logs')
+    os.makedirs(log_dir, exist_ok=True)
+    state = _load_state(state_path)
+    hashes = _FileHashes(state.get('files'))
+    results: Dict[str, StageResult] = {}
+
+    def finish(name: str, result: StageResult) -> None:
+        results[name] = result
+        if progress:
+            progress(name, result)
+
+    def check(name: str) -> Tuple[bool, str, str]:
+        """Whether the stage must run, why, and its current input fingerprint."""
+        stage = by_name[name]
+        fingerprint = _fingerprint(stage, root, hashes)
+        missing = [path for path in stage.outputs if not os.path.exists(os.path.join(root, path))]
+        if name in force:
+            return True, 'forced', fingerprint
+        if state['stages'].get(name, {}).get('fingerprint') != fingerprint:
+            return True, 'inputs changed' if name in state['stages'] else 'never run', fingerprint
+        if missing:
+            return True, f'missing {missing[0]}', fingerprint
+        return False, '', fingerprint
+
+    pending = {name for name in graph if name in selected}
+    running: Dict = {}
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as executor:
+        while pending or running:
+            for name in [name for name in graph if name in pending]:
+                deps = graph[name]
+                if any(results.get(dep) and results[dep].status in ('failed', 'blocked') for dep in deps):
+                    pending.discard(name)
+                    finish(name, StageResult('blocked', reason='a dependency failed'))
+                    continue
+                if not all(dep in results or dep not in selected for dep in deps):
+                    continue
+                pending.discard(name)
+                needed, reason, fingerprint = check(name)
+                if dry_run and any(results.get(dep) and results[dep].status == 'would-run' for dep in deps):
+                    needed, reason = True, reason or 'a dependency is out of date'
+                if not needed:
+                    finish(name, StageResult('up-to-date'))
+                elif dry_run:
+                    finish(name, StageResult('would-run', reason=reason))
+                else:
+                    log_path = os.path.join(log_dir, f'{name}.log')
+                    future = executor.submit(_execute, by_name[name], root, log_path)
+                    running[future] = (name, fingerprint, reason, log_path, time.perf_counter())
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, fingerprint, reason, log_path, start = running.pop(future)
+                seconds = time.perf_counter() - start
+                if future.result():
+                    state['stages'][name] = {'fingerprint': fingerprint, 'finished': time.time(), 'seconds': seconds}
+                    state['files'] = hashes.known
+                    _save_state(state, state_path)
+                    finish(name, StageResult('ran', seconds, log_path, reason))
+                else:
+                    finish(name, StageResult('failed', seconds, log_path, reason))
+
+    return {name: results[name] for name in graph if name in results}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the out-of-date stages of the training pipeline.")
+    parser.add_argument('targets', nargs='*', help="Stages to bring up to date with their dependencies (default: all)")
+    parser.add_argument('--jobs', '-j', type=int, default=None, help="Stages run at once (default: all cores)")
+    parser.add_argument('--force', nargs='+', default=[], metavar='STAGE', help="Run these stages even if unchanged")
+    parser.add_argument('--dry-run', action='store_true', help="Show what would run without running it")
+    args = parser.parse_args(argv)
+
+    icons = {'ran': '✅', 'up-to-date': '⏭️ ', 'would-run': '▶️ ', 'failed': '❌', 'blocked': '⚠️ '}
+
+    def report(name: str, result: StageResult) -> None:
+        detail = f" in {result.seconds:.1f}s" if result.status in ('ran', 'failed') else ''
+        reason = f" ({result.reason})" if result.reason else ''
+        log = f" - see {os.path.relpath(result.log_path)}" if result.status == 'failed' else ''
+        print(f"   {icons[result.status]} {name:<10} {result.status}{detail}{reason}{log}", flush=True)
+
+    print("="*70)
+    print("TRAINING PIPELINE" + (" (dry run)" if args.dry_run else ""))
+    print("="*70)
+    start = time.perf_counter()
+    try:
+        results = run_pipeline(targets=args.targets or None, jobs=args.jobs, force=args.force,
+                               dry_run=args.dry_run, progress=report)
+    except ValueError as e:
+        parser.error(str(e))
+
+    counts = {status: sum(r.status == status for r in results.values()) for status in icons}
+    print(f"\n{counts['ran']} ran, {counts['up-to-date']} up to date"
+          + (f", {counts['would-run']} to run" if args.dry_run else '')
+          + (f", {counts['failed']} failed, {counts['blocked']} blocked" if counts['failed'] else '')
+          + f" in {time.perf_counter() - start:.1f}s")
+    return 1 if counts['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,10 +19,44 @@ Author: MedMind Development Team
 Date: 2025-11-28
 """
 
-import joblib
 import numpy as np
-import os
-from typing import Union, List
+from typing import Union, List, Tuple, Any
+
+# The flat-array inference engine lives with the API so the deployed service
+# can load compiled artifacts without scikit-learn
+from api_path import add_api_path
+add_api_path()
+from compiled_model import load_model_artifact
+from model_registry import ModelRegistry
+
+# Models and scalers loaded once per process and shared across calls and threads.
+# Files replaced on disk are reloaded on next use; at most four objects are kept.
+model_registry = ModelRegistry(max_entries=4, loader=load_model_artifact)
+
+
+def _load_model_and_scaler(model_path: str, scaler_path: str) -> Tuple[Any, Any]:
+    """
+    Fetch the model and scaler from the process-wide registry.
+    
+    Raises:
+        FileNotFoundError: If model or scaler files cannot be found
+        RuntimeError: If a file exists but cannot be loaded
+    """
+    try:
+        model = model_registry.get(model_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Model file not found: {model_path}")
+    except Exception as e:
+        raise RuntimeError(f"Error loading model or scaler: {e}")
+    
+    try:
+        scaler = model_registry.get(scaler_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Scaler file not found: {scaler_path}")
+    except Exception as e:
+        raise RuntimeError(f"Error loading model or scaler: {e}")
+    
+    return model, scaler
 
 
 def predict_adherence(
@@ -42,7 +76,9 @@ def predict_adherence(
     
     This function loads the trained machine learning model and scaler, preprocesses
     the input features using standardization, and generates a prediction for the
-    patient's expected adherence rate.
+    patient's expected adherence rate. The model and scaler are cached by the
+    process-wide model_registry, so only the first call (or the first call after
+    a file changes on disk) pays the loading cost.
     
     Args:
         age: Patient age in years (expected range: 18-120)
@@ -54,7 +90,11 @@ def predict_adherence(
         snooze_frequency: Proportion of medication reminders that were snoozed (range: 0.0-1.0)
         chronic_conditions: Number of chronic health conditions (range: 0-10)
         previous_adherence_rate: Historical adherence rate percentage (range: 0.0-100.0)
-        model_path: Path to the saved model file (default: 'models/best_model.pkl')
+        model_path: Path to the saved model file (default: 'models/best_model.pkl').
+                    Compiled artifacts (models/best_model_compiled.pkl), fused
+                    artifacts with the scaler folded in (models/best_model_fused.pkl)
+                    and ONNX graphs run with onnxruntime (models/best_model.onnx)
+                    are also accepted.
         scaler_path: Path to the saved scaler file (default: 'models/scaler.pkl')
     
     Returns:
@@ -79,13 +119,7 @@ def predict_adherence(
         Predicted adherence rate: 82.34%
     """
     
-    # Validate model and scaler files exist
-    if not os.path.exists(model_path):
-        raise FileNotFoundError(f"Model file not found: {model_path}")
-    if not os.path.exists(scaler_path):
-        raise FileNotFoundError(f"Scaler file not found: {scaler_path}")
-    
-    # Validate input ranges (basic validation)
+    # Validate input ranges (basic validation) before paying for a model load
     if not (0 <= age <= 150):
         raise ValueError(f"Age must be between 0 and 150, got {age}")
     if not (0 <= num_medications <= 50):
@@ -103,12 +137,8 @@ def predict_adherence(
     if not (0.0 <= previous_adherence_rate <= 100.0):
         raise ValueError(f"Previous adherence rate must be between 0.0 and 100.0, got {previous_adherence_rate}")
     
-    # Load the trained model and scaler
-    try:
-        model = joblib.load(model_path)
-        scaler = joblib.load(scaler_path)
-    except Exception as e:
-        raise RuntimeError(f"Error loading model or scaler: {e}")
+    # Load the trained model and scaler (cached across calls)
+    model, scaler = _load_model_and_scaler(model_path, scaler_path)
     
     # Create feature array in the correct order
     # Order must match the training data: age, num_medications, medication_complexity,
@@ -126,11 +156,13 @@ def predict_adherence(
     ]], dtype=np.float64)
     
     # Preprocess features using the same scaler from training
-    # This ensures consistent standardization (mean=0, std=1)
-    features_scaled = scaler.transform(features)
+    # This ensures consistent standardization (mean=0, std=1).
+    # Fused artifacts have the scaler folded in and take raw features directly.
+    if not getattr(model, 'scaler_folded', False):
+        features = scaler.transform(features)
     
     # Generate prediction using the trained model
-    prediction = model.predict(features_scaled)[0]
+    prediction = model.predict(features)[0]
     
     # Ensure prediction is within valid range [0.0, 100.0]
     # Some models may predict slightly outside this range
@@ -142,21 +174,25 @@ def predict_adherence(
 def predict_adherence_batch(
     features_list: List[List[Union[int, float]]],
     model_path: str = 'models/best_model.pkl',
-    scaler_path: str = 'models/scaler.pkl'
+    scaler_path: str = 'models/scaler.pkl',
+    workers: int = 1
 ) -> List[float]:
     """
     Predict adherence rates for multiple patients in batch.
     
     This function is more efficient than calling predict_adherence() multiple times
-    because it loads the model and scaler only once.
+    because it scales and scores all patients in one vectorized call.
     
     Args:
         features_list: List of feature arrays, where each array contains:
                       [age, num_medications, medication_complexity, days_since_start,
                        missed_doses_last_week, snooze_frequency, chronic_conditions,
                        previous_adherence_rate]
-        model_path: Path to the saved model file
+        model_path: Path to the saved model file, compiled artifact or .onnx graph
         scaler_path: Path to the saved scaler file
+        workers: Processes to spread the rows over; above 1 the model is shared
+                 across a process pool (see parallel_scoring.py), which pays off
+                 for hundreds of thousands of rows
     
     Returns:
         List[float]: List of predicted adherence rates (0.0-100.0)
@@ -172,36 +208,53 @@ def predict_adherence_batch(
         ...     print(f"Patient {i+1}: {rate:.2f}%")
     """
     
-    # Validate files exist
-    if not os.path.exists(model_path):
-        raise FileNotFoundError(f"Model file not found: {model_path}")
-    if not os.path.exists(scaler_path):
-        raise FileNotFoundError(f"Scaler file not found: {scaler_path}")
-    
-    # Load model and scaler once
-    try:
-        model = joblib.load(model_path)
-        scaler = joblib.load(scaler_path)
-    except Exception as e:
-        raise RuntimeError(f"Error loading model or scaler: {e}")
-    
     # Convert to numpy array
     features_array = np.array(features_list, dtype=np.float64)
     
+    if workers > 1:
+        from parallel_scoring import predict_parallel
+        return predict_parallel(features_array, model_path, scaler_path, workers).tolist()
+    
+    return predict_adherence_matrix(features_array, model_path, scaler_path).tolist()
+
+
+def predict_adherence_matrix(
+    features: np.ndarray,
+    model_path: str = 'models/best_model.pkl',
+    scaler_path: str = 'models/scaler.pkl'
+) -> np.ndarray:
+    """
+    Predict adherence rates for an (n, 8) feature matrix, returning an array.
+    
+    The array-in, array-out core of predict_adherence_batch(), for callers
+    scoring large matrices (e.g. score_bulk.py) that should not round-trip
+    through Python lists.
+    
+    Args:
+        features: (n, 8) float64 matrix in training column order
+        model_path: Path to the saved model file, compiled artifact or .onnx graph
+        scaler_path: Path to the saved scaler file
+    
+    Returns:
+        np.ndarray: n predicted adherence rates (0.0-100.0)
+    """
+    
     # Validate shape
-    if features_array.shape[1] != 8:
-        raise ValueError(f"Each feature array must have 8 elements, got {features_array.shape[1]}")
+    if features.ndim != 2 or features.shape[1] != 8:
+        raise ValueError(f"Each feature array must have 8 elements, got shape {features.shape}")
+    
+    # Load model and scaler (cached across calls)
+    model, scaler = _load_model_and_scaler(model_path, scaler_path)
     
-    # Preprocess all features at once
-    features_scaled = scaler.transform(features_array)
+    # Preprocess all features at once (skipped for fused artifacts)
+    if not getattr(model, 'scaler_folded', False):
+        features = scaler.transform(features)
     
     # Generate predictions
-    predictions = model.predict(features_scaled)
+    predictions = np.asarray(model.predict(features), dtype=np.float64)
     
     # Clip to valid range
-    predictions = np.clip(predictions, 0.0, 100.0)
-    
-    return predictions.tolist()
+    return np.clip(predictions, 0.0, 100.0, out=predictions)
 
 
 if __name__ == "__main__":
@@ -346,25 +399,14 @@ if __name__ == "__main__":
     
     try:
         import pandas as pd
-        from sklearn.model_selection import train_test_split
+        from preprocess import prepare_data
         
-        # Load dataset
-        df = pd.read_csv('adherence_data.csv')
-        df_clean = df.dropna()
-        
-        target_col = 'adherence_rate'
-        feature_cols = [col for col in df_clean.columns if col != target_col]
-        X = df_clean[feature_cols]
-        y = df_clean[target_col]
-        
-        # Split to get test set (same random_state as training)
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
-        )
+        # Cached test split (same cleaning and random_state as training)
+        data = prepare_data('adherence_data.csv')
         
         # Get first test sample
-        test_sample = X_test.iloc[0]
-        actual_rate = y_test.iloc[0]
+        test_sample = pd.Series(data.X_test_raw[0], index=data.feature_cols)
+        actual_rate = data.y_test[0]
         
         print("\nTest Set Sample (Raw Features):")
         for col, val in test_sample.items():
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Shared preprocessing stage with a content-addressed cache.
+
+Every training script repeated the same steps: read adherence_data.csv, drop
+incomplete rows, fit a StandardScaler and split 80/20 with random_state=42.
+prepare_data() does them once and stores the result (the scaled and raw
+splits plus the fitted scaler) under a key derived from the SHA-256 of the
+CSV bytes and the split parameters. Later calls with the same file and
+parameters load that entry in milliseconds; editing the CSV or changing the
+split gives a new key, so a stale entry is never reused.
+
+Entries live in .cache/preprocess/<key>/ next to the dataset (override with
+PREPROCESS_CACHE_DIR) and are written to a temporary directory and renamed
+into place, so concurrent scripts never read a half-written entry.
+
+Usage:
+    python preprocess.py                # Prepare (or load) and print the cache key
+    python preprocess.py --clear        # Delete all cached entries
+
+Author: MedMind Development Team
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+TARGET_COLUMN = 'adherence_rate'
+
+# Bump when the preprocessing steps change so existing entries are not reused
+CACHE_VERSION = 1
+
+# Cache root; by default .cache/preprocess next to the dataset
+CACHE_DIR = os.getenv('PREPROCESS_CACHE_DIR')
+
+
+@dataclass
+class TrainingData:
+    """The cleaned, scaled and split dataset shared by every model family."""
+
+    feature_cols: List[str]
+    scaler: StandardScaler
+    X_train: np.ndarray
+    X_test: np.ndarray
+    y_train: np.ndarray
+    y_test: np.ndarray
+    X_test_raw: np.ndarray
+    # Rows in the CSV before incomplete ones were dropped
+    raw_rows: int = 0
+    # SHA-256 of the CSV the split was made from
+    dataset_hash: str = ''
+    cache_key: str = ''
+    from_cache: bool = False
+
+    @property
+    def clean_rows(self) -> int:
+        """Rows left after dropping incomplete ones."""
+        return len(self.X_train) + len(self.X_test)
+
+
+def dataset_hash(csv_path: str) -> str:
+    """SHA-256 of the dataset file's bytes."""
+    digest = hashlib.sha256()
+    with open(csv_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(data_hash: str, test_size: float = 0.2, random_state: int = 42) -> str:
+    """Cache key of a dataset hash and split parameters."""
+    config = {
+        'dataset': data_hash,
+        'test_size': test_size,
+        'random_state': random_state,
+        'target': TARGET_COLUMN,
+        'version': CACHE_VERSION
+    }
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def default_cache_dir(csv_path: str) -> str:
+    """PREPROCESS_CACHE_DIR, or .cache/preprocess next to the dataset."""
+    return CACHE_DIR or os.path.join(os.path.dirname(os.path.abspath(csv_path)), '.cache', 'preprocess')
+
+
+def compute_data(csv_path: str, test_size: float = 0.2, random_state: int = 42) -> TrainingData:
+    """Load the dataset, drop incomplete rows, standardize and split it (no cache)."""
+    df = pd.read_csv(csv_path)
+    df_clean = df.dropna()
+    feature_cols = [col for col in df_clean.columns if col != TARGET_COLUMN]
+    X = df_clean[feature_cols].to_numpy(dtype=np.float64)
+    y = df_clean[TARGET_COLUMN].to_numpy(dtype=np.float64)
+
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    # Splitting the row indices keeps the raw and scaled test rows aligned
+    train_idx, test_idx = train_test_split(np.arange(len(X)), test_size=test_size, random_state=random_state)
+    return TrainingData(
+        feature_cols=feature_cols,
+        scaler=scaler,
+        X_train=X_scaled[train_idx],
+        X_test=X_scaled[test_idx],
+        y_train=y[train_idx],
+        y_test=y[test_idx],
+        X_test_raw=X[test_idx],
+        raw_rows=len(df)
+    )
+
+
+def _save_entry(data: TrainingData, entry_dir: str) -> None:
+    """Write an entry to a temporary directory and rename it into place."""
+    parent = os.path.dirname(entry_dir)
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.staging-', dir=parent)
+    try:
+        np.savez(
+            os.path.join(staging, 'split.npz'),
+            X_train=data.X_train, X_test=data.X_test,
+            y_train=data.y_train, y_test=data.y_test,
+            X_test_raw=data.X_test_raw
+        )
+        joblib.dump(data.scaler, os.path.join(staging, 'scaler.pkl'))
+        with open(os.path.join(staging, 'meta.json'), 'w') as f:
+            json.dump({'feature_cols': data.feature_cols, 'raw_rows': data.raw_rows}, f)
+        os.rename(staging, entry_dir)
+    except OSError:
+        # Another process stored the same entry first; theirs is identical
+        if not os.path.isdir(entry_dir):
+            raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def _load_entry(entry_dir: str, key: str) -> TrainingData:
+    """Read a cached entry."""
+    with open(os.path.join(entry_dir, 'meta.json')) as f:
+        meta = json.load(f)
+    with np.load(os.path.join(entry_dir, 'split.npz')) as arrays:
+        return TrainingData(
+            feature_cols=meta['feature_cols'],
+            scaler=joblib.load(os.path.join(entry_dir, 'scaler.pkl')),
+            X_train=arrays['X_train'],
+            X_test=arrays['X_test'],
+            y_train=arrays['y_train'],
+            y_test=arrays['y_test'],
+            X_test_raw=arrays['X_test_raw'],
+            raw_rows=meta['raw_rows'],
+            cache_key=key,
+            from_cache=True
+        )
+
+
+def prepare_data(
+    csv_path: str = 'adherence_data.csv',
+    test_size: float = 0.2,
+    random_state: int = 42,
+    cache_dir: Optional[str] = None,
+    use_cache: bool = True
+) -> TrainingData:
+    """
+    Cleaned, standardized and split dataset, from the cache when possible.
+
+    Args:
+        csv_path: Dataset CSV
+        test_size: Fraction of rows held out for testing
+        random_state: Seed of the train/test split
+        cache_dir: Cache root (default: default_cache_dir(csv_path))
+        use_cache: False to recompute without reading or writing the cache
+
+    Returns:
+        TrainingData: Splits, fitted scaler, dataset hash and the entry's cache key
+    """
+    data_hash = dataset_hash(csv_path)
+    if not use_cache:
+        data = compute_data(csv_path, test_size, random_state)
+        data.dataset_hash = data_hash
+        return data
+
+    key = cache_key(data_hash, test_size, random_state)
+    entry_dir = os.path.join(cache_dir or default_cache_dir(csv_path), key)
+    if os.path.isdir(entry_dir):
+        try:
+            data = _load_entry(entry_dir, key)
+            data.dataset_hash = data_hash
+            return data
+        except (OSError, ValueError, KeyError, EOFError):
+            # Unreadable entry (e.g. truncated by a full disk); rebuild it
+            shutil.rmtree(entry_dir, ignore_errors=True)
+
+    data = compute_data(csv_path, test_size, random_state)
+    data.dataset_hash = data_hash
+    data.cache_key = key
+    _save_entry(data, entry_dir)
+    return data
+
+
+def clear_cache(cache_dir: str) -> int:
+    """
+    Delete every cached entry under cache_dir.
+
+    Returns:
+        int: Number of entries removed
+    """
+    if not os.path.isdir(cache_dir):
+        return 0
+    entries = [name for name in os.listdir(cache_dir) if os.path.isdir(os.path.join(cache_dir, name))]
+    for name in entries:
+        shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+    return len(entries)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Prepare the cached train/test split and scaler.")
+    parser.add_argument('--data', default='adherence_data.csv', help="Dataset CSV (default: adherence_data.csv)")
+    parser.add_argument('--cache-dir', default=None, help="Cache root (default: .cache/preprocess next to the CSV)")
+    parser.add_argument('--clear', action='store_true', help="Delete all cached entries and exit")
+    args = parser.parse_args(argv)
+
+    cache_dir = args.cache_dir or default_cache_dir(args.data)
+    if args.clear:
+        print(f"✅ Removed {clear_cache(cache_dir)} cached entries from {cache_dir}")
+        return 0
+
+    start = time.perf_counter()
+    data = prepare_data(args.data, cache_dir=cache_dir)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    source = "loaded from cache" if data.from_cache else "computed and cached"
+    print(f"✅ {data.clean_rows} of {data.raw_rows} rows, {len(data.X_train)} train / {len(data.X_test)} test "
+          f"({source} in {elapsed_ms:.1f} ms)")
+    print(f"   Key: {data.cache_key}  ({os.path.join(cache_dir, data.cache_key)})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
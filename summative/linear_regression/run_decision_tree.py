@@ -10,8 +10,7 @@ import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.preprocessing import StandardScaler
+from sklearn.model_selection import GridSearchCV
 from sklearn.tree import DecisionTreeRegressor
 from sklearn.metrics import mean_squared_error, r2_score
 import joblib
@@ -20,6 +19,9 @@ import time
 import warnings
 warnings.filterwarnings('ignore')
 
+from metrics_store import MetricsStore
+from preprocess import prepare_data
+
 # Set visualization style
 sns.set_style('whitegrid')
 plt.rcParams['figure.figsize'] = (10, 6)
@@ -28,35 +30,29 @@ print("="*70)
 print("DECISION TREE MODEL TRAINING WITH HYPERPARAMETER TUNING")
 print("="*70)
 
-# Load the dataset
+# Load the cleaned, standardized 80/20 split (cached by preprocess.py)
 print("\n1. Loading dataset...")
-df = pd.read_csv('adherence_data.csv')
-print(f"   ✅ Dataset loaded: {df.shape[0]} records, {df.shape[1]} columns")
+data = prepare_data('adherence_data.csv')
+print(f"   ✅ Dataset loaded: {data.raw_rows} records, {len(data.feature_cols) + 1} columns"
+      f"{' (cached split ' + data.cache_key + ')' if data.from_cache else ''}")
 
 # Handle missing values
 print("\n2. Handling missing values...")
-df_clean = df.dropna()
-print(f"   ✅ Clean records: {len(df_clean)} (removed {len(df) - len(df_clean)} rows)")
+print(f"   ✅ Clean records: {data.clean_rows} (removed {data.raw_rows - data.clean_rows} rows)")
 
 # Separate features and target
 print("\n3. Preparing features and target...")
 target_col = 'adherence_rate'
-feature_cols = [col for col in df_clean.columns if col != target_col]
-X = df_clean[feature_cols]
-y = df_clean[target_col]
-print(f"   ✅ Features: {X.shape[1]}, Target: {target_col}")
+feature_cols = data.feature_cols
+print(f"   ✅ Features: {len(feature_cols)}, Target: {target_col}")
 
 # Standardize features
 print("\n4. Standardizing features...")
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
 print(f"   ✅ Features standardized (mean ≈ 0, std ≈ 1)")
 
 # Train-test split
 print("\n5. Splitting data (80/20)...")
-X_train, X_test, y_train, y_test = train_test_split(
-    X_scaled, y, test_size=0.2, random_state=42
-)
+X_train, X_test, y_train, y_test = data.X_train, data.X_test, data.y_train, data.y_test
 print(f"   ✅ Training: {len(X_train)} samples, Testing: {len(X_test)} samples")
 
 # Define hyperparameter grid for tuning
@@ -138,18 +134,10 @@ print("="*70)
 # Load Linear Regression metrics for comparison
 print("\n10. Comparing with Linear Regression baseline...")
 try:
-    with open('models/lr_metrics.txt', 'r') as f:
-        lr_content = f.read()
-        # Extract test MSE and R² from LR metrics
-        in_test = False
-        for line in lr_content.split('\n'):
-            if 'Test Set:' in line:
-                in_test = True
-            elif in_test and 'MSE:' in line:
-                test_mse_lr = float(line.split(':')[1].strip())
-            elif in_test and 'R²:' in line:
-                test_r2_lr = float(line.split(':')[1].strip())
-                break
+    # Latest Linear Regression run on this dataset
+    with MetricsStore() as store:
+        lr_run = store.latest(dataset_hash=data.dataset_hash)['lr']
+    test_mse_lr, test_r2_lr = lr_run['test_mse'], lr_run['test_r2']
     
     print("\n" + "="*70)
     print("MODEL COMPARISON: DECISION TREE vs LINEAR REGRESSION")
@@ -185,7 +173,7 @@ try:
         print("⚠️  Significant overfitting detected")
         print("   Hyperparameter tuning helped, but consider further regularization")
     
-except FileNotFoundError:
+except KeyError:
     print("   ⚠️  Linear Regression metrics not found. Run run_linear_regression.py first.")
 
 # Feature importance
@@ -302,6 +290,25 @@ with open('models/dt_metrics.txt', 'w') as f:
 
 print("   ✅ Metrics saved: models/dt_metrics.txt")
 
+# Save the fitted model so compare_and_select_model.py can reuse it
+joblib.dump(dt_model, 'models/dt_model.pkl')
+print("   ✅ Model saved: models/dt_model.pkl")
+
+# Record the run in the structured metrics store
+with MetricsStore() as store:
+    run_id = store.record_run(
+        'dt', 'Decision Tree',
+        {'train_mse': train_mse_dt, 'train_rmse': train_rmse_dt, 'train_r2': train_r2_dt,
+         'test_mse': test_mse_dt, 'test_rmse': test_rmse_dt, 'test_r2': test_r2_dt,
+         'cv_mse': -grid_search.best_score_},
+        params=best_params,
+        search=f"grid, {len(grid_search.cv_results_['params'])} candidates",
+        dataset_hash=data.dataset_hash,
+        training_seconds=tuning_time,
+        source='run_decision_tree.py'
+    )
+print(f"   ✅ Run recorded: {run_id[:8]} in models/metrics.db")
+
 # Summary
 print("\n" + "="*70)
 print("DECISION TREE TRAINING COMPLETE ✅")
@@ -320,4 +327,5 @@ print(f"\nFiles Created:")
 print(f"  - plots/dt_feature_importance.png")
 print(f"  - plots/dt_actual_vs_predicted.png")
 print(f"  - models/dt_metrics.txt")
+print(f"  - models/dt_model.pkl")
 print("\n" + "="*70)
@@ -4,14 +4,11 @@ Script to execute Linear Regression model training and evaluation.
 This script runs the Linear Regression section of the notebook programmatically.
 """
 
-import pandas as pd
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error, r2_score
 import joblib
@@ -20,6 +17,9 @@ import time
 import warnings
 warnings.filterwarnings('ignore')
 
+from metrics_store import MetricsStore
+from preprocess import prepare_data
+
 # Set visualization style
 sns.set_style('whitegrid')
 plt.rcParams['figure.figsize'] = (10, 6)
@@ -28,35 +28,29 @@ print("="*70)
 print("LINEAR REGRESSION MODEL TRAINING AND EVALUATION")
 print("="*70)
 
-# Load the dataset
+# Load the cleaned, standardized 80/20 split (cached by preprocess.py)
 print("\n1. Loading dataset...")
-df = pd.read_csv('adherence_data.csv')
-print(f"   ✅ Dataset loaded: {df.shape[0]} records, {df.shape[1]} columns")
+data = prepare_data('adherence_data.csv')
+print(f"   ✅ Dataset loaded: {data.raw_rows} records, {len(data.feature_cols) + 1} columns"
+      f"{' (cached split ' + data.cache_key + ')' if data.from_cache else ''}")
 
 # Handle missing values
 print("\n2. Handling missing values...")
-df_clean = df.dropna()
-print(f"   ✅ Clean records: {len(df_clean)} (removed {len(df) - len(df_clean)} rows)")
+print(f"   ✅ Clean records: {data.clean_rows} (removed {data.raw_rows - data.clean_rows} rows)")
 
 # Separate features and target
 print("\n3. Preparing features and target...")
 target_col = 'adherence_rate'
-feature_cols = [col for col in df_clean.columns if col != target_col]
-X = df_clean[feature_cols]
-y = df_clean[target_col]
-print(f"   ✅ Features: {X.shape[1]}, Target: {target_col}")
+feature_cols = data.feature_cols
+print(f"   ✅ Features: {len(feature_cols)}, Target: {target_col}")
 
 # Standardize features
 print("\n4. Standardizing features...")
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
 print(f"   ✅ Features standardized (mean ≈ 0, std ≈ 1)")
 
 # Train-test split
 print("\n5. Splitting data (80/20)...")
-X_train, X_test, y_train, y_test = train_test_split(
-    X_scaled, y, test_size=0.2, random_state=42
-)
+X_train, X_test, y_train, y_test = data.X_train, data.X_test, data.y_train, data.y_test
 print(f"   ✅ Training: {len(X_train)} samples, Testing: {len(X_test)} samples")
 
 # Train Linear Regression model
@@ -216,6 +210,22 @@ with open('models/lr_metrics.txt', 'w') as f:
 
 print("   ✅ Metrics saved: models/lr_metrics.txt")
 
+# Save the fitted model so compare_and_select_model.py can reuse it
+joblib.dump(lr_model, 'models/lr_model.pkl')
+print("   ✅ Model saved: models/lr_model.pkl")
+
+# Record the run in the structured metrics store
+with MetricsStore() as store:
+    run_id = store.record_run(
+        'lr', 'Linear Regression',
+        {'train_mse': train_mse_lr, 'train_rmse': train_rmse_lr, 'train_r2': train_r2_lr,
+         'test_mse': test_mse_lr, 'test_rmse': test_rmse_lr, 'test_r2': test_r2_lr},
+        dataset_hash=data.dataset_hash,
+        training_seconds=training_time,
+        source='run_linear_regression.py'
+    )
+print(f"   ✅ Run recorded: {run_id[:8]} in models/metrics.db")
+
 # Summary
 print("\n" + "="*70)
 print("LINEAR REGRESSION TRAINING COMPLETE ✅")
@@ -228,4 +238,5 @@ print(f"\nFiles Created:")
 print(f"  - plots/lr_actual_vs_predicted.png")
 print(f"  - plots/lr_residuals.png")
 print(f"  - models/lr_metrics.txt")
+print(f"  - models/lr_model.pkl")
 print("\n" + "="*70)
@@ -10,8 +10,7 @@ import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.preprocessing import StandardScaler
+from sklearn.model_selection import GridSearchCV
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, r2_score
 import joblib
@@ -20,6 +19,9 @@ import time
 import warnings
 warnings.filterwarnings('ignore')
 
+from metrics_store import MetricsStore
+from preprocess import prepare_data
+
 # Set visualization style
 sns.set_style('whitegrid')
 plt.rcParams['figure.figsize'] = (10, 6)
@@ -28,35 +30,29 @@ print("="*70)
 print("RANDOM FOREST MODEL TRAINING WITH HYPERPARAMETER TUNING")
 print("="*70)
 
-# Load the dataset
+# Load the cleaned, standardized 80/20 split (cached by preprocess.py)
 print("\n1. Loading dataset...")
-df = pd.read_csv('adherence_data.csv')
-print(f"   ✅ Dataset loaded: {df.shape[0]} records, {df.shape[1]} columns")
+data = prepare_data('adherence_data.csv')
+print(f"   ✅ Dataset loaded: {data.raw_rows} records, {len(data.feature_cols) + 1} columns"
+      f"{' (cached split ' + data.cache_key + ')' if data.from_cache else ''}")
 
 # Handle missing values
 print("\n2. Handling missing values...")
-df_clean = df.dropna()
-print(f"   ✅ Clean records: {len(df_clean)} (removed {len(df) - len(df_clean)} rows)")
+print(f"   ✅ Clean records: {data.clean_rows} (removed {data.raw_rows - data.clean_rows} rows)")
 
 # Separate features and target
 print("\n3. Preparing features and target...")
 target_col = 'adherence_rate'
-feature_cols = [col for col in df_clean.columns if col != target_col]
-X = df_clean[feature_cols]
-y = df_clean[target_col]
-print(f"   ✅ Features: {X.shape[1]}, Target: {target_col}")
+feature_cols = data.feature_cols
+print(f"   ✅ Features: {len(feature_cols)}, Target: {target_col}")
 
 # Standardize features
 print("\n4. Standardizing features...")
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
 print(f"   ✅ Features standardized (mean ≈ 0, std ≈ 1)")
 
 # Train-test split
 print("\n5. Splitting data (80/20)...")
-X_train, X_test, y_train, y_test = train_test_split(
-    X_scaled, y, test_size=0.2, random_state=42
-)
+X_train, X_test, y_train, y_test = data.X_train, data.X_test, data.y_train, data.y_test
 print(f"   ✅ Training: {len(X_train)} samples, Testing: {len(X_test)} samples")
 
 # Define hyperparameter grid for tuning
@@ -80,6 +76,7 @@ print(f"      min_samples_leaf: {param_grid['min_samples_leaf']}")
 # Initialize Random Forest and GridSearchCV
 print("\n7. Performing hyperparameter tuning with 5-fold cross-validation...")
 print("   (This may take 2-5 minutes...)")
+print("   (For a faster successive halving search: python train_models.py --search rf=halving)")
 rf_base = RandomForestRegressor(random_state=42, n_jobs=-1)
 grid_search = GridSearchCV(
     estimator=rf_base,
@@ -145,31 +142,11 @@ print("="*70)
 # Load previous model metrics for comparison
 print("\n10. Comparing with previous models...")
 try:
-    # Load Linear Regression metrics
-    with open('models/lr_metrics.txt', 'r') as f:
-        lr_content = f.read()
-        in_test = False
-        for line in lr_content.split('\n'):
-            if 'Test Set:' in line:
-                in_test = True
-            elif in_test and 'MSE:' in line:
-                test_mse_lr = float(line.split(':')[1].strip())
-            elif in_test and 'R²:' in line:
-                test_r2_lr = float(line.split(':')[1].strip())
-                break
-    
-    # Load Decision Tree metrics
-    with open('models/dt_metrics.txt', 'r') as f:
-        dt_content = f.read()
-        in_test = False
-        for line in dt_content.split('\n'):
-            if 'Test Set:' in line:
-                in_test = True
-            elif in_test and 'MSE:' in line:
-                test_mse_dt = float(line.split(':')[1].strip())
-            elif in_test and 'R²:' in line:
-                test_r2_dt = float(line.split(':')[1].strip())
-                break
+    # Latest Linear Regression and Decision Tree runs on this dataset
+    with MetricsStore() as store:
+        previous_runs = store.latest(dataset_hash=data.dataset_hash)
+    test_mse_lr, test_r2_lr = previous_runs['lr']['test_mse'], previous_runs['lr']['test_r2']
+    test_mse_dt, test_r2_dt = previous_runs['dt']['test_mse'], previous_runs['dt']['test_r2']
     
     print("\n" + "="*70)
     print("MODEL COMPARISON: ALL THREE MODELS")
@@ -211,8 +188,8 @@ try:
         print("⚠️  Significant overfitting detected")
         print("   Consider: reducing max_depth, increasing min_samples_split")
     
-except FileNotFoundError as e:
-    print(f"   ⚠️  Could not load previous model metrics: {e}")
+except KeyError as e:
+    print(f"   ⚠️  No {e} run recorded for this dataset in models/metrics.db")
     print("   Run run_linear_regression.py and run_decision_tree.py first for comparison.")
 
 # Feature importance
@@ -331,6 +308,25 @@ with open('models/rf_metrics.txt', 'w') as f:
 
 print("   ✅ Metrics saved: models/rf_metrics.txt")
 
+# Save the fitted model so compare_and_select_model.py can reuse it
+joblib.dump(rf_model, 'models/rf_model.pkl')
+print("   ✅ Model saved: models/rf_model.pkl")
+
+# Record the run in the structured metrics store
+with MetricsStore() as store:
+    run_id = store.record_run(
+        'rf', 'Random Forest',
+        {'train_mse': train_mse_rf, 'train_rmse': train_rmse_rf, 'train_r2': train_r2_rf,
+         'test_mse': test_mse_rf, 'test_rmse': test_rmse_rf, 'test_r2': test_r2_rf,
+         'cv_mse': -grid_search.best_score_},
+        params=best_params,
+        search=f"grid, {len(grid_search.cv_results_['params'])} candidates",
+        dataset_hash=data.dataset_hash,
+        training_seconds=tuning_time,
+        source='run_random_forest.py'
+    )
+print(f"   ✅ Run recorded: {run_id[:8]} in models/metrics.db")
+
 # Summary
 print("\n" + "="*70)
 print("RANDOM FOREST TRAINING COMPLETE ✅")
@@ -349,4 +345,5 @@ print(f"\nFiles Created:")
 print(f"  - plots/rf_feature_importance.png")
 print(f"  - plots/rf_actual_vs_predicted.png")
 print(f"  - models/rf_metrics.txt")
+print(f"  - models/rf_model.pkl")
 print("\n" + "="*70)
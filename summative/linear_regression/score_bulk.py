@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Offline bulk scoring of patient files too large for predict_adherence_batch().
+
+predict_adherence_batch() takes a Python list of lists and returns a list,
+which is fine for a handful of patients but holds the whole input (twice)
+in memory and spends most of its time converting between lists and arrays.
+This CLI streams a CSV or Parquet file with the adherence_data.csv column
+layout in fixed-size chunks, scores each chunk as one float64 matrix with
+predict_adherence_matrix(), and appends the chunk with a
+predicted_adherence_rate column to a CSV or Parquet output. Memory stays
+bounded by the chunk size times the number of chunks in flight.
+
+With --workers > 1 the chunks are fanned out to a process pool; each worker
+loads the model once through the process-wide model registry, and results
+are written in submission order, so the output rows always match the input
+order. Rows with a missing feature are kept with an empty prediction.
+
+Parquet input and output require pyarrow.
+
+Usage:
+    python score_bulk.py patients.csv scored.parquet --chunk-rows 200000 --workers 8
+
+Author: MedMind Development Team
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from predict_adherence import predict_adherence_matrix
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pq = None
+
+# Feature columns in training order, as in adherence_data.csv
+FEATURE_COLUMNS = [
+    'age',
+    'num_medications',
+    'medication_complexity',
+    'days_since_start',
+    'missed_doses_last_week',
+    'snooze_frequency',
+    'chronic_conditions',
+    'previous_adherence_rate',
+]
+
+PREDICTION_COLUMN = 'predicted_adherence_rate'
+
+
+def _file_format(path: str) -> str:
+    """Infer "csv" or "parquet" from a file extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.parquet', '.pq'):
+        if pq is None:
+            raise RuntimeError("Parquet files require pyarrow (pip install pyarrow)")
+        return 'parquet'
+    if extension in ('.csv', '.txt', ''):
+        return 'csv'
+    raise ValueError(f"Unsupported file type {extension!r}; use .csv or .parquet")
+
+
+def read_chunks(path: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """
+    Yield a CSV or Parquet file as DataFrames of at most chunk_rows rows.
+
+    Feature columns are read as float64 so every chunk has the same dtypes,
+    whether or not it happens to contain missing values.
+
+    Raises:
+        ValueError: If a feature column is missing
+    """
+    if _file_format(path) == 'parquet':
+        parquet_file = pq.ParquetFile(path)
+        missing = [c for c in FEATURE_COLUMNS if c not in parquet_file.schema_arrow.names]
+        if missing:
+            raise ValueError(f"{path} is missing feature columns: {missing}")
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows):
+            frame = batch.to_pandas()
+            frame[FEATURE_COLUMNS] = frame[FEATURE_COLUMNS].astype(np.float64)
+            yield frame
+        return
+
+    header = pd.read_csv(path, nrows=0).columns
+    missing = [c for c in FEATURE_COLUMNS if c not in header]
+    if missing:
+        raise ValueError(f"{path} is missing feature columns: {missing}")
+    yield from pd.read_csv(
+        path,
+        chunksize=chunk_rows,
+        dtype={column: np.float64 for column in FEATURE_COLUMNS}
+    )
+
+
+def score_features(features: np.ndarray, model_path: str, scaler_path: str) -> np.ndarray:
+    """
+    Score an (n, 8) feature matrix, leaving NaN for rows with a missing value.
+
+    Runs in the parent process or in a pool worker; the model is loaded once
+    per process by predict_adherence's registry.
+    """
+    predictions = np.full(len(features), np.nan)
+    complete = ~np.isnan(features).any(axis=1)
+    if complete.all():
+        return predict_adherence_matrix(features, model_path, scaler_path)
+    if complete.any():
+        predictions[complete] = predict_adherence_matrix(
+            np.ascontiguousarray(features[complete]), model_path, scaler_path
+        )
+    return predictions
+
+
+class ChunkWriter:
+    """Append scored chunks to a CSV or Parquet file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.format = _file_format(path)
+        self._parquet_writer = None
+        self._wrote_header = False
+
+    def write(self, frame: pd.DataFrame) -> None:
+        if self.format == 'csv':
+            frame.to_csv(self.path, mode='a' if self._wrote_header else 'w',
+                         header=not self._wrote_header, index=False)
+            self._wrote_header = True
+            return
+
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+        else:
+            # Pass-through columns may be inferred differently per chunk
+            table = table.cast(self._parquet_writer.schema)
+        self._parquet_writer.write_table(table)
+
+    def close(self) -> None:
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+
+def score_file(
+    input_path: str,
+    output_path: str,
+    model_path: str = 'models/best_model.pkl',
+    scaler_path: str = 'models/scaler.pkl',
+    chunk_rows: int = 100_000,
+    workers: int = 1,
+    max_in_flight: Optional[int] = None,
+    progress: bool = False
+) -> Dict[str, float]:
+    """
+    Score every row of input_path and write the rows plus predictions to output_path.
+
+    Args:
+        input_path: CSV or Parquet file with the feature columns
+        output_path: CSV or Parquet file to create (format from its extension)
+        model_path: Saved model, compiled or fused artifact
+        scaler_path: Saved scaler
+        chunk_rows: Rows read, scored and written at a time
+        workers: Processes scoring chunks in parallel (1 scores inline)
+        max_in_flight: Chunks read ahead of the writer (default: 2 per worker)
+        progress: Print a line to stderr after each chunk
+
+    Returns:
+        dict: rows, scored and skipped counts, chunks, seconds and rows_per_second
+    """
+    if chunk_rows < 1:
+        raise ValueError(f"chunk_rows must be at least 1, got {chunk_rows}")
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    # Resolve relative paths here so pool workers started elsewhere find them
+    model_path, scaler_path = os.path.abspath(model_path), os.path.abspath(scaler_path)
+    max_in_flight = max_in_flight or 2 * workers
+
+    stats = {'rows': 0, 'scored': 0, 'skipped': 0, 'chunks': 0}
+    start = time.perf_counter()
+    writer = ChunkWriter(output_path)
+
+    def finish(frame: pd.DataFrame, predictions: np.ndarray) -> None:
+        frame[PREDICTION_COLUMN] = predictions
+        writer.write(frame)
+        scored = int(np.count_nonzero(~np.isnan(predictions)))
+        stats['rows'] += len(frame)
+        stats['scored'] += scored
+        stats['skipped'] += len(frame) - scored
+        stats['chunks'] += 1
+        if progress:
+            elapsed = time.perf_counter() - start
+            print(f"  chunk {stats['chunks']}: {stats['rows']:,} rows "
+                  f"({stats['rows'] / elapsed:,.0f} rows/s)", file=sys.stderr)
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        # (frame, future) pairs in input order; bounded so reading cannot
+        # run arbitrarily far ahead of scoring and writing
+        in_flight = deque()
+        for frame in read_chunks(input_path, chunk_rows):
+            features = frame[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+            if executor is None:
+                finish(frame, score_features(features, model_path, scaler_path))
+                continue
+            in_flight.append((frame, executor.submit(score_features, features, model_path, scaler_path)))
+            if len(in_flight) >= max_in_flight:
+                frame, future = in_flight.popleft()
+                finish(frame, future.result())
+        while in_flight:
+            frame, future = in_flight.popleft()
+            finish(frame, future.result())
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        writer.close()
+
+    stats['seconds'] = round(time.perf_counter() - start, 3)
+    stats['rows_per_second'] = round(stats['rows'] / stats['seconds'], 1) if stats['seconds'] else 0.0
+    return stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Score a CSV or Parquet file of patients in chunks.")
+    parser.add_argument('input', help="CSV or Parquet file with the adherence_data.csv feature columns")
+    parser.add_argument('output', help="CSV or Parquet file to write (format from the extension)")
+    parser.add_argument('--model', default='models/best_model.pkl', help="Model, compiled or fused artifact")
+    parser.add_argument('--scaler', default='models/scaler.pkl', help="Fitted StandardScaler")
+    parser.add_argument('--chunk-rows', type=int, default=100_000, help="Rows per chunk (default: 100000)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help=f"Scoring processes (default: 1; this machine has {os.cpu_count()} cores)")
+    parser.add_argument('--progress', action='store_true', help="Report throughput after each chunk")
+    args = parser.parse_args(argv)
+
+    stats = score_file(
+        args.input, args.output,
+        model_path=args.model,
+        scaler_path=args.scaler,
+        chunk_rows=args.chunk_rows,
+        workers=args.workers,
+        progress=args.progress
+    )
+    print(f"Scored {stats['scored']:,} of {stats['rows']:,} rows in {stats['chunks']} chunks "
+          f"({stats['skipped']:,} skipped for missing values)")
+    print(f"Time: {stats['seconds']:.2f}s ({stats['rows_per_second']:,.0f} rows/s) -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
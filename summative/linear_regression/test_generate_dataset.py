@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test the synthetic dataset generator.
+
+Validates that the default run still reproduces adherence_data.csv, and that
+partitioned output is deterministic for any worker count, follows the
+generative formula and replaces partitions left by an earlier run.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from generate_dataset import generate_dataset, generate_partitioned, main
+from score_bulk import FEATURE_COLUMNS
+
+
+def _read_partitions(directory):
+    names = sorted(name for name in os.listdir(directory) if name.startswith('part-'))
+    readers = {'.parquet': pd.read_parquet, '.csv': pd.read_csv}
+    return names, pd.concat([readers[os.path.splitext(name)[1]](os.path.join(directory, name)) for name in names],
+                            ignore_index=True)
+
+
+def test_default_reproduces_committed_dataset(tmp_path):
+    """Test that the 1500-row dataset is byte-identical to adherence_data.csv."""
+    output = tmp_path / "adherence_data.csv"
+
+    generate_dataset(str(output))
+
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'adherence_data.csv'), 'rb') as f:
+        assert output.read_bytes() == f.read()
+
+
+@pytest.mark.parametrize("file_format", ['parquet', 'csv'])
+def test_partitions_independent_of_workers(tmp_path, file_format):
+    """Test that one and two workers write the same partitions."""
+    inline = generate_partitioned(str(tmp_path / "one"), 2500, chunk_rows=1000, file_format=file_format)
+    generate_partitioned(str(tmp_path / "two"), 2500, chunk_rows=1000, workers=2, file_format=file_format)
+
+    names, one = _read_partitions(tmp_path / "one")
+    _, two = _read_partitions(tmp_path / "two")
+
+    assert names == [f'part-0000{i}.{file_format}' for i in range(3)]
+    assert (inline['rows'], inline['chunks']) == (2500, 3)
+    pd.testing.assert_frame_equal(one, two)
+    assert list(one.columns) == FEATURE_COLUMNS + ['adherence_rate']
+
+
+def test_partitions_follow_formula(tmp_path):
+    """Test value ranges, missing rates and the strongest effects on large chunks."""
+    generate_partitioned(str(tmp_path / "data"), 60_000, chunk_rows=20_000, seed=7)
+    _, frame = _read_partitions(tmp_path / "data")
+
+    assert frame['age'].between(18, 120).all() and frame['adherence_rate'].between(0, 100).all()
+    assert frame[FEATURE_COLUMNS[:2]].dtypes.tolist() == [np.int64, np.int64]
+    assert 0.01 < frame['snooze_frequency'].isna().mean() < 0.03
+    assert frame['age'].isna().sum() == 0
+    correlations = frame.corr()['adherence_rate']
+    assert correlations['missed_doses_last_week'] < -0.3 and correlations['previous_adherence_rate'] > 0.1
+    # Different seeds give different data
+    generate_partitioned(str(tmp_path / "other"), 20_000, chunk_rows=20_000, seed=8)
+    assert not frame.iloc[:20_000].equals(_read_partitions(tmp_path / "other")[1])
+
+
+def test_rerun_replaces_stale_partitions(tmp_path, capsys):
+    """Test that a smaller rerun through the CLI leaves no partitions of the earlier run."""
+    output = tmp_path / "data"
+    generate_partitioned(str(output), 3000, chunk_rows=1000, file_format='csv')
+
+    assert main(['--rows', '500', '--chunk-rows', '1000', '--format', 'csv', '--output', str(output)]) == 0
+
+    names, frame = _read_partitions(output)
+    assert names == ['part-00000.csv'] and len(frame) == 500
+    assert "Generated 500 rows in 1 csv partitions" in capsys.readouterr().out
+    with pytest.raises(ValueError, match="chunk_rows"):
+        generate_partitioned(str(output), 10, chunk_rows=0)
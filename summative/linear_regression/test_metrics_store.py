@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test the structured metrics store.
+
+Validates that runs round-trip with their parameters, that the per-family
+latest and best queries pick the right runs for a dataset, and that
+filtered listings are ordered and limited.
+"""
+
+import time
+
+import pytest
+
+from metrics_store import MetricsStore, main
+
+
+def _scores(test_mse, test_r2=0.5):
+    return {'train_mse': test_mse / 2, 'test_mse': test_mse, 'test_rmse': test_mse ** 0.5, 'test_r2': test_r2}
+
+
+@pytest.fixture
+def store(tmp_path):
+    with MetricsStore(str(tmp_path / "models" / "metrics.db")) as metrics_store:
+        yield metrics_store
+
+
+def test_record_round_trip(store):
+    """Test that a recorded run reads back with its parameters and scores."""
+    run_id = store.record_run(
+        'rf', 'Random Forest', {**_scores(31.5), 'cv_mse': 30.1},
+        params={'max_depth': None, 'n_estimators': 300}, dataset_hash='abc',
+        training_seconds=12.5, source='run_random_forest.py', search='grid', extra={'fits': 540}
+    )
+
+    [run] = store.runs()
+    assert run['run_id'] == run_id
+    assert run['params'] == {'max_depth': None, 'n_estimators': 300}
+    assert (run['test_mse'], run['cv_mse'], run['train_r2']) == (31.5, 30.1, None)
+    assert run['extra'] == {'fits': 540} and run['training_seconds'] == 12.5
+
+
+def test_latest_and_best_per_family(store):
+    """Test the per-family queries, restricted to one dataset."""
+    store.record_run('rf', 'Random Forest', _scores(30.0), dataset_hash='abc')
+    store.record_run('rf', 'Random Forest', _scores(35.0, test_r2=0.9), dataset_hash='abc')
+    store.record_run('rf', 'Random Forest', _scores(10.0), dataset_hash='other')
+    store.record_run('lr', 'Linear Regression', _scores(95.0), dataset_hash='abc')
+
+    latest = store.latest(dataset_hash='abc')
+    best = store.best(dataset_hash='abc')
+
+    assert sorted(latest) == ['lr', 'rf']
+    assert latest['rf']['test_mse'] == 35.0
+    assert best['rf']['test_mse'] == 30.0
+    assert store.best(dataset_hash='abc', metric='test_r2')['rf']['test_r2'] == 0.9
+    assert store.best()['rf']['test_mse'] == 10.0
+    with pytest.raises(ValueError, match="metric"):
+        store.best(metric='params')
+
+
+def test_filtered_listing(store):
+    """Test family, time and source filters with ordering and limits."""
+    for test_mse in (40.0, 20.0, 30.0):
+        store.record_run('dt', 'Decision Tree', _scores(test_mse), source='run_decision_tree.py')
+    cutoff = time.time()
+    store.record_run('dt', 'Decision Tree', _scores(50.0), source='train_models.py')
+
+    assert [r['test_mse'] for r in store.runs(family='dt', order_by='test_mse', descending=False, limit=2)] == [20.0, 30.0]
+    assert [r['test_mse'] for r in store.runs(since=cutoff)] == [50.0]
+    assert len(store.runs(source='run_decision_tree.py')) == 3
+    with pytest.raises(ValueError, match="order_by"):
+        store.runs(order_by='test_mse; DROP TABLE runs')
+
+
+def test_cli_lists_runs(tmp_path, store, capsys):
+    """Test the command-line query."""
+    store.record_run('lr', 'Linear Regression', _scores(95.7), dataset_hash='abc')
+
+    assert main(['--db', store.path]) == 0
+    assert main(['--db', str(tmp_path / "missing.db")]) == 1
+    output = capsys.readouterr().out
+    assert "Linear Regression" in output and "95.7000" in output
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test the process-wide model registry used by predict_adherence().
+
+Validates that files are loaded once and reused, reloaded when they change on
+disk, evicted in least-recently-used order, and loaded only once when several
+threads miss at the same time.
+"""
+
+import os
+import threading
+import time
+
+import joblib
+import pytest
+
+from model_registry import ModelRegistry
+
+
+class CountingLoader:
+    """joblib.load wrapper that counts calls per path."""
+    
+    def __init__(self, delay=0.0):
+        self.calls = {}
+        self.delay = delay
+        self._lock = threading.Lock()
+    
+    def __call__(self, path):
+        with self._lock:
+            self.calls[path] = self.calls.get(path, 0) + 1
+        time.sleep(self.delay)
+        return joblib.load(path)
+
+
+def _write(path, obj):
+    joblib.dump(obj, path)
+    return str(path)
+
+
+def test_loads_once_and_reuses(tmp_path):
+    """Test that repeated gets return the same object without reloading."""
+    loader = CountingLoader()
+    registry = ModelRegistry(loader=loader)
+    path = _write(tmp_path / "model.pkl", {"weights": [1, 2, 3]})
+    
+    first = registry.get(path)
+    second = registry.get(path)
+    
+    assert first is second
+    assert sum(loader.calls.values()) == 1
+    assert registry.stats()["hits"] == 1
+    assert registry.stats()["misses"] == 1
+
+
+def test_reloads_when_file_changes(tmp_path):
+    """Test that a replaced file is reloaded and the stale entry dropped."""
+    registry = ModelRegistry()
+    path = _write(tmp_path / "model.pkl", {"version": 1})
+    assert registry.get(path)["version"] == 1
+    
+    _write(path, {"version": 2, "extra": "x" * 100})
+    # Make sure the mtime moves even on coarse-grained filesystems
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    
+    assert registry.get(path)["version"] == 2
+    stats = registry.stats()
+    assert stats["entries"] == 1
+    assert stats["invalidations"] == 1
+
+
+def test_lru_eviction(tmp_path):
+    """Test that the least recently used entry is evicted first."""
+    registry = ModelRegistry(max_entries=2)
+    a = _write(tmp_path / "a.pkl", "a")
+    b = _write(tmp_path / "b.pkl", "b")
+    c = _write(tmp_path / "c.pkl", "c")
+    
+    registry.get(a)
+    registry.get(b)
+    registry.get(a)  # a is now most recently used
+    registry.get(c)  # evicts b
+    
+    stats = registry.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    
+    misses = stats["misses"]
+    registry.get(a)
+    assert registry.stats()["misses"] == misses
+    registry.get(b)
+    assert registry.stats()["misses"] == misses + 1
+
+
+def test_concurrent_misses_load_once(tmp_path):
+    """Test that threads missing together share a single load."""
+    loader = CountingLoader(delay=0.05)
+    registry = ModelRegistry(loader=loader)
+    path = _write(tmp_path / "model.pkl", list(range(1000)))
+    results = []
+    
+    threads = [threading.Thread(target=lambda: results.append(registry.get(path))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(results) == 8
+    assert all(result is results[0] for result in results)
+    assert sum(loader.calls.values()) == 1
+
+
+def test_missing_file_raises(tmp_path):
+    """Test that missing files raise FileNotFoundError."""
+    with pytest.raises(FileNotFoundError):
+        ModelRegistry().get(str(tmp_path / "missing.pkl"))
+
+
+def test_invalid_max_entries():
+    """Test that a non-positive capacity is rejected."""
+    with pytest.raises(ValueError):
+        ModelRegistry(max_entries=0)
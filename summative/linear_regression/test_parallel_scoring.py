@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test multi-core batch scoring with a shared model.
+
+Validates that sharded parallel predictions equal the single-core
+predict_adherence_matrix() output for forest and linear models, and that the
+scorer cleans up its shared files.
+"""
+
+import os
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+from parallel_scoring import ParallelScorer, benchmark_scaling
+from predict_adherence import predict_adherence, predict_adherence_batch, predict_adherence_matrix
+
+LOW = [18, 1, 1, 0, 0, 0, 0, 0]
+HIGH = [90, 10, 5, 1000, 10, 1, 8, 100]
+
+
+@pytest.fixture(params=["forest", "linear"])
+def model_files(tmp_path, request):
+    """Fit a small scaler and model on synthetic rows."""
+    rng = np.random.default_rng(0)
+    X = rng.uniform(LOW, HIGH, size=(300, 8))
+    y = 0.8 * X[:, 7] - 2 * X[:, 4] + rng.normal(0, 3, 300)
+    scaler = StandardScaler().fit(X)
+    if request.param == "forest":
+        model = RandomForestRegressor(n_estimators=5, max_depth=6, random_state=0)
+    else:
+        model = LinearRegression()
+    model_path, scaler_path = tmp_path / "model.pkl", tmp_path / "scaler.pkl"
+    joblib.dump(model.fit(scaler.transform(X), y), model_path)
+    joblib.dump(scaler, scaler_path)
+    return str(model_path), str(scaler_path)
+
+
+@pytest.fixture
+def features():
+    return np.random.default_rng(1).uniform(LOW, HIGH, size=(1003, 8))
+
+
+def test_parallel_matches_single_core(model_files, features):
+    """Test that sharded scoring across workers equals predict_adherence_matrix."""
+    model_path, scaler_path = model_files
+    expected = predict_adherence_matrix(features, model_path, scaler_path)
+
+    with ParallelScorer(model_path, scaler_path, workers=2, shard_rows=100) as scorer:
+        first = scorer.predict(features)
+        second = scorer.predict(features[::-1])
+
+    np.testing.assert_allclose(first, expected, rtol=1e-12, atol=1e-9)
+    np.testing.assert_allclose(second, expected[::-1], rtol=1e-12, atol=1e-9)
+
+
+def test_scorer_removes_shared_files(model_files, features):
+    """Test that batch files are removed after each call and the model file on close."""
+    model_path, scaler_path = model_files
+    scorer = ParallelScorer(model_path, scaler_path, workers=2, shard_rows=100)
+    shared_dir = os.path.dirname(scorer.model_file)
+    scorer.predict(features)
+    assert os.listdir(shared_dir) == ["model.pkl"]
+
+    scorer.close()
+    assert not os.path.exists(shared_dir)
+    with pytest.raises(RuntimeError, match="closed"):
+        scorer.predict(features)
+
+
+def test_batch_workers_option(model_files, features):
+    """Test that predict_adherence_batch(workers=2) equals the single-core result."""
+    model_path, scaler_path = model_files
+    rows = features.tolist()
+
+    np.testing.assert_allclose(
+        predict_adherence_batch(rows, model_path, scaler_path, workers=2),
+        predict_adherence_batch(rows, model_path, scaler_path),
+        rtol=1e-12, atol=1e-9
+    )
+
+
+def test_rejects_wrong_width(model_files):
+    """Test that a matrix without 8 columns is rejected."""
+    with ParallelScorer(*model_files, workers=1) as scorer:
+        with pytest.raises(ValueError, match="8 elements"):
+            scorer.predict(np.zeros((3, 7)))
+
+
+def test_invalid_input_rejected_before_model_load(tmp_path):
+    """Test that bad input fails validation without touching the model files."""
+    missing_model, missing_scaler = str(tmp_path / "missing.pkl"), str(tmp_path / "missing_scaler.pkl")
+
+    with pytest.raises(ValueError, match="8 elements"):
+        predict_adherence_matrix(np.zeros((2, 7)), missing_model, missing_scaler)
+    with pytest.raises(ValueError, match="Age"):
+        predict_adherence(age=200, num_medications=3, medication_complexity=2.5, days_since_start=120,
+                          missed_doses_last_week=1, snooze_frequency=0.2, chronic_conditions=2,
+                          previous_adherence_rate=85.5, model_path=missing_model, scaler_path=missing_scaler)
+
+
+def test_benchmark_reports_each_worker_count(model_files, features):
+    """Test the scaling report structure."""
+    results = benchmark_scaling(features, *model_files, worker_counts=(1, 2), shard_rows=200, repeats=1)
+
+    assert [result['workers'] for result in results] == ['baseline', 1, 2]
+    assert all(result['rows_per_second'] > 0 for result in results)
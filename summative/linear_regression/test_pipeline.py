@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Test the incremental pipeline runner.
+
+Validates that stages run in dependency order, that unchanged stages are
+skipped while changed inputs re-run only what is downstream, that
+independent stages run concurrently, and that a failure blocks only its
+dependents.
+"""
+
+import io
+import os
+import time
+
+import pytest
+
+from pipeline import PIPELINE_STAGES, Stage, build_graph, deploy_artifacts, run_pipeline
+
+# Copies its first argument's file to the second, upper-casing it
+COPY_SCRIPT = """
+import sys, time
+source, target, delay = sys.argv[1], sys.argv[2], float(sys.argv[3])
+time.sleep(delay)
+with open(source) as f:
+    text = f.read()
+with open(target, 'w') as f:
+    f.write(text.upper())
+"""
+
+
+def _copy_stage(root, name, source, target, delay=0.0):
+    """A stage whose script copies source to target."""
+    script = f'{name}.py'
+    (root / script).write_text(
+        f"import sys\nsys.argv[1:] = [{source!r}, {target!r}, '{delay}']\n" + COPY_SCRIPT
+    )
+    return Stage(name, inputs=(script, source), outputs=(target,), script=script)
+
+
+@pytest.fixture
+def diamond(tmp_path):
+    """data.txt -> a -> (b, c) -> d."""
+    (tmp_path / 'data.txt').write_text('hello')
+    stages = [
+        _copy_stage(tmp_path, 'a', 'data.txt', 'a.txt'),
+        _copy_stage(tmp_path, 'b', 'a.txt', 'b.txt', delay=0.6),
+        _copy_stage(tmp_path, 'c', 'a.txt', 'c.txt', delay=0.6),
+    ]
+    (tmp_path / 'd.py').write_text(
+        "parts = [open(name).read() for name in ('b.txt', 'c.txt')]\n"
+        "open('d.txt', 'w').write('+'.join(parts))\n"
+    )
+    stages.append(Stage('d', inputs=('d.py', 'b.txt', 'c.txt'), outputs=('d.txt',), script='d.py'))
+    return tmp_path, stages
+
+
+def _statuses(results):
+    return {name: result.status for name, result in results.items()}
+
+
+def test_runs_then_skips_unchanged(diamond):
+    """Test that a second run does nothing and independent stages overlap."""
+    root, stages = diamond
+
+    start = time.perf_counter()
+    first = run_pipeline(stages, str(root), jobs=2)
+    elapsed = time.perf_counter() - start
+
+    assert _statuses(first) == dict.fromkeys('abcd', 'ran')
+    assert (root / 'd.txt').read_text() == 'HELLO+HELLO'
+    # b and c sleep 0.6s each; run one after the other they would need 1.2s
+    assert first['b'].seconds + first['c'].seconds > 1.2 and elapsed < 1.8
+    assert _statuses(run_pipeline(stages, str(root), jobs=2)) == dict.fromkeys('abcd', 'up-to-date')
+
+
+def test_changed_input_reruns_downstream_only(diamond):
+    """Test that changing one stage's output re-runs it and its dependents only."""
+    root, stages = diamond
+    run_pipeline(stages, str(root))
+
+    (root / 'c.py').write_text((root / 'c.py').read_text().replace("text.upper()", "text.upper() + '!'"))
+    results = run_pipeline(stages, str(root))
+
+    assert _statuses(results) == {'a': 'up-to-date', 'b': 'up-to-date', 'c': 'ran', 'd': 'ran'}
+    assert (root / 'd.txt').read_text() == 'HELLO+HELLO!'
+
+
+def test_identical_output_does_not_invalidate(diamond):
+    """Test that a forced stage rewriting the same bytes leaves dependents up to date."""
+    root, stages = diamond
+    run_pipeline(stages, str(root))
+
+    results = run_pipeline(stages, str(root), force=['a'])
+
+    assert _statuses(results) == {'a': 'ran', 'b': 'up-to-date', 'c': 'up-to-date', 'd': 'up-to-date'}
+
+
+def test_missing_output_and_targets(diamond):
+    """Test that a deleted output re-runs its stage and targets limit the run."""
+    root, stages = diamond
+    run_pipeline(stages, str(root))
+    os.remove(root / 'b.txt')
+
+    results = run_pipeline(stages, str(root), targets=['b'])
+
+    assert _statuses(results) == {'a': 'up-to-date', 'b': 'ran'}
+    assert results['b'].reason == 'missing b.txt'
+
+
+def test_failure_blocks_dependents(diamond):
+    """Test that a failing stage blocks its dependents but not independent stages."""
+    root, stages = diamond
+    (root / 'b.py').write_text("raise SystemExit('broken')\n")
+
+    results = run_pipeline(stages, str(root))
+
+    assert _statuses(results) == {'a': 'ran', 'b': 'failed', 'c': 'ran', 'd': 'blocked'}
+    assert 'broken' in open(results['b'].log_path).read()
+    # The failed stage is retried next time; the others are not
+    (root / 'b.py').write_text((root / 'c.py').read_text().replace('c.txt', 'b.txt'))
+    assert _statuses(run_pipeline(stages, str(root))) == {'a': 'up-to-date', 'b': 'ran', 'c': 'up-to-date', 'd': 'ran'}
+
+
+def test_dry_run_reports_without_running(diamond):
+    """Test that a dry run marks out-of-date stages and their dependents."""
+    root, stages = diamond
+    run_pipeline(stages, str(root))
+    (root / 'data.txt').write_text('changed')
+
+    results = run_pipeline(stages, str(root), dry_run=True)
+
+    assert _statuses(results) == dict.fromkeys('abcd', 'would-run')
+    assert (root / 'a.txt').read_text() == 'HELLO'
+
+
+def test_invalid_definitions():
+    """Test that cycles and clashing outputs are rejected."""
+    with pytest.raises(ValueError, match="cycle"):
+        build_graph([Stage('x', ('y.txt',), ('x.txt',)), Stage('y', ('x.txt',), ('y.txt',))])
+    with pytest.raises(ValueError, match="produced by both"):
+        build_graph([Stage('x', (), ('out.txt',)), Stage('y', (), ('out.txt',))])
+
+
+def test_training_pipeline_graph():
+    """Test the declared training pipeline's dependencies."""
+    graph = build_graph(PIPELINE_STAGES)
+
+    assert graph['eda'] == graph['lr'] == graph['dt'] == graph['rf'] == ['generate']
+    assert graph['compare'] == ['dt', 'generate', 'lr', 'rf']
+    assert graph['deploy'] == ['compare']
+
+
+def test_deploy_copies_built_artifacts(tmp_path):
+    """Test that deploy copies the artifacts that exist into API/models."""
+    root = tmp_path / 'linear_regression'
+    (root / 'models').mkdir(parents=True)
+    (root / 'models' / 'best_model.pkl').write_bytes(b'model')
+    (root / 'models' / 'scaler.pkl').write_bytes(b'scaler')
+
+    log = io.StringIO()
+    deploy_artifacts(str(root), log)
+
+    assert sorted(os.listdir(tmp_path / 'API' / 'models')) == ['best_model.pkl', 'scaler.pkl']
+    assert (tmp_path / 'API' / 'models' / 'best_model.pkl').read_bytes() == b'model'
+    assert 'scaler.pkl' in log.getvalue()
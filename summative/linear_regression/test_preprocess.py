@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test the cached preprocessing stage.
+
+Validates that cached splits equal a fresh computation, that the cache key
+changes with the dataset contents and split parameters, and that unreadable
+entries are rebuilt.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.model_selection import train_test_split
+
+from preprocess import cache_key, clear_cache, compute_data, dataset_hash, main, prepare_data
+from score_bulk import FEATURE_COLUMNS
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    """Write a small CSV in the adherence_data.csv layout, with one incomplete row."""
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(
+        rng.uniform([18, 1, 1, 0, 0, 0, 0, 0], [90, 10, 5, 1000, 10, 1, 8, 100], size=(60, 8)),
+        columns=FEATURE_COLUMNS
+    )
+    frame['adherence_rate'] = rng.uniform(0, 100, len(frame))
+    frame.loc[7, 'age'] = np.nan
+    path = tmp_path / "adherence_data.csv"
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def test_matches_original_steps(dataset):
+    """Test that the split equals the scripts' read_csv/dropna/scaler/train_test_split steps."""
+    data = prepare_data(dataset)
+
+    df_clean = pd.read_csv(dataset).dropna()
+    X = df_clean[FEATURE_COLUMNS]
+    X_train, X_test, y_train, y_test = train_test_split(
+        data.scaler.transform(X.values), df_clean['adherence_rate'], test_size=0.2, random_state=42
+    )
+    np.testing.assert_array_equal(data.X_train, X_train)
+    np.testing.assert_array_equal(data.y_test, y_test.values)
+    np.testing.assert_array_equal(data.X_test_raw, train_test_split(X.values, test_size=0.2, random_state=42)[1])
+    assert (data.raw_rows, data.clean_rows) == (60, 59)
+
+
+def test_second_call_loads_from_cache(tmp_path, dataset):
+    """Test that a repeated call reads the stored entry instead of recomputing."""
+    cache_dir = str(tmp_path / "cache")
+    first = prepare_data(dataset, cache_dir=cache_dir)
+    second = prepare_data(dataset, cache_dir=cache_dir)
+
+    assert not first.from_cache and second.from_cache
+    assert first.cache_key == second.cache_key
+    assert os.listdir(cache_dir) == [first.cache_key]
+    np.testing.assert_array_equal(first.X_train, second.X_train)
+    np.testing.assert_array_equal(first.scaler.mean_, second.scaler.mean_)
+    assert second.feature_cols == FEATURE_COLUMNS
+
+
+def test_key_follows_contents_and_parameters(tmp_path, dataset):
+    """Test that editing the CSV or the split parameters gives a new entry."""
+    cache_dir = str(tmp_path / "cache")
+    original = prepare_data(dataset, cache_dir=cache_dir)
+
+    assert prepare_data(dataset, test_size=0.3, cache_dir=cache_dir).cache_key != original.cache_key
+    assert cache_key(dataset_hash(dataset), random_state=1) != original.cache_key
+
+    frame = pd.read_csv(dataset)
+    frame.loc[0, 'adherence_rate'] += 1
+    frame.to_csv(dataset, index=False)
+    changed = prepare_data(dataset, cache_dir=cache_dir)
+    assert not changed.from_cache and changed.cache_key != original.cache_key
+    assert clear_cache(cache_dir) == 3
+
+
+def test_corrupt_entry_is_rebuilt(tmp_path, dataset):
+    """Test that a truncated entry is recomputed."""
+    cache_dir = str(tmp_path / "cache")
+    key = prepare_data(dataset, cache_dir=cache_dir).cache_key
+    with open(os.path.join(cache_dir, key, 'split.npz'), 'wb') as f:
+        f.write(b'truncated')
+
+    rebuilt = prepare_data(dataset, cache_dir=cache_dir)
+
+    assert not rebuilt.from_cache
+    np.testing.assert_array_equal(rebuilt.X_test, compute_data(dataset).X_test)
+    assert prepare_data(dataset, cache_dir=cache_dir).from_cache
+
+
+def test_cli_reports_cache_use(tmp_path, dataset, capsys):
+    """Test the command-line entry point."""
+    cache_dir = str(tmp_path / "cache")
+
+    assert main(['--data', dataset, '--cache-dir', cache_dir]) == 0
+    assert main(['--data', dataset, '--cache-dir', cache_dir]) == 0
+    assert main(['--data', dataset, '--cache-dir', cache_dir, '--clear']) == 0
+    output = capsys.readouterr().out
+    assert "computed and cached" in output and "loaded from cache" in output
+    assert "Removed 1 cached entries" in output
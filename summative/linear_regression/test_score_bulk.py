@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test the chunked offline bulk scoring CLI.
+
+Validates that chunked and multi-process scoring match predict_adherence_batch(),
+that output rows keep the input order, and that rows with missing features
+are kept without a prediction.
+"""
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+from predict_adherence import predict_adherence_batch
+from score_bulk import FEATURE_COLUMNS, PREDICTION_COLUMN, main, score_file
+
+
+@pytest.fixture
+def model_files(tmp_path):
+    """Fit a small scaler and linear model on synthetic rows."""
+    rng = np.random.default_rng(0)
+    X = rng.uniform([18, 1, 1, 0, 0, 0, 0, 0], [90, 10, 5, 1000, 10, 1, 8, 100], size=(200, 8))
+    y = 0.8 * X[:, 7] - 2 * X[:, 4] + 10
+    scaler = StandardScaler().fit(X)
+    model_path, scaler_path = tmp_path / "model.pkl", tmp_path / "scaler.pkl"
+    joblib.dump(LinearRegression().fit(scaler.transform(X), y), model_path)
+    joblib.dump(scaler, scaler_path)
+    return str(model_path), str(scaler_path)
+
+
+@pytest.fixture
+def patients(tmp_path):
+    """Write a CSV in the adherence_data.csv layout, with one incomplete row."""
+    rng = np.random.default_rng(1)
+    frame = pd.DataFrame(
+        rng.uniform([18, 1, 1, 0, 0, 0, 0, 0], [90, 10, 5, 1000, 10, 1, 8, 100], size=(23, 8)),
+        columns=FEATURE_COLUMNS
+    )
+    frame['adherence_rate'] = np.arange(len(frame), dtype=float)
+    frame.loc[5, 'snooze_frequency'] = np.nan
+    path = tmp_path / "patients.csv"
+    frame.to_csv(path, index=False)
+    return str(path), frame
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_matches_batch_prediction(tmp_path, model_files, patients, workers):
+    """Test that chunked scoring equals predict_adherence_batch, in input order."""
+    model_path, scaler_path = model_files
+    input_path, frame = patients
+    output_path = str(tmp_path / "scored.csv")
+
+    stats = score_file(input_path, output_path, model_path, scaler_path, chunk_rows=4, workers=workers)
+
+    scored = pd.read_csv(output_path)
+    assert stats['rows'] == len(frame) and stats['chunks'] == 6
+    assert stats['skipped'] == 1
+    assert scored['adherence_rate'].tolist() == frame['adherence_rate'].tolist()
+    assert np.isnan(scored.loc[5, PREDICTION_COLUMN])
+
+    complete = frame.drop(index=5)
+    expected = predict_adherence_batch(complete[FEATURE_COLUMNS].values.tolist(), model_path, scaler_path)
+    np.testing.assert_allclose(scored.drop(index=5)[PREDICTION_COLUMN], expected)
+
+
+def test_parquet_round_trip(tmp_path, model_files, patients):
+    """Test Parquet input and output."""
+    pytest.importorskip("pyarrow")
+    model_path, scaler_path = model_files
+    _, frame = patients
+    input_path = str(tmp_path / "patients.parquet")
+    frame.to_parquet(input_path, index=False)
+
+    score_file(input_path, str(tmp_path / "scored.parquet"), model_path, scaler_path, chunk_rows=10)
+
+    scored = pd.read_parquet(tmp_path / "scored.parquet")
+    assert len(scored) == len(frame)
+    assert list(scored.columns) == list(frame.columns) + [PREDICTION_COLUMN]
+
+
+def test_missing_feature_column_rejected(tmp_path, model_files):
+    """Test that an input without the feature columns is rejected."""
+    model_path, scaler_path = model_files
+    path = tmp_path / "bad.csv"
+    pd.DataFrame({'age': [45]}).to_csv(path, index=False)
+
+    with pytest.raises(ValueError, match="missing feature columns"):
+        score_file(str(path), str(tmp_path / "out.csv"), model_path, scaler_path)
+
+
+def test_cli_reports_throughput(tmp_path, model_files, patients, capsys):
+    """Test the command-line entry point."""
+    model_path, scaler_path = model_files
+    input_path, _ = patients
+
+    assert main([input_path, str(tmp_path / "out.csv"), '--model', model_path,
+                 '--scaler', scaler_path, '--chunk-rows', '10']) == 0
+    assert "rows/s" in capsys.readouterr().out
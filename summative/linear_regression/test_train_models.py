@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test the shared training driver.
+
+Validates that the pooled search picks the same hyperparameters as
+GridSearchCV(cv=5), that the refit estimator and data split match the
+per-family scripts, that successive halving narrows the candidates as
+scheduled, and that the saved metrics files keep the layout
+compare_and_select_model.py parses.
+"""
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.model_selection import GridSearchCV
+
+from metrics_store import MetricsStore
+from score_bulk import FEATURE_COLUMNS
+from train_models import (
+    MODEL_FAMILIES,
+    SearchConfig,
+    compare_search_methods,
+    format_search_comparison,
+    halving_schedule,
+    main,
+    parse_search_methods,
+    prepare_data,
+    save_results,
+    search_all,
+)
+
+SMALL_GRIDS = {
+    'dt': {'max_depth': [2, 4, None], 'min_samples_leaf': [1, 4]},
+    'rf': {'n_estimators': [5, 10], 'max_depth': [3, None]},
+}
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    """Write a small CSV in the adherence_data.csv layout, with one incomplete row."""
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(
+        rng.uniform([18, 1, 1, 0, 0, 0, 0, 0], [90, 10, 5, 1000, 10, 1, 8, 100], size=(150, 8)),
+        columns=FEATURE_COLUMNS
+    )
+    frame['adherence_rate'] = 0.7 * frame['previous_adherence_rate'] - 3 * frame['missed_doses_last_week'] \
+        + rng.normal(0, 2, len(frame))
+    frame.loc[3, 'age'] = np.nan
+    path = tmp_path / "adherence_data.csv"
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def test_prepare_data_drops_incomplete_rows(dataset):
+    """Test the shared split: incomplete rows dropped, raw and scaled test rows aligned."""
+    data = prepare_data(dataset)
+
+    assert len(data.X_train) + len(data.X_test) == 149
+    assert len(data.X_test) == 30
+    assert data.feature_cols == FEATURE_COLUMNS
+    np.testing.assert_allclose(data.scaler.transform(data.X_test_raw), data.X_test)
+
+
+@pytest.mark.parametrize("key", ['dt', 'rf'])
+def test_search_matches_grid_search(dataset, key):
+    """Test that the pooled search chooses GridSearchCV's parameters and refits them."""
+    data = prepare_data(dataset)
+    family = MODEL_FAMILIES[key]
+
+    result = search_all(data, [key], workers=2, param_grids=SMALL_GRIDS)[key]
+
+    grid = GridSearchCV(family.build({}), SMALL_GRIDS[key], cv=5, scoring='neg_mean_squared_error')
+    grid.fit(data.X_train, data.y_train)
+    assert result.best_params == grid.best_params_
+    assert result.best_cv_mse == pytest.approx(-grid.best_score_)
+    assert result.fits == len(grid.cv_results_['params']) * 5
+    np.testing.assert_allclose(result.estimator.predict(data.X_test), grid.best_estimator_.predict(data.X_test))
+
+
+def test_saved_models_and_metrics(tmp_path, dataset):
+    """Test that every family's model, parseable metrics file and run record is saved."""
+    data = prepare_data(dataset)
+    results = search_all(data, ['lr', 'dt'], workers=2, param_grids=SMALL_GRIDS)
+    models_dir = tmp_path / "models"
+
+    evaluations = save_results(results, data, str(models_dir))
+
+    lr_metrics = (models_dir / "lr_metrics.txt").read_text()
+    assert "Training Time:" in lr_metrics and "Feature Coefficients:" in lr_metrics
+    dt_metrics = (models_dir / "dt_metrics.txt").read_text()
+    assert "Hyperparameter Tuning Time:" in dt_metrics and "Best Hyperparameters:" in dt_metrics
+    assert f"  MSE:  {evaluations['dt']['test_mse']:.4f}\n" in dt_metrics.split("Test Set:")[1]
+
+    with MetricsStore(str(models_dir / "metrics.db")) as store:
+        runs = store.latest(dataset_hash=data.dataset_hash)
+    assert sorted(runs) == ['dt', 'lr']
+    assert runs['dt']['test_mse'] == pytest.approx(evaluations['dt']['test_mse'])
+    assert runs['dt']['params'] == results['dt'].best_params
+
+    dt_model = joblib.load(models_dir / "dt_model.pkl")
+    np.testing.assert_allclose(dt_model.predict(data.X_test), results['dt'].estimator.predict(data.X_test))
+
+
+def test_halving_schedule():
+    """Test that rounds stop when candidates run out or the first round would be too small."""
+    assert halving_schedule(36, 300, 10, 3) == [11, 33, 100, 300]
+    assert halving_schedule(108, 1144, 100, 3) == [127, 381, 1144]
+    assert halving_schedule(1, 1144, 100, 3) == [1144]
+    with pytest.raises(ValueError, match="factor"):
+        halving_schedule(10, 100, 10, 1)
+
+
+@pytest.mark.parametrize("key, resource", [('dt', 'n_samples'), ('rf', 'n_estimators')])
+def test_halving_search(dataset, key, resource):
+    """Test that halving ends on the full resource with fewer candidates each round."""
+    data = prepare_data(dataset)
+    grids = {'dt': {'max_depth': [2, 3, 4, None], 'min_samples_leaf': [1, 2, 4]},
+             'rf': {'n_estimators': [4, 12], 'max_depth': [2, 3, None], 'min_samples_leaf': [1, 4]}}
+    config = SearchConfig(method='halving', resource=resource, min_resources=30 if key == 'dt' else 2)
+
+    result = search_all(data, [key], workers=2, param_grids=grids, search={key: config})[key]
+
+    counts = [r['candidates'] for r in result.rounds]
+    assert counts[0] == result.candidates and counts == sorted(counts, reverse=True) and len(counts) > 1
+    assert result.fits == sum(counts) * 5
+    if resource == 'n_samples':
+        assert result.rounds[-1]['resource'] == len(data.X_train)
+    else:
+        assert result.best_params['n_estimators'] == 12
+    assert result.estimator.predict(data.X_test).shape == (len(data.X_test),)
+
+
+def test_search_comparison_report(dataset):
+    """Test the grid versus halving report."""
+    data = prepare_data(dataset)
+
+    rows = compare_search_methods(data, ['dt'], workers=1,
+                                  halving=SearchConfig(method='halving', min_resources=30))
+    report = format_search_comparison(rows)
+
+    assert [row['method'] for row in rows] == ['grid', 'halving']
+    assert all(row['test_mse'] > 0 and row['wall_seconds'] > 0 for row in rows)
+    assert "successive halving on n_samples" in report and "1.0x" in report
+
+
+def test_parse_search_methods():
+    """Test per-family --search values."""
+    assert parse_search_methods(['halving', 'lr=grid'], ['lr', 'rf']) == {'lr': 'grid', 'rf': 'halving'}
+    with pytest.raises(ValueError, match="method"):
+        parse_search_methods(['rf=random'], ['rf'])
+    with pytest.raises(ValueError, match="family"):
+        parse_search_methods(['svm=grid'], ['rf'])
+
+
+def test_cli_trains_selected_families(tmp_path, dataset, capsys):
+    """Test the command-line entry point."""
+    models_dir = tmp_path / "models"
+
+    assert main(['--data', dataset, '--families', 'lr', '--workers', '1', '--models-dir', str(models_dir)]) == 0
+    assert (models_dir / "lr_model.pkl").exists()
+    assert "Linear Regression" in capsys.readouterr().out
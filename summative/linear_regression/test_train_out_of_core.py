@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test the out-of-core training driver.
+
+Validates that the streamed linear regression equals an in-memory fit on the
+same rows, that the split and models do not depend on the chunk size or on
+whether the data is one file or partitions, and that runs are saved and
+recorded with their peak memory.
+"""
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from generate_dataset import generate_partitioned
+from metrics_store import MetricsStore
+from predict_adherence import predict_adherence_batch
+from score_bulk import FEATURE_COLUMNS
+from train_out_of_core import format_results, main, row_uniforms, save_results, train_out_of_core
+
+BOOSTING = {'n_estimators': 15, 'max_depth': 4}
+
+
+@pytest.fixture(scope='module')
+def partitions(tmp_path_factory):
+    """4000 generated rows as four Parquet partitions, and the same rows as one CSV."""
+    directory = tmp_path_factory.mktemp("data")
+    generate_partitioned(str(directory / "parts"), 4000, chunk_rows=1000, seed=3)
+    frame = pd.concat([pd.read_parquet(directory / "parts" / f"part-0000{i}.parquet") for i in range(4)],
+                      ignore_index=True)
+    frame.to_csv(directory / "data.csv", index=False)
+    return str(directory / "parts"), str(directory / "data.csv"), frame
+
+
+def test_split_is_stable():
+    """Test that the row hash gives the same split for any chunking."""
+    whole = row_uniforms(0, 1000, seed=42)
+    pieces = np.concatenate([row_uniforms(start, 250, seed=42) for start in range(0, 1000, 250)])
+
+    assert np.array_equal(whole, pieces)
+    assert 0.15 < np.mean(whole < 0.2) < 0.25
+    assert not np.array_equal(whole, row_uniforms(0, 1000, seed=7))
+
+
+def test_linear_matches_in_memory_fit(partitions):
+    """Test that streamed normal equations equal LinearRegression on the same training rows."""
+    parts, _, frame = partitions
+    result = train_out_of_core(parts, chunk_rows=300, **BOOSTING)
+
+    complete = frame.dropna()
+    train = row_uniforms(0, len(frame), 42)[complete.index] >= 0.2
+    X_train = result.scaler.transform(complete[FEATURE_COLUMNS].to_numpy()[train])
+    reference = LinearRegression().fit(X_train, complete['adherence_rate'].to_numpy()[train])
+
+    assert result.train_rows == train.sum() and result.dropped_rows == len(frame) - len(complete)
+    assert np.allclose(result.linear.coef_, reference.coef_, atol=1e-8)
+    assert result.linear.intercept_ == pytest.approx(reference.intercept_)
+    assert result.metrics['ooc_hgb']['test_mse'] < result.metrics['ooc_lr']['test_mse']
+
+
+def test_same_models_for_any_chunking_and_layout(partitions):
+    """Test that a CSV read in large chunks gives the models of partitions read in small ones."""
+    parts, csv_path, _ = partitions
+
+    small = train_out_of_core(parts, chunk_rows=333, **BOOSTING)
+    large = train_out_of_core(csv_path, chunk_rows=10_000, **BOOSTING)
+
+    assert small.test_rows == large.test_rows
+    assert np.allclose(small.linear.coef_, large.linear.coef_)
+    assert small.metrics['ooc_hgb']['test_mse'] == pytest.approx(large.metrics['ooc_hgb']['test_mse'])
+
+
+def test_saved_models_serve_and_runs_recorded(tmp_path, partitions, capsys):
+    """Test the CLI's saved models with predict_adherence and its metrics store records."""
+    parts, _, frame = partitions
+    models_dir = tmp_path / "models"
+
+    assert main(['--data', parts, '--chunk-rows', '500', '--trees', '5', '--models-dir', str(models_dir)]) == 0
+
+    assert "Peak RSS" in capsys.readouterr().out
+    boosting = joblib.load(models_dir / "ooc_hgb_model.pkl")
+    scaler = joblib.load(models_dir / "ooc_scaler.pkl")
+    row = frame.dropna()[FEATURE_COLUMNS].iloc[:3].to_numpy()
+    served = predict_adherence_batch(row.tolist(), str(models_dir / "ooc_hgb_model.pkl"),
+                                     str(models_dir / "ooc_scaler.pkl"))
+    assert np.allclose(served, np.clip(boosting.predict(scaler.transform(row)), 0, 100))
+    with MetricsStore(str(models_dir / "metrics.db")) as store:
+        runs = store.latest()
+    assert sorted(runs) == ['ooc_hgb', 'ooc_lr']
+    assert runs['ooc_hgb']['params']['n_estimators'] == 5
+    assert runs['ooc_lr']['extra']['peak_rss_mb'] > 0
+
+
+def test_save_and_format_results(tmp_path, partitions):
+    """Test the saved files, the recorded params and extra, and the results table."""
+    parts, _, _ = partitions
+    result = train_out_of_core(parts, chunk_rows=1000, n_estimators=3, max_depth=3)
+    models_dir = tmp_path / "models"
+
+    save_results(result, str(models_dir), data_hash='abc123', chunk_rows=1000)
+
+    assert sorted(path.name for path in models_dir.glob("ooc_*.pkl")) == [
+        'ooc_hgb_model.pkl', 'ooc_lr_model.pkl', 'ooc_scaler.pkl']
+    with MetricsStore(str(models_dir / "metrics.db")) as store:
+        runs = store.latest(dataset_hash='abc123')
+    assert runs['ooc_hgb']['params'] == result.params['ooc_hgb']
+    assert runs['ooc_lr']['source'] == 'train_out_of_core.py'
+    assert runs['ooc_lr']['extra'] == {'train_rows': result.train_rows, 'test_rows': result.test_rows,
+                                       'chunk_rows': 1000, 'peak_rss_mb': result.peak_rss_mb}
+
+    table = format_results(result).splitlines()
+    assert table[0].startswith(f"Rows: {result.train_rows:,} train / {result.test_rows:,} test")
+    assert [line.split('  ')[0] for line in table[3:5]] == [
+        'Linear Regression (out-of-core)', 'Histogram Boosting (out-of-core)']
+    assert f"{result.metrics['ooc_lr']['test_mse']:.4f}" in table[3]
+
+
+def test_rejects_empty_training_set(tmp_path):
+    """Test that a dataset without complete rows is rejected."""
+    path = tmp_path / "empty.csv"
+    pd.DataFrame({**{column: [np.nan] for column in FEATURE_COLUMNS}, 'adherence_rate': [50.0]}).to_csv(path, index=False)
+
+    with pytest.raises(ValueError, match="no complete training rows"):
+        train_out_of_core(str(path))
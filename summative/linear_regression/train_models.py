@@ -0,0 +1,611 @@
+#!/usr/bin/env python3
+"""
+Single training driver for all three model families.
+
+run_linear_regression.py, run_decision_tree.py and run_random_forest.py each
+run their grid search one after another, and compare_and_select_model.py then
+repeated the winner's grid search to retrain it. This driver loads the
+prepared data once (see preprocess.py) and runs every family's search on one
+shared process pool:
+
+- The training split is sent to each worker once (pool initializer), not
+  with every task.
+- Every (family, candidate, fold) fit is an independent task. All families'
+  tasks are queued together, largest forests first, so cores stay busy until
+  the last fit instead of idling at the end of each family's search.
+- Folds and tie-breaking match GridSearchCV(cv=5), so the chosen parameters
+  are the ones the per-family scripts find.
+
+As soon as a family's folds are done, its best candidate is refit on the whole
+training split. The fitted estimator is saved as models/<key>_model.pkl next to
+the usual models/<key>_metrics.txt (same format as the run_*.py scripts), and
+compare_and_select_model.py loads the winner from there instead of searching
+again. Timings in the metrics files are each family's own fit seconds summed
+over the workers (for linear regression, its final fit), so the comparison's
+time column still means the same thing when families share the pool.
+
+The exhaustive forest grid (108 candidates x 5 folds of up to 300 trees)
+dominates training time. --search halving replaces a family's grid with
+successive halving: every candidate starts on a small budget and each round
+keeps the best third with three times the budget, until the survivors run on
+the full budget. The budget is n_estimators for forests and the number of
+training rows for the other families. --compare-search runs both searches per
+family and reports wall time and test MSE side by side.
+
+Usage:
+    python train_models.py --workers 8
+    python train_models.py --families dt rf
+    python train_models.py --search rf=halving
+    python train_models.py --families dt rf --compare-search
+
+Author: MedMind Development Team
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import KFold, ParameterGrid
+from sklearn.tree import DecisionTreeRegressor
+
+from metrics_store import MetricsStore
+# Cached data preparation shared by every training script
+from preprocess import TrainingData, prepare_data
+
+
+@dataclass(frozen=True)
+class ModelFamily:
+    """A model family: its estimator, fixed settings and hyperparameter grid."""
+
+    key: str
+    name: str
+    estimator_class: type
+    fixed_params: Dict[str, Any]
+    param_grid: Dict[str, list]
+    # Resource successive halving grows: 'n_samples' or an estimator parameter
+    halving_resource: str = 'n_samples'
+    halving_min_resources: int = 100
+
+    def build(self, params: Dict[str, Any]):
+        """A new unfitted estimator with the given hyperparameters."""
+        return self.estimator_class(**self.fixed_params, **params)
+
+
+# The grids of run_linear_regression.py, run_decision_tree.py and run_random_forest.py.
+# Forests use one core per fit; the pool runs fits side by side instead.
+MODEL_FAMILIES: Dict[str, ModelFamily] = {
+    'lr': ModelFamily('lr', 'Linear Regression', LinearRegression, {}, {}),
+    'dt': ModelFamily('dt', 'Decision Tree', DecisionTreeRegressor, {'random_state': 42}, {
+        'max_depth': [3, 5, 7, 10, 15, 20, None],
+        'min_samples_split': [2, 5, 10, 20],
+        'min_samples_leaf': [1, 2, 4, 8]
+    }),
+    'rf': ModelFamily('rf', 'Random Forest', RandomForestRegressor, {'random_state': 42, 'n_jobs': 1}, {
+        'n_estimators': [100, 200, 300],
+        'max_depth': [10, 15, 20, None],
+        'min_samples_split': [2, 5, 10],
+        'min_samples_leaf': [1, 2, 4]
+    }, halving_resource='n_estimators', halving_min_resources=10),
+}
+
+
+@dataclass(frozen=True)
+class SearchConfig:
+    """
+    How to search a family's grid.
+
+    Args:
+        method: 'grid' (every candidate on all rows) or 'halving' (successive halving)
+        resource: What halving grows per round, 'n_samples' or an estimator
+                  parameter such as 'n_estimators' (default: the family's)
+        min_resources: First round's resource (default: the family's)
+        factor: Halving keeps 1/factor of the candidates per round and
+                multiplies the resource by factor
+    """
+
+    method: str = 'grid'
+    resource: Optional[str] = None
+    min_resources: Optional[int] = None
+    factor: int = 3
+
+
+@dataclass
+class SearchResult:
+    """Outcome of one family's hyperparameter search."""
+
+    family: ModelFamily
+    best_params: Dict[str, Any]
+    best_cv_mse: float
+    candidates: int
+    fits: int
+    fit_seconds: float
+    refit_seconds: float = 0.0
+    estimator: Any = None
+    cv_mse: List[float] = field(default_factory=list)
+    search: SearchConfig = field(default_factory=SearchConfig)
+    # Resource, candidate count and best CV MSE of each round
+    rounds: List[Dict[str, Any]] = field(default_factory=list)
+
+
+# Training split held by each pool worker (set by _init_worker)
+_worker_X: Optional[np.ndarray] = None
+_worker_y: Optional[np.ndarray] = None
+
+
+def _init_worker(X_train: np.ndarray, y_train: np.ndarray) -> None:
+    """Pool initializer: receive the training split once per worker."""
+    global _worker_X, _worker_y
+    _worker_X, _worker_y = X_train, y_train
+
+
+def _fit_and_score(key: str, params: Dict[str, Any], train_idx: np.ndarray, val_idx: np.ndarray):
+    """Fit one candidate on one fold's training rows; return its validation MSE and fit seconds."""
+    start = time.perf_counter()
+    estimator = MODEL_FAMILIES[key].build(params)
+    estimator.fit(_worker_X[train_idx], _worker_y[train_idx])
+    mse = mean_squared_error(_worker_y[val_idx], estimator.predict(_worker_X[val_idx]))
+    return mse, time.perf_counter() - start
+
+
+def _refit(key: str, params: Dict[str, Any]):
+    """Fit the chosen candidate on the whole training split; return it and the fit seconds."""
+    start = time.perf_counter()
+    estimator = MODEL_FAMILIES[key].build(params).fit(_worker_X, _worker_y)
+    return estimator, time.perf_counter() - start
+
+
+def _fit_cost(params: Dict[str, Any]) -> int:
+    """Rough relative cost of a fit, used to start the largest forests first."""
+    return params.get('n_estimators', 1)
+
+
+def halving_schedule(n_candidates: int, max_resource: int, min_resource: int, factor: int) -> List[int]:
+    """
+    Resource per round of a successive halving search.
+
+    Each round keeps the best 1/factor of the candidates and gives the
+    survivors factor times more resource. There are just enough rounds to get
+    down to one candidate, as long as the first round still has at least
+    min_resource; the last round always uses max_resource.
+
+    Returns:
+        list of int: Resource of each round, ascending, ending at max_resource
+    """
+    if factor < 2:
+        raise ValueError(f"factor must be at least 2, got {factor}")
+    min_resource = min(max(min_resource, 1), max_resource)
+    rounds_needed = 1
+    while factor ** (rounds_needed - 1) < n_candidates:
+        rounds_needed += 1
+    rounds_possible = 1
+    while min_resource * factor ** rounds_possible <= max_resource:
+        rounds_possible += 1
+    rounds = min(rounds_needed, rounds_possible)
+    return [max_resource // factor ** (rounds - 1 - i) for i in range(rounds)]
+
+
+class _FamilySearch:
+    """
+    One family's search, run in rounds of (candidate, fold) fits.
+
+    A grid search is a single round of every candidate on all training rows.
+    Successive halving starts every candidate on a small resource (a sample
+    of the training rows, or a smaller value of an estimator parameter such as
+    n_estimators) and after each round keeps the best 1/factor for the next.
+    """
+
+    def __init__(self, key: str, grid: Dict[str, list], config: SearchConfig, n_rows: int, cv: int):
+        family = MODEL_FAMILIES[key]
+        self.key = key
+        self.family = family
+        self.config = config
+        self.cv = cv
+        self.n_rows = n_rows
+        self.resource = config.resource or family.halving_resource
+        if config.method == 'grid':
+            self.candidates = list(ParameterGrid(grid))
+            self.schedule = [None]
+        elif config.method == 'halving':
+            if self.resource == 'n_samples':
+                max_resource = n_rows
+            elif self.resource in grid:
+                # The resource parameter is grown by the search instead of tuned
+                max_resource = max(grid[self.resource])
+                grid = {name: values for name, values in grid.items() if name != self.resource}
+            else:
+                raise ValueError(f"{family.name} grid has no '{self.resource}' to use as the halving resource")
+            self.candidates = list(ParameterGrid(grid))
+            self.schedule = halving_schedule(
+                len(self.candidates), max_resource,
+                config.min_resources or family.halving_min_resources, config.factor
+            )
+        else:
+            raise ValueError(f"Unknown search method '{config.method}' (expected 'grid' or 'halving')")
+        # Fixed row order from which the n_samples rounds take their samples
+        self._row_order = np.random.default_rng(42).permutation(n_rows)
+        self.round = 0
+        self.alive = list(range(len(self.candidates)))
+        self.fits = 0
+        self.rounds: List[Dict[str, Any]] = []
+
+    def params(self, index: int) -> Dict[str, Any]:
+        """Hyperparameters of a candidate at the current round's resource."""
+        params = dict(self.candidates[index])
+        resource = self.schedule[self.round]
+        if resource is not None and self.resource != 'n_samples':
+            params[self.resource] = resource
+        return params
+
+    def round_tasks(self) -> List[Tuple[int, int, Dict[str, Any], np.ndarray, np.ndarray]]:
+        """(candidate, fold, params, train rows, validation rows) of every fit in this round."""
+        resource = self.schedule[self.round]
+        if resource is None or self.resource != 'n_samples' or resource >= self.n_rows:
+            rows = np.arange(self.n_rows)
+        else:
+            rows = np.sort(self._row_order[:resource])
+        folds = [(rows[train], rows[val]) for train, val in KFold(n_splits=self.cv).split(rows)]
+        self.scores = np.zeros((len(self.candidates), self.cv))
+        self.remaining = len(self.alive) * self.cv
+        self.fits += self.remaining
+        return [
+            (index, fold, self.params(index), train_idx, val_idx)
+            for index in self.alive
+            for fold, (train_idx, val_idx) in enumerate(folds)
+        ]
+
+    def record(self, index: int, fold: int, mse: float) -> bool:
+        """Store one fold's validation MSE; True once the round is complete."""
+        self.scores[index, fold] = mse
+        self.remaining -= 1
+        return self.remaining == 0
+
+    def advance(self) -> bool:
+        """
+        Rank the finished round's candidates and keep the best for the next one.
+
+        Returns:
+            bool: True if another round follows, False if the search is done
+        """
+        mean_mse = self.scores[self.alive].mean(axis=1)
+        # Stable ordering keeps the first of tied candidates, as GridSearchCV does
+        ranked = [self.alive[i] for i in np.argsort(mean_mse, kind='stable')]
+        self.rounds.append({
+            'resource': self.schedule[self.round],
+            'candidates': len(self.alive),
+            'best_cv_mse': float(mean_mse.min())
+        })
+        if self.round == len(self.schedule) - 1:
+            self.best = ranked[0]
+            self.best_params = self.params(self.best)
+            self.best_cv_mse = float(mean_mse.min())
+            self.cv_mse = mean_mse.tolist()
+            return False
+        self.alive = sorted(ranked[:-(-len(self.alive) // self.config.factor)])
+        self.round += 1
+        return True
+
+
+def search_all(
+    data: TrainingData,
+    families: Sequence[str] = ('lr', 'dt', 'rf'),
+    workers: Optional[int] = None,
+    cv: int = 5,
+    param_grids: Optional[Dict[str, Dict[str, list]]] = None,
+    search: Optional[Dict[str, SearchConfig]] = None,
+    progress: bool = False
+) -> Dict[str, SearchResult]:
+    """
+    Cross-validate every family's candidates on one shared process pool.
+
+    Args:
+        data: Prepared dataset
+        families: Keys of MODEL_FAMILIES to search
+        workers: Pool processes (default: all cores)
+        cv: Folds, split as GridSearchCV(cv=cv) does for regressors
+        param_grids: Per-family grid overrides (default: MODEL_FAMILIES grids)
+        search: Per-family SearchConfig (default: exhaustive grid search)
+        progress: Print a line as each family finishes
+
+    Returns:
+        dict: Family key to its SearchResult, with the refit best estimator.
+              fit_seconds is the family's summed fit time across workers, which
+              stays comparable to a sequential run while families share the pool.
+    """
+    param_grids = param_grids or {}
+    search = search or {}
+    searches = {
+        key: _FamilySearch(
+            key, param_grids.get(key, MODEL_FAMILIES[key].param_grid),
+            search.get(key, SearchConfig()), len(data.X_train), cv
+        )
+        for key in families
+    }
+    fit_seconds = dict.fromkeys(families, 0.0)
+    results: Dict[str, SearchResult] = {}
+
+    with ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count(),
+        initializer=_init_worker,
+        initargs=(data.X_train, data.y_train)
+    ) as executor:
+        pending = {}
+
+        def submit(tasks):
+            tasks.sort(key=lambda task: _fit_cost(task[1][2]), reverse=True)
+            for key, (index, fold, params, train_idx, val_idx) in tasks:
+                future = executor.submit(_fit_and_score, key, params, train_idx, val_idx)
+                pending[future] = ('score', key, index, fold)
+
+        submit([(key, task) for key in families for task in searches[key].round_tasks()])
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, key, index, fold = pending.pop(future)
+                if kind == 'refit':
+                    estimator, seconds = future.result()
+                    results[key].estimator = estimator
+                    results[key].fit_seconds = fit_seconds[key] + seconds
+                    results[key].refit_seconds = seconds
+                    if progress:
+                        print(f"   ✅ {results[key].family.name}: best CV MSE "
+                              f"{results[key].best_cv_mse:.4f} ({results[key].fit_seconds:.2f}s of fits)")
+                    continue
+
+                family_search = searches[key]
+                mse, seconds = future.result()
+                fit_seconds[key] += seconds
+                if not family_search.record(index, fold, mse):
+                    continue
+                if family_search.advance():
+                    submit([(key, task) for task in family_search.round_tasks()])
+                    continue
+
+                results[key] = SearchResult(
+                    family=family_search.family,
+                    best_params=family_search.best_params,
+                    best_cv_mse=family_search.best_cv_mse,
+                    candidates=len(family_search.candidates),
+                    fits=family_search.fits,
+                    fit_seconds=0.0,
+                    cv_mse=family_search.cv_mse,
+                    search=family_search.config,
+                    rounds=family_search.rounds
+                )
+                refit = executor.submit(_refit, key, family_search.best_params)
+                pending[refit] = ('refit', key, None, None)
+
+    return {key: results[key] for key in families}
+
+
+def evaluate(estimator, data: TrainingData) -> Dict[str, float]:
+    """Training and test MSE, RMSE and R² of a fitted estimator."""
+    metrics = {}
+    for split, X, y in (('train', data.X_train, data.y_train), ('test', data.X_test, data.y_test)):
+        predictions = estimator.predict(X)
+        mse = mean_squared_error(y, predictions)
+        metrics[f'{split}_mse'] = mse
+        metrics[f'{split}_rmse'] = float(np.sqrt(mse))
+        metrics[f'{split}_r2'] = r2_score(y, predictions)
+    return metrics
+
+
+def describe_search(result: SearchResult) -> str:
+    """One-line summary of how a family's parameters were searched."""
+    if result.search.method == 'grid':
+        return f"grid, {result.candidates} candidates, {result.fits} fits"
+    resource = result.search.resource or result.family.halving_resource
+    return (f"successive halving on {resource} "
+            f"({' -> '.join(str(r['resource']) for r in result.rounds)}), "
+            f"candidates {' -> '.join(str(r['candidates']) for r in result.rounds)}, {result.fits} fits")
+
+
+def write_metrics(path: str, result: SearchResult, metrics: Dict[str, float], feature_cols: List[str]) -> None:
+    """Write a metrics file in the layout of the run_*.py scripts (read by compare_and_select_model.py)."""
+    estimator = result.estimator
+    with open(path, 'w') as f:
+        f.write(f"{result.family.name.upper()} MODEL METRICS\n")
+        f.write("="*70 + "\n\n")
+        if result.best_params:
+            f.write("Best Hyperparameters:\n")
+            for param, value in sorted(result.best_params.items()):
+                f.write(f"  {param}: {value}\n")
+            f.write(f"\nSearch: {describe_search(result)}\n\n")
+        f.write("Training Set:\n")
+        f.write(f"  MSE:  {metrics['train_mse']:.4f}\n")
+        f.write(f"  RMSE: {metrics['train_rmse']:.4f}\n")
+        f.write(f"  R²:   {metrics['train_r2']:.4f}\n\n")
+        f.write("Test Set:\n")
+        f.write(f"  MSE:  {metrics['test_mse']:.4f}\n")
+        f.write(f"  RMSE: {metrics['test_rmse']:.4f}\n")
+        f.write(f"  R²:   {metrics['test_r2']:.4f}\n\n")
+        if result.best_params:
+            f.write(f"Hyperparameter Tuning Time: {result.fit_seconds:.2f} seconds\n\n")
+        else:
+            f.write(f"Training Time: {result.refit_seconds:.4f} seconds\n\n")
+        if hasattr(estimator, 'feature_importances_'):
+            f.write("Feature Importance:\n")
+            for i in np.argsort(estimator.feature_importances_)[::-1]:
+                f.write(f"  {feature_cols[i]:<30} {estimator.feature_importances_[i]:>10.4f}\n")
+        elif hasattr(estimator, 'coef_'):
+            f.write("Feature Coefficients:\n")
+            for i in np.argsort(np.abs(estimator.coef_))[::-1]:
+                f.write(f"  {feature_cols[i]:<30} {estimator.coef_[i]:>+10.4f}\n")
+
+
+def save_results(results: Dict[str, SearchResult], data: TrainingData, models_dir: str = 'models') -> Dict[str, Dict]:
+    """
+    Save each family's fitted estimator and metrics file, and record the run in models_dir/metrics.db.
+
+    Returns:
+        dict: Family key to its evaluation metrics
+    """
+    os.makedirs(models_dir, exist_ok=True)
+    evaluations = {}
+    with MetricsStore(os.path.join(models_dir, 'metrics.db')) as store:
+        for key, result in results.items():
+            evaluations[key] = evaluate(result.estimator, data)
+            joblib.dump(result.estimator, os.path.join(models_dir, f'{key}_model.pkl'))
+            write_metrics(os.path.join(models_dir, f'{key}_metrics.txt'), result, evaluations[key], data.feature_cols)
+            store.record_run(
+                key, result.family.name, {**evaluations[key], 'cv_mse': result.best_cv_mse},
+                params=result.best_params,
+                dataset_hash=data.dataset_hash,
+                training_seconds=result.fit_seconds if result.best_params else result.refit_seconds,
+                source='train_models.py',
+                search=describe_search(result),
+                extra={'fits': result.fits, 'candidates': result.candidates, 'rounds': result.rounds}
+            )
+    return evaluations
+
+
+def compare_search_methods(
+    data: TrainingData,
+    families: Sequence[str] = ('dt', 'rf'),
+    workers: Optional[int] = None,
+    halving: Optional[SearchConfig] = None
+) -> List[Dict[str, Any]]:
+    """
+    Run each family's full grid and its successive halving search and compare them.
+
+    Each search gets the pool to itself so wall times are comparable.
+
+    Returns:
+        list of dict: family, method, fits, wall_seconds, best_params,
+                      best_cv_mse and test_mse per search
+    """
+    halving = halving or SearchConfig(method='halving')
+    rows = []
+    for key in families:
+        for config in (SearchConfig(), halving):
+            start = time.perf_counter()
+            result = search_all(data, [key], workers=workers, search={key: config})[key]
+            wall_seconds = time.perf_counter() - start
+            rows.append({
+                'family': result.family.name,
+                'method': config.method,
+                'search': describe_search(result),
+                'fits': result.fits,
+                'wall_seconds': wall_seconds,
+                'best_params': result.best_params,
+                'best_cv_mse': result.best_cv_mse,
+                'test_mse': evaluate(result.estimator, data)['test_mse']
+            })
+    return rows
+
+
+def format_search_comparison(rows: List[Dict[str, Any]]) -> str:
+    """Text report of compare_search_methods(), halving against the full grid per family."""
+    lines = [
+        "SEARCH METHOD COMPARISON",
+        "="*70,
+        "",
+        f"{'Model':<16} {'Method':<8} {'Fits':>6} {'Wall (s)':>9} {'Speedup':>8} {'CV MSE':>9} {'Test MSE':>9}",
+        "-"*70
+    ]
+    grid_seconds = {}
+    for row in rows:
+        if row['method'] == 'grid':
+            grid_seconds[row['family']] = row['wall_seconds']
+        speedup = grid_seconds.get(row['family'], row['wall_seconds']) / row['wall_seconds']
+        lines.append(f"{row['family']:<16} {row['method']:<8} {row['fits']:>6} {row['wall_seconds']:>9.2f} "
+                     f"{speedup:>7.1f}x {row['best_cv_mse']:>9.4f} {row['test_mse']:>9.4f}")
+    lines.append("")
+    for row in rows:
+        lines.append(f"{row['family']} ({row['method']}): {row['search']}")
+        lines.append(f"  best parameters: {row['best_params'] or '-'}")
+    return "\n".join(lines) + "\n"
+
+
+def parse_search_methods(specs: Sequence[str], families: Sequence[str]) -> Dict[str, str]:
+    """
+    Per-family search methods from --search values.
+
+    'halving' applies to every family and 'rf=halving' to one; later values win.
+
+    Raises:
+        ValueError: On an unknown family or method
+    """
+    methods = dict.fromkeys(families, 'grid')
+    for spec in specs:
+        key, _, method = spec.rpartition('=')
+        if method not in ('grid', 'halving'):
+            raise ValueError(f"Unknown search method '{method}' (expected 'grid' or 'halving')")
+        if key and key not in MODEL_FAMILIES:
+            raise ValueError(f"Unknown model family '{key}' (expected one of {', '.join(MODEL_FAMILIES)})")
+        for family in ([key] if key else families):
+            methods[family] = method
+    return methods
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Search and fit all model families on one process pool.")
+    parser.add_argument('--data', default='adherence_data.csv', help="Training CSV (default: adherence_data.csv)")
+    parser.add_argument('--families', nargs='+', choices=list(MODEL_FAMILIES), default=list(MODEL_FAMILIES),
+                        help="Model families to train (default: all)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help=f"Pool processes (default: all {os.cpu_count()} cores)")
+    parser.add_argument('--models-dir', default='models', help="Where to write models and metrics")
+    parser.add_argument('--search', nargs='+', default=[], metavar='[FAMILY=]METHOD',
+                        help="'grid' (default) or 'halving', for all families or one, e.g. --search rf=halving")
+    parser.add_argument('--halving-factor', type=int, default=3,
+                        help="Candidates kept per halving round are 1/factor (default: 3)")
+    parser.add_argument('--compare-search', action='store_true',
+                        help="Compare halving with the full grid per family and write models/search_comparison.txt")
+    args = parser.parse_args(argv)
+    try:
+        methods = parse_search_methods(args.search, args.families)
+    except ValueError as e:
+        parser.error(str(e))
+    search = {key: SearchConfig(method=method, factor=args.halving_factor) for key, method in methods.items()}
+
+    print("="*70)
+    print("TRAINING ALL MODEL FAMILIES")
+    print("="*70)
+
+    start = time.perf_counter()
+    data = prepare_data(args.data)
+    print(f"\n   ✅ Data prepared once: {len(data.X_train)} training, {len(data.X_test)} test rows"
+          f"{' (cached)' if data.from_cache else ''}")
+
+    if args.compare_search:
+        print(f"   Comparing grid and halving searches on {args.workers or os.cpu_count()} workers...")
+        report = format_search_comparison(compare_search_methods(
+            data, args.families, args.workers, SearchConfig(method='halving', factor=args.halving_factor)
+        ))
+        os.makedirs(args.models_dir, exist_ok=True)
+        report_path = os.path.join(args.models_dir, 'search_comparison.txt')
+        with open(report_path, 'w') as f:
+            f.write(report)
+        print("\n" + report)
+        print(f"Total time: {time.perf_counter() - start:.2f}s")
+        print(f"Saved report to {report_path}")
+        return 0
+
+    print(f"   Searching {', '.join(f'{key} ({method})' for key, method in methods.items())} "
+          f"on {args.workers or os.cpu_count()} workers...")
+    results = search_all(data, args.families, workers=args.workers, search=search, progress=True)
+    evaluations = save_results(results, data, args.models_dir)
+
+    print(f"\n{'Model':<20} {'CV MSE':>10} {'Test MSE':>10} {'Test R²':>9}  Best parameters")
+    print("-"*70)
+    for key, result in results.items():
+        metrics = evaluations[key]
+        print(f"{result.family.name:<20} {result.best_cv_mse:>10.4f} {metrics['test_mse']:>10.4f} "
+              f"{metrics['test_r2']:>9.4f}  {result.best_params or '-'}")
+    print(f"\nTotal time: {time.perf_counter() - start:.2f}s")
+    print(f"Saved {', '.join(f'{key}_model.pkl' for key in results)} and metrics to {args.models_dir}/")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Out-of-core training for adherence datasets larger than RAM.
+
+Every other training script reads the whole CSV with pd.read_csv and fits in
+memory. This driver streams a CSV, a Parquet file or a directory of partition
+files (as written by generate_dataset.py --rows) in fixed-size chunks, so
+memory is bounded by the chunk size rather than the dataset:
+
+1. Statistics pass: a StandardScaler is fitted with partial_fit over the
+   training rows, the co-moments of the features and target are merged chunk
+   by chunk (Chan et al.), and a fixed-size uniform sample of training rows
+   is kept for the histogram bin edges. The co-moments give the exact
+   least-squares linear regression, so no second pass is needed for it.
+2. Binning pass: the scaled training features are reduced to one uint8 bin
+   code per value (at most 255 bins, quantiles of the sample) and written with
+   the target to memory-mapped files in a work directory.
+3. Histogram gradient boosting (squared loss) is trained level by level on
+   those files: each pass over the memory-mapped bins routes rows one level
+   down the current tree and accumulates per-node gradient histograms, from
+   which every split is chosen. Only one chunk is mapped at a time.
+4. Evaluation pass: train and test MSE, RMSE and R² of both models are
+   accumulated over the input again.
+
+Rows with a missing value are dropped, as in preprocess.py. The train/test
+assignment hashes each row's position in the input with --random-state, since
+train_test_split needs every row at once; it is the same for any chunk size.
+Peak resident memory (ru_maxrss) is reported with the metrics.
+
+Models are saved as models/ooc_scaler.pkl, models/ooc_lr_model.pkl and
+models/ooc_hgb_model.pkl and work with predict_adherence(); runs are recorded
+in models/metrics.db as families 'ooc_lr' and 'ooc_hgb'.
+
+Usage:
+    python train_out_of_core.py --data data/adherence_100m --chunk-rows 500000
+    python train_out_of_core.py --data adherence_data.csv --trees 50 --max-depth 4
+
+Author: MedMind Development Team
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import joblib
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+from binned_boosting import MAX_BINS, BinnedGradientBoosting, map_rows, bin_edges, bin_features, fit_binned_gbm
+from metrics_store import MetricsStore
+from preprocess import TARGET_COLUMN
+from score_bulk import FEATURE_COLUMNS, read_chunks
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+# Uniform sample of training rows the bin edges are computed from
+EDGE_SAMPLE_ROWS = 200_000
+
+_SPLIT_SALT, _SAMPLE_SALT = 0, 1
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of this process in MB, or None where unsupported."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def input_files(path: str) -> List[str]:
+    """The file itself, or a directory's CSV and Parquet files in name order."""
+    if not os.path.isdir(path):
+        return [path]
+    files = sorted(
+        os.path.join(path, name) for name in os.listdir(path)
+        if not name.startswith(('.', '_')) and os.path.splitext(name)[1].lower() in ('.csv', '.parquet', '.pq')
+    )
+    if not files:
+        raise ValueError(f"No .csv or .parquet files in {path}")
+    return files
+
+
+def input_hash(path: str) -> str:
+    """SHA-256 of a file's bytes, or of its partition files' hashes in order."""
+    files = input_files(path)
+    digests = []
+    for name in files:
+        digest = hashlib.sha256()
+        with open(name, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        digests.append(digest.hexdigest())
+    return digests[0] if not os.path.isdir(path) else hashlib.sha256(''.join(digests).encode()).hexdigest()
+
+
+def iter_rows(path: str, chunk_rows: int) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Yield (first row index, features, target) chunks of a file or partition directory.
+
+    Row indices run across all files, so every row keeps the same index
+    whatever the chunk size. Incomplete rows are included (as NaN).
+
+    Raises:
+        ValueError: If the target column is missing
+    """
+    start = 0
+    for name in input_files(path):
+        for frame in read_chunks(name, chunk_rows):
+            if TARGET_COLUMN not in frame.columns:
+                raise ValueError(f"{name} has no {TARGET_COLUMN} column")
+            X = frame[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+            y = frame[TARGET_COLUMN].to_numpy(dtype=np.float64)
+            yield start, X, y
+            start += len(frame)
+
+
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    """SplitMix64 finalizer, a fast well-mixed hash of uint64 values."""
+    with np.errstate(over='ignore'):
+        z = x + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+def row_uniforms(start: int, n_rows: int, seed: int, salt: int = _SPLIT_SALT) -> np.ndarray:
+    """Uniform [0, 1) value for each row index, fixed by the seed and salt."""
+    key = _splitmix64(np.array([seed * 2 + salt], dtype=np.uint64))
+    hashed = _splitmix64(np.arange(start, start + n_rows, dtype=np.uint64) ^ key)
+    return (hashed >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+
+class _Moments:
+    """Count, mean and co-moment matrix of row vectors, merged one chunk at a time."""
+
+    def __init__(self, width: int):
+        self.n = 0
+        self.mean = np.zeros(width)
+        self.comoment = np.zeros((width, width))
+
+    def update(self, Z: np.ndarray) -> None:
+        n_chunk = len(Z)
+        if n_chunk == 0:
+            return
+        chunk_mean = Z.mean(axis=0)
+        centered = Z - chunk_mean
+        delta = chunk_mean - self.mean
+        total = self.n + n_chunk
+        self.comoment += centered.T @ centered + np.outer(delta, delta) * (self.n * n_chunk / total)
+        self.mean += delta * (n_chunk / total)
+        self.n = total
+
+    def least_squares(self) -> Tuple[np.ndarray, float]:
+        """Coefficients and intercept regressing the last column on the others."""
+        coef = np.linalg.lstsq(self.comoment[:-1, :-1], self.comoment[:-1, -1], rcond=None)[0]
+        return coef, float(self.mean[-1] - coef @ self.mean[:-1])
+
+
+class _Scores:
+    """Streaming MSE, RMSE and R² of predictions."""
+
+    def __init__(self):
+        self.n, self.sse, self.mean, self.m2 = 0, 0.0, 0.0, 0.0
+
+    def update(self, y: np.ndarray, predictions: np.ndarray) -> None:
+        if len(y) == 0:
+            return
+        self.sse += float(np.sum((y - predictions) ** 2))
+        chunk_mean = float(y.mean())
+        total = self.n + len(y)
+        delta = chunk_mean - self.mean
+        self.m2 += float(np.sum((y - chunk_mean) ** 2)) + delta * delta * self.n * len(y) / total
+        self.mean += delta * len(y) / total
+        self.n = total
+
+    def result(self) -> Dict[str, float]:
+        mse = self.sse / self.n
+        return {'mse': mse, 'rmse': float(np.sqrt(mse)), 'r2': 1.0 - self.sse / self.m2}
+
+
+@dataclass
+class OutOfCoreResult:
+    """Models, metrics and resource use of an out-of-core training run."""
+
+    scaler: StandardScaler
+    linear: LinearRegression
+    boosting: BinnedGradientBoosting
+    # Family key ('ooc_lr', 'ooc_hgb') to train/test MSE, RMSE and R²
+    metrics: Dict[str, Dict[str, float]]
+    # Family key to its fit seconds
+    fit_seconds: Dict[str, float]
+    train_rows: int
+    test_rows: int
+    dropped_rows: int
+    seconds: float
+    peak_rss_mb: Optional[float]
+    params: Dict[str, Dict] = field(default_factory=dict)
+
+
+def _stream_statistics(path: str, chunk_rows: int, test_size: float, random_state: int):
+    """Pass 1: scaler, co-moments, edge sample and row counts of the training rows."""
+    scaler = StandardScaler()
+    moments = _Moments(len(FEATURE_COLUMNS) + 1)
+    sample, sample_keys = np.empty((0, len(FEATURE_COLUMNS))), np.empty(0)
+    test_rows = dropped_rows = 0
+    for start, X, y in iter_rows(path, chunk_rows):
+        complete = ~(np.isnan(X).any(axis=1) | np.isnan(y))
+        train = complete & (row_uniforms(start, len(X), random_state) >= test_size)
+        dropped_rows += int(np.count_nonzero(~complete))
+        test_rows += int(np.count_nonzero(complete & ~train))
+        if not train.any():
+            continue
+        scaler.partial_fit(X[train])
+        moments.update(np.column_stack([X[train], y[train]]))
+        # Keep the training rows with the smallest hash keys: a uniform sample of fixed size
+        keys = row_uniforms(start, len(X), random_state, salt=_SAMPLE_SALT)[train]
+        sample, sample_keys = np.vstack([sample, X[train]]), np.concatenate([sample_keys, keys])
+        if len(sample_keys) > EDGE_SAMPLE_ROWS:
+            smallest = np.argpartition(sample_keys, EDGE_SAMPLE_ROWS)[:EDGE_SAMPLE_ROWS]
+            sample, sample_keys = sample[smallest], sample_keys[smallest]
+    if moments.n == 0:
+        raise ValueError(f"{path} has no complete training rows")
+    return scaler, moments, sample, test_rows, dropped_rows
+
+
+def _write_bins(path: str, work_dir: str, chunk_rows: int, test_size: float, random_state: int,
+                scaler: StandardScaler, edges: List[np.ndarray], n_rows: int) -> None:
+    """Pass 2: write the training rows' bin codes and targets to memory-mapped files."""
+    bins_path, target_path = os.path.join(work_dir, 'bins.bin'), os.path.join(work_dir, 'target.bin')
+    # Size the files up front; chunks are then mapped one at a time
+    for file_path, row_bytes in ((bins_path, len(edges)), (target_path, 8)):
+        with open(file_path, 'wb') as f:
+            f.truncate(n_rows * row_bytes)
+    written = 0
+    for start, X, y in iter_rows(path, chunk_rows):
+        complete = ~(np.isnan(X).any(axis=1) | np.isnan(y))
+        train = complete & (row_uniforms(start, len(X), random_state) >= test_size)
+        count = int(np.count_nonzero(train))
+        if not count:
+            continue
+        bins_map = map_rows(bins_path, np.uint8, len(edges), written, written + count)
+        target_map = map_rows(target_path, np.float64, 0, written, written + count)
+        bins_map[:] = bin_features(scaler.transform(X[train]), edges)
+        target_map[:] = y[train]
+        bins_map.flush()
+        target_map.flush()
+        del bins_map, target_map
+        written += count
+
+
+def _evaluate(path: str, chunk_rows: int, test_size: float, random_state: int,
+              scaler: StandardScaler, models: Dict[str, object]) -> Dict[str, Dict[str, float]]:
+    """Pass 4: train and test scores of every model."""
+    scores = {key: {'train': _Scores(), 'test': _Scores()} for key in models}
+    for start, X, y in iter_rows(path, chunk_rows):
+        complete = ~(np.isnan(X).any(axis=1) | np.isnan(y))
+        if not complete.any():
+            continue
+        is_test = row_uniforms(start, len(X), random_state)[complete] < test_size
+        X_scaled, y_complete = scaler.transform(X[complete]), y[complete]
+        for key, model in models.items():
+            predictions = model.predict(X_scaled)
+            scores[key]['train'].update(y_complete[~is_test], predictions[~is_test])
+            scores[key]['test'].update(y_complete[is_test], predictions[is_test])
+    metrics = {}
+    for key, split_scores in scores.items():
+        metrics[key] = {}
+        for split, accumulated in split_scores.items():
+            if accumulated.n:
+                metrics[key].update({f'{split}_{name}': value for name, value in accumulated.result().items()})
+    return metrics
+
+
+def train_out_of_core(
+    path: str,
+    chunk_rows: int = 500_000,
+    test_size: float = 0.2,
+    random_state: int = 42,
+    work_dir: Optional[str] = None,
+    n_estimators: int = 100,
+    learning_rate: float = 0.1,
+    max_depth: int = 6,
+    min_samples_leaf: int = 20,
+    progress: bool = False
+) -> OutOfCoreResult:
+    """
+    Fit the scaler, linear regression and binned gradient boosting in bounded memory.
+
+    Args:
+        path: CSV or Parquet file, or a directory of partition files
+        chunk_rows: Rows read (and mapped) at a time
+        test_size: Fraction of rows held out for testing
+        random_state: Seed of the row hash deciding the split
+        work_dir: Where the memory-mapped bins are written (default: a temporary
+            directory, removed afterwards); needs about 28 bytes per training row
+        n_estimators: Boosting trees
+        learning_rate: Boosting shrinkage
+        max_depth: Maximum boosting tree depth
+        min_samples_leaf: Minimum training rows per leaf
+        progress: Print phase timings and boosting progress to stderr
+
+    Returns:
+        OutOfCoreResult: Fitted models, metrics, row counts, timings and peak RSS
+
+    Raises:
+        ValueError: If chunk_rows is below 1 or there are no complete training rows
+    """
+    if chunk_rows < 1:
+        raise ValueError(f"chunk_rows must be at least 1, got {chunk_rows}")
+    start = time.perf_counter()
+
+    def report(phase: str) -> None:
+        if progress:
+            print(f"  {phase} done at {time.perf_counter() - start:.1f}s (peak RSS {peak_rss_mb()} MB)",
+                  file=sys.stderr)
+
+    scaler, moments, sample, test_rows, dropped_rows = _stream_statistics(path, chunk_rows, test_size, random_state)
+    coef, intercept = moments.least_squares()
+    # Same model on standardized features: x = mean + scale * z
+    linear = LinearRegression()
+    linear.coef_ = coef * scaler.scale_
+    linear.intercept_ = intercept + float(coef @ scaler.mean_)
+    linear.n_features_in_ = len(FEATURE_COLUMNS)
+    linear_seconds = time.perf_counter() - start
+    report("statistics pass")
+
+    boosting_start = time.perf_counter()
+    edges = bin_edges(scaler.transform(sample))
+    owned_dir = work_dir is None
+    work_dir = tempfile.mkdtemp(prefix='ooc-') if owned_dir else work_dir
+    os.makedirs(work_dir, exist_ok=True)
+    try:
+        _write_bins(path, work_dir, chunk_rows, test_size, random_state, scaler, edges, moments.n)
+        report("binning pass")
+        boosting = fit_binned_gbm(
+            work_dir, moments.n, edges, baseline=float(moments.mean[-1]),
+            n_estimators=n_estimators, learning_rate=learning_rate, max_depth=max_depth,
+            min_samples_leaf=min_samples_leaf, chunk_rows=chunk_rows, progress=progress
+        )
+    finally:
+        if owned_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    boosting_seconds = time.perf_counter() - boosting_start
+    report("boosting")
+
+    metrics = _evaluate(path, chunk_rows, test_size, random_state, scaler, {'ooc_lr': linear, 'ooc_hgb': boosting})
+    report("evaluation pass")
+    return OutOfCoreResult(
+        scaler=scaler,
+        linear=linear,
+        boosting=boosting,
+        metrics=metrics,
+        fit_seconds={'ooc_lr': linear_seconds, 'ooc_hgb': boosting_seconds},
+        train_rows=moments.n,
+        test_rows=test_rows,
+        dropped_rows=dropped_rows,
+        seconds=time.perf_counter() - start,
+        peak_rss_mb=peak_rss_mb(),
+        params={
+            'ooc_lr': {'solver': 'normal_equations'},
+            'ooc_hgb': {'n_estimators': n_estimators, 'learning_rate': learning_rate, 'max_depth': max_depth,
+                        'min_samples_leaf': min_samples_leaf, 'max_bins': MAX_BINS}
+        }
+    )
+
+
+MODEL_NAMES = {'ooc_lr': 'Linear Regression (out-of-core)', 'ooc_hgb': 'Histogram Boosting (out-of-core)'}
+
+
+def save_results(result: OutOfCoreResult, models_dir: str = 'models', data_hash: Optional[str] = None,
+                 chunk_rows: Optional[int] = None) -> None:
+    """Save the scaler and both models, and record both runs in models_dir/metrics.db."""
+    os.makedirs(models_dir, exist_ok=True)
+    joblib.dump(result.scaler, os.path.join(models_dir, 'ooc_scaler.pkl'))
+    joblib.dump(result.linear, os.path.join(models_dir, 'ooc_lr_model.pkl'))
+    joblib.dump(result.boosting, os.path.join(models_dir, 'ooc_hgb_model.pkl'))
+    with MetricsStore(os.path.join(models_dir, 'metrics.db')) as store:
+        for key, metrics in result.metrics.items():
+            store.record_run(
+                key, MODEL_NAMES[key], metrics,
+                params=result.params[key],
+                dataset_hash=data_hash,
+                training_seconds=result.fit_seconds[key],
+                source='train_out_of_core.py',
+                extra={'train_rows': result.train_rows, 'test_rows': result.test_rows,
+                       'chunk_rows': chunk_rows, 'peak_rss_mb': result.peak_rss_mb}
+            )
+
+
+def format_results(result: OutOfCoreResult) -> str:
+    """Text table of both models' scores with row counts and peak memory."""
+    lines = [
+        f"Rows: {result.train_rows:,} train / {result.test_rows:,} test ({result.dropped_rows:,} incomplete dropped)",
+        f"{'Model':<34} {'Train MSE':>10} {'Test MSE':>10} {'Test R²':>8} {'Fit (s)':>9}",
+        "-"*75
+    ]
+    for key, metrics in result.metrics.items():
+        lines.append(f"{MODEL_NAMES[key]:<34} {metrics.get('train_mse', float('nan')):>10.4f} "
+                     f"{metrics.get('test_mse', float('nan')):>10.4f} {metrics.get('test_r2', float('nan')):>8.4f} "
+                     f"{result.fit_seconds[key]:>9.2f}")
+    peak = f"{result.peak_rss_mb:,.1f} MB" if result.peak_rss_mb is not None else "n/a"
+    lines.append(f"Total time: {result.seconds:.2f}s   Peak RSS: {peak}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Train linear regression and histogram boosting out of core.")
+    parser.add_argument('--data', default='adherence_data.csv',
+                        help="CSV or Parquet file, or a directory of partition files (default: adherence_data.csv)")
+    parser.add_argument('--chunk-rows', type=int, default=500_000, help="Rows per chunk (default: 500000)")
+    parser.add_argument('--work-dir', default=None, help="Directory for the memory-mapped bins (default: temporary)")
+    parser.add_argument('--trees', type=int, default=100, help="Boosting trees (default: 100)")
+    parser.add_argument('--learning-rate', type=float, default=0.1, help="Boosting learning rate (default: 0.1)")
+    parser.add_argument('--max-depth', type=int, default=6, help="Boosting tree depth (default: 6)")
+    parser.add_argument('--min-samples-leaf', type=int, default=20, help="Minimum rows per leaf (default: 20)")
+    parser.add_argument('--random-state', type=int, default=42, help="Seed of the train/test split (default: 42)")
+    parser.add_argument('--models-dir', default='models', help="Where models are saved (default: models)")
+    parser.add_argument('--progress', action='store_true', help="Report phase timings and boosting progress")
+    args = parser.parse_args(argv)
+
+    result = train_out_of_core(
+        args.data,
+        chunk_rows=args.chunk_rows,
+        random_state=args.random_state,
+        work_dir=args.work_dir,
+        n_estimators=args.trees,
+        learning_rate=args.learning_rate,
+        max_depth=args.max_depth,
+        min_samples_leaf=args.min_samples_leaf,
+        progress=args.progress
+    )
+    save_results(result, args.models_dir, data_hash=input_hash(args.data), chunk_rows=args.chunk_rows)
+    print(format_results(result))
+    print(f"✅ Models saved: {args.models_dir}/ooc_scaler.pkl, ooc_lr_model.pkl, ooc_hgb_model.pkl")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())